@@ -1,15 +1,33 @@
-from flask import Flask, request, redirect, url_for, render_template, session, jsonify
+from flask import Flask, request, redirect, url_for, render_template, session, jsonify, abort
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 from collections import defaultdict
 import random
-from simulation import run_game_simulation
-from fast_simulation import run_fast_game_simulation
+from simulation import run_game_simulation, simulate_game, simulate_series, save_game_results
+from fast_simulation import simulate_fast_games
+from simulation_policy import SIMULATION_MODES, DEFAULT_POLICY, league_policy, route_games
 from reassign_contracts import reassign_league_contracts
+from standings import refresh_standings_snapshot, get_standings_snapshot
+from season_rollover import advance_season
+from season_archive import load_archived_game
+from career_stats import records_book
+from generate_schedule import generate_schedule, insert_schedule
+from payroll import get_team_payroll, apply_contract, move_contract, recalculate_payrolls
+from response_cache import ResponseCache
+from roster_cache import RosterCache, bump_roster_version
+from sim_metrics import SimTimer, record_sim_metrics, metrics_summary, league_charts
+from league_gc import mark_league_deleted, purge_deleted_leagues
+from win_probability import decode as decode_win_prob, GAME_SECONDS
+from game_events import render as render_events
 import json
 import calendar
 import datetime
 import os
+import threading
+import weakref
+import hmac
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -29,6 +47,134 @@ DB_CONFIG = {
 def get_db_connection():
     return psycopg2.connect(**DB_CONFIG)
 
+# Rosters + strategies per league for sim batches, kept current by leagues.roster_version
+roster_cache = RosterCache()
+
+# Small pool + threads so a page's independent reads can run at the same time
+READ_POOL_SIZE = 4
+read_pool = None
+read_pool_lock = threading.Lock()
+read_executor = ThreadPoolExecutor(max_workers=READ_POOL_SIZE)
+read_pool_connections = weakref.WeakSet()  # connections handed out by read_pool (vs. overflow ones)
+
+# Sim days run on their own pooled connections: the simulation SQL is PREPAREd once
+# per connection (see simulation.PREPARED_SQL), so reusing connections keeps it prepared
+SIM_POOL_SIZE = 2
+sim_pool = None
+sim_pool_connections = weakref.WeakSet()  # connections handed out by sim_pool (vs. overflow ones)
+
+# Background jobs (league purges): one worker so deletes never compete with each other
+job_executor = ThreadPoolExecutor(max_workers=1)
+
+# Playoff series are played out in worker processes; one pool per app process, started on first use
+PLAYOFF_WORKERS = min(4, os.cpu_count() or 1)
+series_executor = None
+series_executor_lock = threading.Lock()
+
+def get_series_executor():
+    global series_executor
+    with series_executor_lock:
+        if series_executor is None:
+            series_executor = ProcessPoolExecutor(max_workers=PLAYOFF_WORKERS)
+        return series_executor
+
+def reset_series_executor():
+    """Drops a broken pool (a worker died); the next round starts a new one."""
+    global series_executor
+    with series_executor_lock:
+        if series_executor is not None:
+            series_executor.shutdown(wait=False, cancel_futures=True)
+        series_executor = None
+
+def get_read_pool():
+    global read_pool
+    with read_pool_lock:
+        if read_pool is None:
+            read_pool = ThreadedConnectionPool(1, READ_POOL_SIZE, **DB_CONFIG)
+    return read_pool
+
+def get_sim_pool():
+    global sim_pool
+    with read_pool_lock:
+        if sim_pool is None:
+            sim_pool = ThreadedConnectionPool(1, SIM_POOL_SIZE, **DB_CONFIG)
+    return sim_pool
+
+def connection_alive(conn):
+    """Pings an idle connection (Neon closes them when its compute suspends)."""
+    if conn.closed: return False
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.close()
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def get_pooled_connection(pool, size, handed_out):
+    """
+    A live connection from pool. Dead idle connections are dropped and replaced;
+    when every pooled connection is busy the caller gets its own connection.
+    """
+    for _ in range(size + 1):
+        try:
+            conn = pool.getconn()
+        except PoolError:
+            break
+        if connection_alive(conn):
+            handed_out.add(conn)
+            return conn
+        pool.putconn(conn, close=True)
+    return get_db_connection()
+
+def release_pooled_connection(pool, conn, handed_out):
+    if conn in handed_out:
+        handed_out.discard(conn)
+        pool.putconn(conn, close=bool(conn.closed))
+    else:
+        conn.close()
+
+def get_sim_connection():
+    return get_pooled_connection(get_sim_pool(), SIM_POOL_SIZE, sim_pool_connections)
+
+def release_sim_connection(conn):
+    release_pooled_connection(get_sim_pool(), conn, sim_pool_connections)
+
+def get_read_connection():
+    """A live autocommit connection for short reads (page cache versions), shared with fetch_concurrently's pool."""
+    conn = get_pooled_connection(get_read_pool(), READ_POOL_SIZE, read_pool_connections)
+    conn.autocommit = True
+    return conn
+
+def release_read_connection(conn):
+    release_pooled_connection(get_read_pool(), conn, read_pool_connections)
+
+# Read pages are cached per league data version (bumped after sims, trades, signings, strategy changes)
+page_cache = ResponseCache(get_read_connection, release_read_connection)
+
+def fetch_concurrently(tasks):
+    """
+    Runs independent reads in parallel, each on its own pooled connection.
+    tasks maps a name to (sql, params) -> rows, or to a function taking a connection.
+    """
+    def run(task):
+        pool = get_read_pool()
+        conn = pool.getconn()
+        try:
+            conn.autocommit = True
+            if callable(task): return task(conn)
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute(*task)
+            rows = cur.fetchall()
+            cur.close()
+            return rows
+        finally:
+            pool.putconn(conn)
+
+    futures = {name: read_executor.submit(run, task) for name, task in tasks.items()}
+    return {name: f.result() for name, f in futures.items()}
+
 # ==========================================
 # 1. HELPER FUNCTIONS
 # ==========================================
@@ -76,6 +222,12 @@ def get_team_logo(abbrev):
     code = mapping.get(abbrev, abbrev.lower())
     return f"https://a.espncdn.com/i/teamlogos/nba/500/{code}.png"
 
+MONTH_NUMBERS = {name: i for i, name in enumerate(calendar.month_name) if name}
+
+def schedule_game_date(year, month_name, day_of_month):
+    """Builds the game_date for a schedule row from its year / month name / day columns."""
+    return datetime.date(year, MONTH_NUMBERS.get(month_name.strip(), 1), day_of_month)
+
 def record_season_history(conn, league_id, season_year, champion_id):
     """Snapshots the season stats and champion when the finals end."""
     cur = conn.cursor()
@@ -99,11 +251,9 @@ def record_season_history(conn, league_id, season_year, champion_id):
 # --- FINANCIAL & TRADE HELPERS ---
 
 def calculate_cap_space(conn, team_id, salary_cap):
-    """Calculates used salary and remaining space"""
-    cur = conn.cursor()
-    cur.execute("SELECT COALESCE(SUM(salary_amount), 0) FROM league_players WHERE team_id = %s", (team_id,))
-    used_cap = float(cur.fetchone()[0])
-    return max(0, salary_cap - used_cap), used_cap
+    """Calculates used salary and remaining space (current season of the payroll ledger)"""
+    used_cap = get_team_payroll(conn, team_id)[0]
+    return max(0, float(salary_cap) - used_cap), used_cap
 
 def get_player_asking_price(player):
     """Determines what a player wants based on rating"""
@@ -152,7 +302,7 @@ def get_pick_trade_value(pick, team_record):
 # ==========================================
 
 def update_ai_trade_logic(conn, league_id, user_team_id):
-    """Sets AI teams as Buyers or Sellers based on W/L record"""
+    """Sets AI teams as Buyers or Sellers based on W/L record (part of the sim day's transaction)"""
     cur = conn.cursor(cursor_factory=RealDictCursor)
     cur.execute("SELECT * FROM league_teams WHERE league_id = %s AND team_id != %s", (league_id, user_team_id))
     teams = cur.fetchall()
@@ -173,47 +323,48 @@ def update_ai_trade_logic(conn, league_id, user_team_id):
             cur.execute("UPDATE league_players SET trade_status = 'green' WHERE team_id = %s AND overall_rating < 75 AND age > 25", (t['team_id'],))
         else:
             cur.execute("UPDATE league_players SET trade_status = 'yellow' WHERE team_id = %s AND trade_status = 'green'", (t['team_id'],))
-    conn.commit()
 
 def attempt_ai_signings(conn, league_id):
-    """Daily routine for AI teams to fill rosters"""
+    """Daily routine for AI teams to fill rosters (part of the sim day's transaction)"""
     cur = conn.cursor(cursor_factory=RealDictCursor)
     
     cur.execute("SELECT salary_cap FROM leagues WHERE league_id = %s", (league_id,))
     cap = cur.fetchone()['salary_cap']
     
     cur.execute("""
-        SELECT t.team_id, COUNT(p.player_id) as roster_count
+        SELECT t.team_id, COALESCE(tp.committed_y1, 0) as payroll, COUNT(p.player_id) as roster_count
         FROM league_teams t
+        LEFT JOIN team_payroll tp ON tp.team_id = t.team_id
         LEFT JOIN league_players p ON t.team_id = p.team_id
         WHERE t.league_id = %s
-        GROUP BY t.team_id HAVING COUNT(p.player_id) < 14
+        GROUP BY t.team_id, tp.committed_y1 HAVING COUNT(p.player_id) < 14
     """, (league_id,))
     needy_teams = cur.fetchall()
     
-    cur.execute("SELECT * FROM league_players WHERE team_id IS NULL ORDER BY overall_rating DESC LIMIT 50")
+    cur.execute("SELECT * FROM league_players WHERE league_id = %s AND team_id IS NULL ORDER BY overall_rating DESC LIMIT 50", (league_id,))
     free_agents = cur.fetchall()
     
     for t in needy_teams:
         if random.random() > 0.3: continue
-        space, used = calculate_cap_space(conn, t['team_id'], cap)
+        space = max(0, float(cap) - float(t['payroll']))
         
         for p in free_agents:
             asking = get_player_asking_price(p)
             if asking <= space:
                 cur.execute("UPDATE league_players SET team_id = %s, salary_amount = %s WHERE player_id = %s", 
                             (t['team_id'], asking, p['player_id']))
+                roster_cache.move_player(cur, league_id, p['player_id'], t['team_id'])
+                apply_contract(cur, t['team_id'], asking, p['contract_years'])
                 desc = f"Signed Free Agent {p['first_name']} {p['last_name']} (${asking/1000000:.1f}M)"
                 cur.execute("INSERT INTO league_transactions (league_id, team_id, description, transaction_type) VALUES (%s, %s, %s, 'signing')",
                             (league_id, t['team_id'], desc))
-                conn.commit()
                 free_agents.remove(p) 
                 break
 
 def generate_smart_trades(conn, league_id, user_team_id):
     if random.random() > 0.40: return
     cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute("SELECT * FROM league_players WHERE trade_status = 'green' AND team_id != %s ORDER BY RANDOM() LIMIT 1", (user_team_id,)) 
+    cur.execute("SELECT * FROM league_players WHERE league_id = %s AND trade_status = 'green' AND team_id != %s ORDER BY RANDOM() LIMIT 1", (league_id, user_team_id)) 
     player_to_sell = cur.fetchone()
     if not player_to_sell: return
     seller_id = player_to_sell['team_id']
@@ -232,57 +383,127 @@ def generate_smart_trades(conn, league_id, user_team_id):
             # Only process CPU-CPU trades here for simplicity, or queue offers for user
             if buyer_id != user_team_id and seller_id != user_team_id:
                 cur.execute("UPDATE league_players SET team_id = %s WHERE player_id = %s", (buyer_id, player_to_sell['player_id']))
+                roster_cache.move_player(cur, league_id, player_to_sell['player_id'], buyer_id)
+                move_contract(cur, player_to_sell['salary_amount'], player_to_sell['contract_years'], seller_id, buyer_id)
                 cur.execute("UPDATE league_draft_picks SET owner_team_id = %s WHERE pick_id = %s", (seller_id, pick_to_give['pick_id']))
                 desc = f"Traded {player_to_sell['last_name']} to Team {buyer_id} for Pick"
                 cur.execute("INSERT INTO league_transactions (league_id, team_id, description, transaction_type) VALUES (%s, %s, %s, 'trade')", (league_id, seller_id, desc))
-                conn.commit()
 
 # ==========================================
 # 3. CORE SIMULATION WRAPPERS
 # ==========================================
 
-def run_daily_simulation_logic(conn, league_id, user_team_id):
-    """Core logic to simulate one day and advance date"""
+def play_day_games(conn, league_id, detailed_games, fast_games):
+    """
+    Plays a day's games in memory (rosters from the league snapshot; the fast engine's share in one batch)
+    and writes box scores, play-by-play and standings with one statement each. Does not commit.
+    Returns the number of rows written.
+    """
+    games = detailed_games + fast_games
+    if not games: return 0
     cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    # 1. Get Sim Date and Simulation Mode
-    cur.execute("SELECT sim_date, simulation_mode FROM leagues WHERE league_id = %s", (league_id,))
-    league_data = cur.fetchone()
-    sim_date = league_data['sim_date']
-    sim_mode = league_data.get('simulation_mode', 'detailed')
-
-    print(f"Simulating with {sim_mode} mode for league {league_id} on {sim_date}")
-
-    # 2. Get Games for Today
-    cur.execute("""
-        SELECT game_id, home_team_id, away_team_id
-        FROM league_schedule
-        WHERE league_id = %s
-          AND day_of_month = EXTRACT(DAY FROM %s::date)
-          AND year = EXTRACT(YEAR FROM %s::date)
-          AND TRIM(month_name) = TRIM(TO_CHAR(%s::date, 'Month'))
-          AND is_played = FALSE
-    """, (league_id, sim_date, sim_date, sim_date))
-    games = cur.fetchall()
+    all_players, strategies_db = roster_cache.game_context(cur, league_id, {tid for g in games for tid in (g['home_team_id'], g['away_team_id'])})
+    results = [(g['game_id'], g['home_team_id'], g['away_team_id'], simulate_game(g['home_team_id'], g['away_team_id'], all_players, strategies_db))
+               for g in detailed_games]
+    fast_results = simulate_fast_games([(g['home_team_id'], g['away_team_id']) for g in fast_games], all_players, strategies_db)
+    results += [(g['game_id'], g['home_team_id'], g['away_team_id'], r) for g, r in zip(fast_games, fast_results)]
+    rows_written = save_game_results(cur, league_id, results)
     cur.close()
-
-    # 3. Sim Games (choose simulation mode)
-    for g in games:
+    return rows_written
+
+def run_daily_simulation_logic(conn, league_id, user_team_id, expected_date=None):
+    """
+    Core logic to simulate one day and advance date.
+
+    The whole day (games, standings, AI moves, date advance and its sim_runs row) is one
+    transaction, taken under a lock on the league row: a failure rolls everything back, so
+    a retry replays the day cleanly, and concurrent sims of one league run one after the
+    other. Games already played (e.g. simmed one at a time) are skipped. With expected_date,
+    the day is only simmed if the league is still on that date, so a resubmitted form
+    doesn't sim a second day. Returns True if a day was simulated.
+    Each simulated day also writes its timings to sim_metrics (see sim_metrics.py).
+    """
+    timer = SimTimer()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # 1. Lock the league, get Sim Date and Simulation Mode
+        cur.execute("SELECT sim_date, simulation_mode, simulation_policy FROM leagues WHERE league_id = %s FOR UPDATE", (league_id,))
+        league_data = cur.fetchone()
+        sim_date = league_data['sim_date']
+        sim_mode = league_data.get('simulation_mode') or 'detailed'
+        if expected_date and str(sim_date) != str(expected_date):
+            print(f"League {league_id} already past {expected_date}; skipping")
+            conn.rollback()
+            return False
+
+        print(f"Simulating with {sim_mode} mode for league {league_id} on {sim_date}")
+
+        # 2. Get Games for Today (not yet played)
+        cur.execute("""
+            SELECT game_id, home_team_id, away_team_id, playoff_series_id
+            FROM league_schedule
+            WHERE league_id = %s
+              AND day_of_month = EXTRACT(DAY FROM %s::date)
+              AND year = EXTRACT(YEAR FROM %s::date)
+              AND TRIM(month_name) = TRIM(TO_CHAR(%s::date, 'Month'))
+              AND is_played = FALSE
+        """, (league_id, sim_date, sim_date, sim_date))
+        games = cur.fetchall()
+
+        # 3. Sim Games: route each game to an engine, then write them all at once
         if sim_mode == 'fast':
-            run_fast_game_simulation(conn, league_id, g['game_id'], g['home_team_id'], g['away_team_id'])
+            detailed_games, fast_games = [], games
+        elif sim_mode == 'hybrid':
+            detailed_games, fast_games = route_games(conn, league_id, games, user_team_id, league_policy(league_data['simulation_policy']))
         else:
-            run_game_simulation(conn, league_id, g['game_id'], g['home_team_id'], g['away_team_id'])
-
-    # 4. AI Logic (Trades/Signings)
-    update_ai_trade_logic(conn, league_id, user_team_id)
-    attempt_ai_signings(conn, league_id)
-    generate_smart_trades(conn, league_id, user_team_id)
+            detailed_games, fast_games = games, []
+        with timer.phase('games'):
+            rows_written = play_day_games(conn, league_id, detailed_games, fast_games)
+
+        # 4. AI Logic (Trades/Signings)
+        with timer.phase('ai'):
+            update_ai_trade_logic(conn, league_id, user_team_id)
+            attempt_ai_signings(conn, league_id)
+            generate_smart_trades(conn, league_id, user_team_id)
+
+        # 5. Advance Date, Rebuild Standings Read Model, record the run
+        cur.execute("UPDATE leagues SET sim_date = sim_date + INTERVAL '1 day' WHERE league_id = %s", (league_id,))
+        refresh_standings_snapshot(conn, league_id)
+        cur.execute("""
+            INSERT INTO sim_runs (league_id, sim_date, mode, status, games_played, detailed_games, finished_at)
+            VALUES (%s, %s, %s, 'complete', %s, %s, clock_timestamp())
+            ON CONFLICT (league_id, sim_date) DO UPDATE
+            SET mode = EXCLUDED.mode, status = 'complete', games_played = EXCLUDED.games_played,
+                detailed_games = EXCLUDED.detailed_games, error = NULL, attempts = sim_runs.attempts + 1,
+                finished_at = clock_timestamp()
+        """, (league_id, sim_date, sim_mode, len(games), len(detailed_games)))
+        record_sim_metrics(cur, league_id, sim_date, sim_mode, len(games), len(detailed_games),
+                           roster_cache.player_count(league_id), rows_written, timer)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        record_failed_sim_run(conn, league_id, str(e))
+        raise
+    finally:
+        cur.close()
+    page_cache.bump(conn, league_id)
+    return True
 
-    # 5. Advance Date
-    cur = conn.cursor()
-    cur.execute("UPDATE leagues SET sim_date = sim_date + INTERVAL '1 day' WHERE league_id = %s", (league_id,))
-    conn.commit()
-    cur.close()
+def record_failed_sim_run(conn, league_id, error):
+    """Journals a rolled-back day (nothing else from it was kept) so failures are visible."""
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO sim_runs (league_id, sim_date, status, error)
+            SELECT league_id, sim_date, 'failed', %s FROM leagues WHERE league_id = %s
+            ON CONFLICT (league_id, sim_date) DO UPDATE
+            SET status = 'failed', error = EXCLUDED.error, attempts = sim_runs.attempts + 1, finished_at = NOW()
+        """, (error[:1000], league_id))
+        conn.commit()
+        cur.close()
+    except Exception as e:
+        conn.rollback()
+        print(f"Could not record failed sim run: {e}")
 
 # ==========================================
 # 4. ROUTES: SETUP & DASHBOARD
@@ -296,12 +517,40 @@ def index():
 def load_league():
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute("SELECT league_id, name, season_year, sim_date, created_at FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name, season_year, sim_date, created_at FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     leagues = cur.fetchall()
     cur.close()
     conn.close()
     return render_template('load_league.html', leagues=leagues)
 
+def purge_deleted_leagues_job():
+    """Purges every league marked deleted, including ones whose purge was cut short by a restart."""
+    try:
+        conn = get_db_connection()
+    except psycopg2.Error as e:
+        print(f"League purge sweep skipped: {e}")
+        return
+    try:
+        purge_deleted_leagues(conn)
+    except Exception as e:
+        # Still marked deleted, so the next sweep (delete, app start, `python league_gc.py`) picks it up
+        print(f"League purge sweep failed: {e}")
+    finally:
+        conn.close()
+
+# Resume purges a previous process left unfinished
+job_executor.submit(purge_deleted_leagues_job)
+
+@app.route('/delete_league/<int:league_id>', methods=['POST'])
+def delete_league(league_id):
+    conn = get_db_connection()
+    if mark_league_deleted(conn, league_id):
+        page_cache.bump(conn, league_id)
+        page_cache.bump_league_list(conn)
+        job_executor.submit(purge_deleted_leagues_job)
+    conn.close()
+    return redirect(url_for('load_league'))
+
 @app.route('/create_league', methods=['GET', 'POST'])
 def create_league():
     conn = get_db_connection()
@@ -357,6 +606,7 @@ def create_league():
             if player_data:
                 args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in player_data)
                 cur.execute("INSERT INTO league_players (team_id, league_id, first_name, last_name, position, age, usage_rating, inside_shooting, outside_shooting, ft_shooting, passing, speed, guarding, stealing, blocking, rebounding, overall_rating, contract_years, salary_amount) VALUES " + args_str)
+            recalculate_payrolls(cur, new_league_id)
 
             # Bulk insert schedule (much faster)
             cur.execute("SELECT * FROM quick_start_schedule WHERE scenario_id = %s", (scenario_id,))
@@ -368,16 +618,21 @@ def create_league():
                 new_away = id_map.get(g['away_qs_team_id'])
                 if new_home and new_away:
                     schedule_data.append((new_league_id, g['week_number'], g['day_number'], g['day_of_week'],
-                                        g['month_name'], g['day_of_month'], g['year'], new_home, new_away))
+                                        g['month_name'], g['day_of_month'], g['year'],
+                                        schedule_game_date(g['year'], g['month_name'], g['day_of_month']), new_home, new_away))
 
             if schedule_data:
-                args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in schedule_data)
-                cur.execute("INSERT INTO league_schedule (league_id, week_number, day_number, day_of_week, month_name, day_of_month, year, home_team_id, away_team_id) VALUES " + args_str)
+                args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in schedule_data)
+                cur.execute("INSERT INTO league_schedule (league_id, week_number, day_number, day_of_week, month_name, day_of_month, year, game_date, home_team_id, away_team_id) VALUES " + args_str)
+            else:
+                # Scenario has no stored schedule: generate one for these teams
+                insert_schedule(cur, new_league_id, generate_schedule(list(id_map.values()), datetime.date(2024, 10, 22)))
 
             if user_new_team_id:
                 cur.execute("INSERT INTO coaching_strategy (team_id) VALUES (%s)", (user_new_team_id,))
 
             conn.commit()
+            page_cache.bump_league_list(conn)
             return redirect(url_for('league_dashboard', league_id=new_league_id))
         except Exception as e:
             import traceback
@@ -410,96 +665,29 @@ def create_league():
 
 @app.route('/dashboard/<int:league_id>')
 def league_dashboard(league_id):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
-    league = cur.fetchone()
+    """Page shell - the standings, today's games, leaders and transactions panels load from /api/league/<id>/*."""
+    data = fetch_concurrently({
+        'league': ("SELECT * FROM leagues WHERE league_id = %s", (league_id,)),
+        'all_leagues': ("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC", ()),
+    })
+    league = data['league'][0]
     session['user_team_id'] = league['user_team_id']
-    sim_date = league['sim_date']
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
-    all_leagues = cur.fetchall()
-    cur.execute("SELECT * FROM league_teams WHERE league_id = %s ORDER BY wins DESC, losses ASC", (league_id,))
-    teams = cur.fetchall()
-    
-    # Today's games
-    cur.execute("""
-        SELECT s.game_id, th.abbrev as home_abv, th.name as home_name, ta.abbrev as away_abv, ta.name as away_name,
-               s.home_score, s.away_score, s.is_played
-        FROM league_schedule s
-        JOIN league_teams th ON s.home_team_id = th.team_id
-        JOIN league_teams ta ON s.away_team_id = ta.team_id
-        WHERE s.league_id = %s 
-          AND s.day_of_month = EXTRACT(DAY FROM %s::date)
-          AND s.year = EXTRACT(YEAR FROM %s::date)
-          AND TRIM(s.month_name) = TRIM(TO_CHAR(%s::date, 'Month'))
-    """, (league_id, sim_date, sim_date, sim_date))
-    todays_games = cur.fetchall()
-    for g in todays_games:
-        g['home_logo'] = get_team_logo(g['home_abv'])
-        g['away_logo'] = get_team_logo(g['away_abv'])
-
-    # Recent history for streaks
-    cur.execute("SELECT home_team_id, away_team_id, home_score, away_score FROM league_schedule WHERE league_id = %s AND is_played = TRUE ORDER BY game_id DESC", (league_id,))
-    played_games = cur.fetchall()
-    
-    # Explicitly define keys to keep dashboard static
-    standings = {'East': defaultdict(list), 'West': defaultdict(list)}
-    
-    conf_leaders = {'East': None, 'West': None}
-    team_history = defaultdict(list)
-
-    for g in played_games:
-        res_h = 'W' if g['home_score'] > g['away_score'] else 'L'
-        team_history[g['home_team_id']].append(res_h)
-        res_a = 'W' if g['away_score'] > g['home_score'] else 'L'
-        team_history[g['away_team_id']].append(res_a)
-
-    for team in teams:
-        team['is_user'] = (team['team_id'] == league['user_team_id'])
-        team['logo_url'] = get_team_logo(team['abbrev'])
-        total = team['wins'] + team['losses']
-        team['pct'] = "{:.3f}".format(team['wins'] / total) if total > 0 else ".000"
-        last_5 = team_history[team['team_id']][:5]
-        team['l5'] = f"{last_5.count('W')}-{last_5.count('L')}"
-        team['streak_display'] = f"{team['streak_type']}{team['streak_length']}" if team['streak_length'] > 0 else "-"
-        conf = team['conference']
-        if conf_leaders[conf] is None: conf_leaders[conf] = team
-        leader = conf_leaders[conf]
-        team['gb'] = calculate_gb(leader['wins'], leader['losses'], team['wins'], team['losses'])
-        
-        # Add to static standings
-        if conf in standings:
-            standings[conf][team['division']].append(team)
-
-    cur.close()
-    conn.close()
-    return render_template('dashboard.html', league=league, standings=standings, todays_games=todays_games, all_leagues=all_leagues)
+    return render_template('dashboard.html', league=league, all_leagues=data['all_leagues'],
+                           sim_policy=league_policy(league.get('simulation_policy')))
 
 @app.route('/standings/<int:league_id>')
+@page_cache.cached()
 def league_standings(league_id):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
     league = cur.fetchone()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
-    cur.execute("SELECT * FROM league_teams WHERE league_id = %s", (league_id,))
-    teams = cur.fetchall()
+    teams = get_standings_snapshot(conn, league_id)
     for t in teams: t['logo_url'] = get_team_logo(t['abbrev'])
     east = [t for t in teams if t['conference'] == 'East']
     west = [t for t in teams if t['conference'] == 'West']
-    east.sort(key=lambda x: (x['wins'] / (x['wins'] + x['losses']) if (x['wins'] + x['losses']) > 0 else 0), reverse=True)
-    west.sort(key=lambda x: (x['wins'] / (x['wins'] + x['losses']) if (x['wins'] + x['losses']) > 0 else 0), reverse=True)
-
-    def calc_conf_gb(conf_teams):
-        if not conf_teams: return
-        leader = conf_teams[0]
-        for t in conf_teams:
-            t['gb'] = calculate_gb(leader['wins'], leader['losses'], t['wins'], t['losses'])
-            t['pct'] = "{:.3f}".format(t['wins'] / (t['wins'] + t['losses'])) if (t['wins'] + t['losses']) > 0 else ".000"
-
-    calc_conf_gb(east)
-    calc_conf_gb(west)
     east = calculate_playoff_odds(east)
     west = calculate_playoff_odds(west)
     cur.close()
@@ -519,6 +707,9 @@ def simulate_single_game(game_id):
     cur.close()
     if game:
         run_game_simulation(conn, game['league_id'], game_id, game['home_team_id'], game['away_team_id'])
+        refresh_standings_snapshot(conn, game['league_id'])
+        conn.commit()
+        page_cache.bump(conn, game['league_id'])
         return redirect(url_for('league_schedule', league_id=game['league_id']))
     return "Game not found", 404
 
@@ -526,9 +717,11 @@ def simulate_single_game(game_id):
 def simulate_day(league_id):
     try:
         user_team_id = session.get('user_team_id', 61)
-        conn = get_db_connection()
-        run_daily_simulation_logic(conn, league_id, user_team_id)
-        conn.close()
+        conn = get_sim_connection()
+        try:
+            run_daily_simulation_logic(conn, league_id, user_team_id, request.form.get('sim_date'))
+        finally:
+            release_sim_connection(conn)
 
         # Safe redirect handling
         if request.referrer and 'league_schedule' in request.referrer:
@@ -551,11 +744,15 @@ def simulate_day(league_id):
 def simulate_week(league_id):
     try:
         user_team_id = session.get('user_team_id', 61)
-        conn = get_db_connection()
-        for day in range(7):
-            print(f"Simulating day {day + 1}/7...")
-            run_daily_simulation_logic(conn, league_id, user_team_id)
-        conn.close()
+        conn = get_sim_connection()
+        expected_date = request.form.get('sim_date')  # a resubmitted form finds the league already moved on
+        try:
+            for day in range(7):
+                print(f"Simulating day {day + 1}/7...")
+                if not run_daily_simulation_logic(conn, league_id, user_team_id, expected_date): break
+                expected_date = None
+        finally:
+            release_sim_connection(conn)
 
         # Safe redirect handling
         if request.referrer and 'league_schedule' in request.referrer:
@@ -579,6 +776,7 @@ def simulate_week(league_id):
 # ==========================================
 
 @app.route('/team/<int:team_id>')
+@page_cache.cached('team_id', "SELECT league_id FROM league_teams WHERE team_id = %s")
 def team_home(team_id):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -591,7 +789,7 @@ def team_home(team_id):
     
     cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
     league = cur.fetchone()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
 
     # Calculate League Average Efficiency
@@ -607,7 +805,7 @@ def team_home(team_id):
                      COALESCE(SUM(b.turnovers),0))
                 ) / NULLIF(COUNT(b.game_id), 0) as eff_per_game
             FROM league_players p 
-            JOIN league_box_scores b ON p.player_id = b.player_id 
+            JOIN league_box_scores b ON p.player_id = b.player_id AND b.league_id = p.league_id
             WHERE p.league_id = %s 
             GROUP BY p.player_id
         ) as player_stats
@@ -637,9 +835,10 @@ def team_home(team_id):
                ), 0) as total_eff
         FROM league_players p 
         LEFT JOIN league_box_scores b ON p.player_id = b.player_id
+             AND b.league_id = (SELECT league_id FROM league_teams WHERE team_id = %s)
         WHERE p.team_id = %s 
         GROUP BY p.player_id
-    """, (team_id,))
+    """, (team_id, team_id))
     roster = cur.fetchall()
 
     for p in roster:
@@ -663,12 +862,13 @@ def team_home(team_id):
     return render_template('team.html', team=team, league=league, all_leagues=all_leagues, roster=roster, rank=team_rank)
 
 @app.route('/league_stats/<int:league_id>')
+@page_cache.cached()
 def league_stats(league_id):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
     league = cur.fetchone()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
     
     cur.execute("""
@@ -682,7 +882,7 @@ def league_stats(league_id):
             COALESCE(SUM(b.fg_attempts), 0) as total_fga
         FROM league_players p
         JOIN league_teams t ON p.team_id = t.team_id
-        LEFT JOIN league_box_scores b ON p.player_id = b.player_id
+        LEFT JOIN league_box_scores b ON p.player_id = b.player_id AND b.league_id = p.league_id
         WHERE p.league_id = %s GROUP BY p.player_id, t.team_id
     """, (league_id,))
     raw_stats = cur.fetchall()
@@ -738,8 +938,9 @@ def my_team_stats():
             COALESCE(SUM(b.threes_attempts), 0) as total_3pa, COALESCE(SUM(b.ft_made), 0) as total_ftm,
             COALESCE(SUM(b.ft_attempts), 0) as total_fta
         FROM league_players p LEFT JOIN league_box_scores b ON p.player_id = b.player_id
+             AND b.league_id = (SELECT league_id FROM league_teams WHERE team_id = %s)
         WHERE p.team_id = %s GROUP BY p.player_id
-    """, (user_team_id,))
+    """, (user_team_id, user_team_id))
     raw_stats = cur.fetchall()
     stats = []
     for p in raw_stats:
@@ -765,6 +966,7 @@ def my_team_stats():
     return render_template('team_stats.html', league=league, team=team, stats=stats)
 
 @app.route('/boxscore/<int:game_id>')
+@page_cache.cached('game_id', "SELECT league_id FROM league_schedule WHERE game_id = %s")
 def boxscore(game_id):
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -777,28 +979,44 @@ def boxscore(game_id):
         WHERE s.game_id = %s
     """, (game_id,))
     game = cur.fetchone()
-    if not game: return "Game not found", 404
+    archived = None
+    if not game:
+        # Games from past seasons only exist in the archive
+        archived = load_archived_game(conn, game_id)
+        if not archived: return "Game not found", 404
+        game = archived[0]
     game['home_logo'] = get_team_logo(game['home_abv'])
     game['away_logo'] = get_team_logo(game['away_abv'])
     league_id = game['league_id']
     cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
     league = cur.fetchone()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
-    cur.execute("""
-        SELECT p.first_name, p.last_name, p.position, p.age, b.*
-        FROM league_box_scores b
-        JOIN league_players p ON b.player_id = p.player_id
-        WHERE b.game_id = %s ORDER BY b.points DESC
-    """, (game_id,))
-    stats = cur.fetchall()
+    if archived:
+        stats, pbp = archived[1], archived[2]
+    else:
+        cur.execute("""
+            SELECT p.first_name, p.last_name, p.position, p.age, b.*
+            FROM league_box_scores b
+            JOIN league_players p ON b.player_id = p.player_id
+            WHERE b.league_id = %s AND b.game_id = %s ORDER BY b.points DESC
+        """, (league_id, game_id))
+        stats = cur.fetchall()
+        pbp = None
+    if game.get('event_log'):
+        # Compact play-by-play: descriptions are rendered here, not during the sim
+        pbp = render_events(game['event_log'], {s['player_id']: s['last_name'] for s in stats})
+    elif pbp is None:
+        # Games simmed before the compact log keep their rows in league_game_events
+        cur.execute("SELECT * FROM league_game_events WHERE league_id = %s AND game_id = %s ORDER BY event_id ASC", (league_id, game_id))
+        pbp = cur.fetchall()
     home_stats = [s for s in stats if s['team_id'] == game['home_team_id']]
     away_stats = [s for s in stats if s['team_id'] == game['away_team_id']]
-    cur.execute("SELECT * FROM league_game_events WHERE game_id = %s ORDER BY event_id ASC", (game_id,))
-    pbp = cur.fetchall()
+    win_prob = decode_win_prob(game.get('win_prob_samples'))
     cur.close()
     conn.close()
-    return render_template('boxscore.html', game=game, league=league, all_leagues=all_leagues, home_stats=home_stats, away_stats=away_stats, pbp=pbp)
+    return render_template('boxscore.html', game=game, league=league, all_leagues=all_leagues, home_stats=home_stats, away_stats=away_stats, pbp=pbp,
+                           win_prob=win_prob, game_seconds=GAME_SECONDS)
 
 # ==========================================
 # 7. ROUTES: STRATEGY & MANAGEMENT
@@ -815,6 +1033,7 @@ def coach_strategy():
     strategy = cur.fetchone()
     if strategy is None:
         cur.execute("INSERT INTO coaching_strategy (team_id) VALUES (%s)", (user_team_id,))
+        if league: bump_roster_version(cur, league['league_id'])
         conn.commit()
         cur.execute("SELECT * FROM coaching_strategy WHERE team_id=%s", (user_team_id,))
         strategy = cur.fetchone()
@@ -830,27 +1049,33 @@ def save_strategy():
     cur = conn.cursor()
     cur.execute("UPDATE coaching_strategy SET offense_focus=%s, defense_focus=%s, bench_minutes=%s, rest_strategy=%s, training_focus=%s WHERE team_id=%s",
                 (data.get('offense_focus'), data.get('defense_focus'), data.get('bench_minutes'), data.get('rest_strategy'), data.get('training_focus'), user_team_id))
+    bump_roster_version(cur, page_cache.league_for(conn, "SELECT league_id FROM league_teams WHERE team_id = %s", user_team_id))
     conn.commit()
     cur.close()
+    page_cache.bump_for_team(conn, user_team_id)
     conn.close()
     return jsonify({'success': True})
 
 @app.route('/toggle_simulation_mode/<int:league_id>', methods=['POST'])
 def toggle_simulation_mode(league_id):
-    """Toggle between detailed and fast simulation modes"""
+    """Set the simulation mode (JSON {"mode": ...}), or cycle detailed -> hybrid -> fast"""
+    data = request.get_json(silent=True) or {}
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
     # Get current mode
     cur.execute("SELECT simulation_mode FROM leagues WHERE league_id = %s", (league_id,))
-    current_mode = cur.fetchone().get('simulation_mode', 'detailed')
+    current_mode = cur.fetchone().get('simulation_mode') or 'detailed'
 
-    # Toggle mode
-    new_mode = 'fast' if current_mode == 'detailed' else 'detailed'
+    # Requested mode, or the next one
+    new_mode = data.get('mode')
+    if new_mode not in SIMULATION_MODES:
+        new_mode = SIMULATION_MODES[(SIMULATION_MODES.index(current_mode) + 1) % len(SIMULATION_MODES)] if current_mode in SIMULATION_MODES else 'detailed'
 
     cur.execute("UPDATE leagues SET simulation_mode = %s WHERE league_id = %s", (new_mode, league_id))
     conn.commit()
     cur.close()
+    page_cache.bump(conn, league_id)
     conn.close()
 
     return jsonify({
@@ -859,12 +1084,41 @@ def toggle_simulation_mode(league_id):
         'message': f"Switched to {new_mode} simulation mode"
     })
 
+@app.route('/save_simulation_policy/<int:league_id>', methods=['POST'])
+def save_simulation_policy(league_id):
+    """Hybrid mode routing: which games get the detailed engine"""
+    data = request.get_json(silent=True) or {}
+    try:
+        policy = {
+            'user_team': bool(data.get('user_team', DEFAULT_POLICY['user_team'])),
+            'playoffs': bool(data.get('playoffs', DEFAULT_POLICY['playoffs'])),
+            'race_games': max(0.0, float(data.get('race_games', DEFAULT_POLICY['race_games']))),
+            'race_after_games': max(0, int(data.get('race_after_games', DEFAULT_POLICY['race_after_games']))),
+        }
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Invalid policy values'}), 400
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("UPDATE leagues SET simulation_policy = %s WHERE league_id = %s", (json.dumps(policy), league_id))
+    conn.commit()
+    cur.close()
+    page_cache.bump(conn, league_id)
+    conn.close()
+    return jsonify({'success': True, 'policy': policy})
+
 @app.route('/reassign_contracts/<int:league_id>', methods=['POST'])
 def reassign_contracts_route(league_id):
-    """Reassign all player contracts to fit under salary cap"""
+    """Reassign all player contracts to fit under salary cap (?dry_run=1 returns the proposed payroll table without writing)"""
     conn = get_db_connection()
 
+    if request.args.get('dry_run', type=int):
+        result = reassign_league_contracts(conn, league_id, dry_run=True)
+        conn.close()
+        return jsonify(result)
+
     result = reassign_league_contracts(conn, league_id)
+    page_cache.bump(conn, league_id)
 
     conn.close()
 
@@ -890,6 +1144,7 @@ def depth_chart():
             cur.execute("UPDATE league_players SET rotation_order=%s WHERE player_id=%s AND team_id=%s", (idx+1, pid, user_team_id))
         conn.commit()
         cur.close()
+        page_cache.bump_for_team(conn, user_team_id)
         conn.close()
         return jsonify({'success': True})
     cur.execute("SELECT l.* FROM leagues l JOIN league_teams t ON t.league_id=l.league_id WHERE t.team_id=%s", (user_team_id,))
@@ -950,6 +1205,7 @@ def update_trade_status():
     cur.execute("UPDATE league_players SET trade_status = %s WHERE player_id = %s", (data['status'], data['player_id']))
     conn.commit()
     cur.close()
+    page_cache.bump(conn, page_cache.league_for(conn, "SELECT league_id FROM league_players WHERE player_id = %s", data['player_id']))
     conn.close()
     return jsonify({'success': True})
 
@@ -972,11 +1228,13 @@ def propose_trade():
     user_total_value = 0; partner_total_value = 0
     user_salary_out = 0; partner_salary_out = 0
     assets_received_names = []
+    traded_players = {}
     
     for asset in user_assets:
         if asset['type'] == 'player':
             cur.execute("SELECT * FROM league_players WHERE player_id=%s", (asset['id'],))
             p = cur.fetchone()
+            traded_players[asset['id']] = p
             user_total_value += get_player_trade_value(p)
             user_salary_out += float(p['salary_amount'])
         elif asset['type'] == 'pick':
@@ -992,6 +1250,7 @@ def propose_trade():
         if asset['type'] == 'player':
             cur.execute("SELECT * FROM league_players WHERE player_id=%s", (asset['id'],))
             p = cur.fetchone()
+            traded_players[asset['id']] = p
             partner_total_value += get_player_trade_value(p)
             partner_salary_out += float(p['salary_amount'])
             if p['overall_rating'] > max_partner_ovr: max_partner_ovr = p['overall_rating']
@@ -1022,16 +1281,25 @@ def propose_trade():
         decision = "accepted"
         message = "Trade Accepted!"
         for asset in user_assets:
-            if asset['type'] == 'player': cur.execute("UPDATE league_players SET team_id=%s WHERE player_id=%s", (partner_team_id, asset['id']))
+            if asset['type'] == 'player':
+                cur.execute("UPDATE league_players SET team_id=%s WHERE player_id=%s", (partner_team_id, asset['id']))
+                roster_cache.move_player(cur, league_id, int(asset['id']), partner_team_id)
+                p = traded_players[asset['id']]
+                move_contract(cur, p['salary_amount'], p['contract_years'], user_team_id, partner_team_id)
             elif asset['type'] == 'pick': cur.execute("UPDATE league_draft_picks SET owner_team_id=%s WHERE pick_id=%s", (partner_team_id, asset['id']))
         for asset in partner_assets:
-            if asset['type'] == 'player': cur.execute("UPDATE league_players SET team_id=%s WHERE player_id=%s", (user_team_id, asset['id']))
+            if asset['type'] == 'player':
+                cur.execute("UPDATE league_players SET team_id=%s WHERE player_id=%s", (user_team_id, asset['id']))
+                roster_cache.move_player(cur, league_id, int(asset['id']), user_team_id)
+                p = traded_players[asset['id']]
+                move_contract(cur, p['salary_amount'], p['contract_years'], partner_team_id, user_team_id)
             elif asset['type'] == 'pick': cur.execute("UPDATE league_draft_picks SET owner_team_id=%s WHERE pick_id=%s", (user_team_id, asset['id']))
         
         asset_str = ", ".join(assets_received_names) if assets_received_names else "Salary dump"
         desc = f"Traded for: {asset_str}"
         cur.execute("INSERT INTO league_transactions (league_id, team_id, description, transaction_type) VALUES (%s, %s, %s, 'trade')", (league_id, user_team_id, desc))
         conn.commit()
+        page_cache.bump(conn, league_id)
     else:
         gap = int((partner_total_value * threshold) - user_total_value)
         message = f"Offer too low. Gap: {gap} pts."
@@ -1076,7 +1344,7 @@ def free_agency():
     cur.execute("SELECT * FROM leagues l JOIN league_teams t ON l.league_id=t.league_id WHERE t.team_id=%s", (user_team_id,))
     league = cur.fetchone()
     cap_space, used_cap = calculate_cap_space(conn, user_team_id, league['salary_cap'])
-    cur.execute("SELECT * FROM league_players WHERE team_id IS NULL ORDER BY overall_rating DESC")
+    cur.execute("SELECT * FROM league_players WHERE league_id = %s AND team_id IS NULL ORDER BY overall_rating DESC", (league['league_id'],))
     free_agents = cur.fetchall()
     for p in free_agents: p['asking_price'] = get_player_asking_price(p)
     cur.close()
@@ -1109,9 +1377,12 @@ def negotiate():
         decision = "accepted"
         message = "Deal! Player signed."
         cur.execute("UPDATE league_players SET team_id = %s, salary_amount = %s WHERE player_id = %s", (user_team_id, offer_amount, player_id))
+        roster_cache.move_player(cur, league_id, int(player_id), user_team_id)
+        apply_contract(cur, user_team_id, offer_amount, player['contract_years'])
         desc = f"Signed {player['first_name']} {player['last_name']} for ${offer_amount/1000000:.2f}M"
         cur.execute("INSERT INTO league_transactions (league_id, team_id, description, transaction_type) VALUES (%s, %s, %s, 'signing')", (league_id, user_team_id, desc))
         conn.commit()
+        page_cache.bump(conn, league_id)
     elif ratio >= 0.85:
         decision = "counter"
         counter = int(asking_price * 0.95)
@@ -1135,7 +1406,7 @@ def finances():
         WHERE t.team_id = %s
     """, (user_team_id,))
     league = cur.fetchone()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
     cur.execute("SELECT * FROM league_teams WHERE team_id = %s", (user_team_id,))
     team = cur.fetchone()
@@ -1150,16 +1421,16 @@ def finances():
     """, (user_team_id,))
     roster = cur.fetchall()
     
+    committed = get_team_payroll(conn, user_team_id)
     outlook = {
-        'current': {'year': '2025', 'cap': league_cap, 'committed': 0},
-        'year_2':  {'year': '2026', 'cap': league_cap * 1.05, 'committed': 0},
-        'year_3':  {'year': '2027', 'cap': league_cap * 1.10, 'committed': 0},
-        'year_4':  {'year': '2028', 'cap': league_cap * 1.15, 'committed': 0}
+        'current': {'year': '2025', 'cap': league_cap, 'committed': committed[0]},
+        'year_2':  {'year': '2026', 'cap': league_cap * 1.05, 'committed': committed[1]},
+        'year_3':  {'year': '2027', 'cap': league_cap * 1.10, 'committed': committed[2]},
+        'year_4':  {'year': '2028', 'cap': league_cap * 1.15, 'committed': committed[3]}
     }
     
     for p in roster:
         salary = float(p['salary_amount'])
-        years = p['contract_years']
         p['salary_fmt'] = "${:,.2f}M".format(salary / 1000000)
         p['asking_price'] = get_player_asking_price(p)
         
@@ -1169,11 +1440,6 @@ def finances():
         else: p['target_years'] = 1
         p['target_contract_fmt'] = "${:.1f}M / {} Yrs".format(p['asking_price']/1000000, p['target_years'])
 
-        outlook['current']['committed'] += salary
-        if years >= 2: outlook['year_2']['committed'] += salary
-        if years >= 3: outlook['year_3']['committed'] += salary
-        if years >= 4: outlook['year_4']['committed'] += salary
-
     for k, v in outlook.items():
         v['space'] = v['cap'] - v['committed']
         v['pct'] = min(100, (v['committed'] / v['cap']) * 100)
@@ -1224,9 +1490,12 @@ def extend_player():
             message = "Agent: 'We accept! Great doing business.'"
             new_total_years = player['contract_years'] + offer_years
             cur.execute("UPDATE league_players SET contract_years = %s, salary_amount = %s WHERE player_id = %s", (new_total_years, offer_salary, player_id))
+            apply_contract(cur, player['team_id'], player['salary_amount'], player['contract_years'], sign=-1)
+            apply_contract(cur, player['team_id'], offer_salary, new_total_years)
             desc = f"Signed {player['last_name']} to {offer_years}yr extension (${offer_salary/1000000:.1f}M/yr)"
             cur.execute("INSERT INTO league_transactions (league_id, team_id, description, transaction_type) VALUES (%s, %s, %s, 'extension')", (player['league_id'], player['team_id'], desc))
             conn.commit()
+            page_cache.bump(conn, player['league_id'])
 
     cur.close()
     conn.close()
@@ -1237,39 +1506,80 @@ def extend_player():
 # ==========================================
 
 @app.route('/league_schedule/<int:league_id>')
+@page_cache.cached()
 def league_schedule(league_id):
+    """Page shell only - games are loaded a month at a time from /api/league/<id>/schedule."""
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
     cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
     league = cur.fetchone()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
-    cur.execute("""
-        SELECT s.*, th.abbrev as home_abv, th.name as home_name, ta.abbrev as away_abv, ta.name as away_name
-        FROM league_schedule s
-        JOIN league_teams th ON s.home_team_id = th.team_id
-        JOIN league_teams ta ON s.away_team_id = ta.team_id
-        WHERE s.league_id = %s ORDER BY s.year ASC, s.day_number ASC
-    """, (league_id,))
-    all_games = cur.fetchall()
+    cur.execute("SELECT DISTINCT date_trunc('month', game_date)::date AS month FROM league_schedule WHERE league_id = %s ORDER BY month", (league_id,))
+    months = [r['month'] for r in cur.fetchall()]
+    cur.execute("SELECT team_id, city, name FROM league_teams WHERE league_id = %s ORDER BY city", (league_id,))
+    teams = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    sim_month = league['sim_date'].replace(day=1)
+    current_month = sim_month if sim_month in months else (months[0] if months else sim_month)
+    return render_template('schedule.html', league=league, all_leagues=all_leagues, teams=teams,
+                           months=[m.strftime('%Y-%m') for m in months], current_month=current_month.strftime('%Y-%m'))
+
+@app.route('/api/league/<int:league_id>/schedule')
+@page_cache.cached()
+def api_league_schedule(league_id):
+    """One month of games (?month=YYYY-MM), optionally filtered by ?team=<id> and ?status=played|unplayed."""
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT sim_date FROM leagues WHERE league_id = %s", (league_id,))
+    league = cur.fetchone()
+    if not league:
+        cur.close(); conn.close()
+        return jsonify({'error': 'League not found'}), 404
     sim_date = league['sim_date']
-    month_map = {name: i for i, name in enumerate(calendar.month_name) if name}
-    schedule_by_month = defaultdict(list)
-    for g in all_games:
-        g['home_logo'] = get_team_logo(g['home_abv'])
-        g['away_logo'] = get_team_logo(g['away_abv'])
-        is_today = (g['day_of_month'] == sim_date.day and g['month_name'].strip() == sim_date.strftime('%B') and g['year'] == sim_date.year)
-        g['is_today'] = is_today
-        try:
-            g_month_num = month_map.get(g['month_name'].strip(), 1)
-            game_date = datetime.date(g['year'], g_month_num, g['day_of_month'])
-            if game_date < sim_date and not g['is_played']: g['status_label'] = 'Postponed'
-            else: g['status_label'] = 'Upcoming'
-        except: g['status_label'] = 'Upcoming'
-        schedule_by_month[f"{g['month_name']} {g['year']}"].append(g)
+
+    try:
+        month_start = datetime.datetime.strptime(request.args.get('month', ''), '%Y-%m').date()
+    except ValueError:
+        month_start = sim_date.replace(day=1)
+    next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+
+    filters = ["league_id = %s", "game_date >= %s", "game_date < %s"]
+    params = [league_id, month_start, next_month]
+    team_id = request.args.get('team', type=int)
+    if team_id:
+        filters.append("(home_team_id = %s OR away_team_id = %s)")
+        params += [team_id, team_id]
+    status = request.args.get('status')
+    if status == 'played': filters.append("is_played = TRUE")
+    elif status == 'unplayed': filters.append("is_played = FALSE")
+
+    cur.execute("""
+        SELECT game_id, game_date, home_team_id, away_team_id, home_score, away_score, is_played
+        FROM league_schedule
+        WHERE """ + " AND ".join(filters) + """
+        ORDER BY game_date, game_id
+    """, params)
+    rows = cur.fetchall()
+    cur.execute("SELECT team_id, abbrev, name FROM league_teams WHERE league_id = %s", (league_id,))
+    teams = {t['team_id']: {'abbrev': t['abbrev'], 'name': t['name'], 'logo': get_team_logo(t['abbrev'])} for t in cur.fetchall()}
     cur.close()
     conn.close()
-    return render_template('schedule.html', league=league, schedule_by_month=schedule_by_month, all_leagues=all_leagues)
+
+    games = []
+    for g in rows:
+        games.append({
+            'game_id': g['game_id'],
+            'date': g['game_date'].isoformat(),
+            'home': g['home_team_id'], 'away': g['away_team_id'],
+            'home_score': g['home_score'], 'away_score': g['away_score'],
+            'is_played': g['is_played'],
+            'is_today': g['game_date'] == sim_date,
+            'is_postponed': g['game_date'] < sim_date and not g['is_played'],
+        })
+    return jsonify({'month': month_start.strftime('%Y-%m'), 'teams': teams, 'games': games})
 
 @app.route('/team_schedule/<int:team_id>')
 def team_schedule(team_id):
@@ -1287,7 +1597,7 @@ def team_schedule(team_id):
     team['logo_url'] = get_team_logo(team['abbrev'])
     cur.execute("SELECT team_id, city, name FROM league_teams WHERE league_id = %s ORDER BY city", (league_id,))
     all_teams_list = cur.fetchall()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
     cur.execute("""
         SELECT s.*, th.abbrev as home_abv, th.name as home_name, ta.abbrev as away_abv, ta.name as away_name
@@ -1358,6 +1668,7 @@ def init_playoffs(league_id):
             series_id = cur.fetchone()['series_id']
             schedule_playoff_game(conn, league_id, series_id, high['team_id'], low['team_id'])
     conn.commit()
+    page_cache.bump(conn, league_id)
     return redirect(url_for('playoffs_view', league_id=league_id))
 
 def schedule_playoff_game(conn, league_id, series_id, home_id, away_id):
@@ -1365,9 +1676,9 @@ def schedule_playoff_game(conn, league_id, series_id, home_id, away_id):
     cur.execute("SELECT sim_date FROM leagues WHERE league_id=%s", (league_id,))
     sim_date = cur.fetchone()[0]
     cur.execute("""
-        INSERT INTO league_schedule (league_id, home_team_id, away_team_id, playoff_series_id, is_played, year, month_name, day_of_month)
-        VALUES (%s, %s, %s, %s, FALSE, %s, %s, %s)
-    """, (league_id, home_id, away_id, series_id, sim_date.year, sim_date.strftime('%B'), sim_date.day))
+        INSERT INTO league_schedule (league_id, home_team_id, away_team_id, playoff_series_id, is_played, year, month_name, day_of_month, game_date)
+        VALUES (%s, %s, %s, %s, FALSE, %s, %s, %s, %s)
+    """, (league_id, home_id, away_id, series_id, sim_date.year, sim_date.strftime('%B'), sim_date.day, sim_date))
     conn.commit()
 
 @app.route('/playoffs/<int:league_id>')
@@ -1376,7 +1687,7 @@ def playoffs_view(league_id):
     cur = conn.cursor(cursor_factory=RealDictCursor)
     cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
     league = cur.fetchone()
-    cur.execute("SELECT league_id, name FROM leagues ORDER BY created_at DESC")
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
     all_leagues = cur.fetchall()
 
     cur.execute("""
@@ -1456,9 +1767,11 @@ def sim_playoff_series(series_id):
 
     winner_id = series['team1_id'] if series['team1_wins'] == 4 else series['team2_id']
     cur.execute("UPDATE league_playoff_series SET winner_team_id = %s WHERE series_id = %s", (winner_id, series_id))
+    refresh_standings_snapshot(conn, league_id)
     conn.commit()
     
     check_advance_round(conn, league_id, series['round_num'], series['conference'])
+    page_cache.bump(conn, league_id)
     
     cur.close()
     conn.close()
@@ -1503,11 +1816,130 @@ def sim_single_playoff_game(series_id):
         cur.execute("UPDATE league_playoff_series SET winner_team_id=%s WHERE series_id=%s", (series['team2_id'], series_id))
         check_advance_round(conn, league_id, series['round_num'], series['conference'])
         
+    refresh_standings_snapshot(conn, league_id)
     conn.commit()
+    page_cache.bump(conn, league_id)
     cur.close()
     conn.close()
     return redirect(url_for('playoffs_view', league_id=league_id))
 
+def simulate_playoff_round(conn, league_id, round_num):
+    """
+    Sims every active series in a round at once. Series are played out in memory
+    (in parallel worker processes), then all games and series results are written
+    in a single transaction before the bracket is advanced.
+    """
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT * FROM league_playoff_series WHERE league_id = %s AND round_num = %s AND winner_team_id IS NULL ORDER BY series_id", (league_id, round_num))
+    active = [dict(s) for s in cur.fetchall()]
+    if not active:
+        cur.close()
+        return 0
+
+    series_ids = [s['series_id'] for s in active]
+    team_ids = [tid for s in active for tid in (s['team1_id'], s['team2_id'])]
+    all_players, strategies_db = roster_cache.game_context(cur, league_id, team_ids)
+    all_players = [dict(p) for p in all_players]
+    strategies_db = [dict(s) for s in strategies_db]
+
+    cur.execute("SELECT DISTINCT ON (playoff_series_id) playoff_series_id, game_id, home_team_id, away_team_id FROM league_schedule WHERE playoff_series_id = ANY(%s) AND is_played = FALSE ORDER BY playoff_series_id, game_id", (series_ids,))
+    pending = {g['playoff_series_id']: dict(g) for g in cur.fetchall()}
+
+    # 1. Play every series in memory
+    jobs = [(s, all_players, strategies_db, pending.get(s['series_id']), random.getrandbits(64)) for s in active]
+    if len(jobs) > 1 and PLAYOFF_WORKERS > 1:
+        try:
+            results = list(get_series_executor().map(simulate_series, *zip(*jobs)))
+        except (OSError, RuntimeError) as e:  # BrokenProcessPool is a RuntimeError
+            print(f"Parallel playoff sim unavailable ({e}), running serially")
+            reset_series_executor()
+            results = [simulate_series(*job) for job in jobs]
+    else:
+        results = [simulate_series(*job) for job in jobs]
+
+    # 2. Reserve ids for the games that still need a schedule row; a series plays one game
+    #    a day from the league date, so its i-th game of this round is dated i days later
+    new_games = [(r['series_id'], i, g) for r in results for i, g in enumerate(r['games']) if g[0] is None]
+    game_ids = []
+    if new_games:
+        cur.execute("SELECT nextval(pg_get_serial_sequence('league_schedule', 'game_id')) AS game_id FROM generate_series(1, %s)", (len(new_games),))
+        game_ids = [row['game_id'] for row in cur.fetchall()]
+
+        cur.execute("SELECT sim_date FROM leagues WHERE league_id = %s", (league_id,))
+        sim_date = cur.fetchone()['sim_date']
+        schedule_data = []
+        for gid, (sid, i, g) in zip(game_ids, new_games):
+            game_date = sim_date + datetime.timedelta(days=i)
+            schedule_data.append((gid, league_id, g[1], g[2], sid, False, game_date.year, game_date.strftime('%B'), game_date.day, game_date))
+        args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in schedule_data)
+        cur.execute("INSERT INTO league_schedule (game_id, league_id, home_team_id, away_team_id, playoff_series_id, is_played, year, month_name, day_of_month, game_date) VALUES " + args_str)
+
+    # 3. Write every game and series result in one transaction
+    id_iter = iter(game_ids)
+    all_games = []
+    for r in results:
+        for game_id, home, away, result in r['games']:
+            all_games.append((game_id if game_id is not None else next(id_iter), home, away, result))
+    save_game_results(cur, league_id, all_games)
+
+    refresh_standings_snapshot(conn, league_id)
+
+    series_data = [(r['series_id'], r['team1_wins'], r['team2_wins'], r['winner_team_id']) for r in results]
+    args_str = ','.join(cur.mogrify("(%s,%s,%s,%s)", x).decode('utf-8') for x in series_data)
+    cur.execute("""
+        UPDATE league_playoff_series s
+        SET team1_wins = v.t1, team2_wins = v.t2, winner_team_id = v.winner
+        FROM (VALUES """ + args_str + """) AS v(series_id, t1, t2, winner)
+        WHERE s.series_id = v.series_id
+    """)
+    conn.commit()
+
+    # 4. Advance the bracket once for the round (conference finals pair up across conferences)
+    conferences = sorted({s['conference'] for s in active})
+    if round_num == 3: conferences = conferences[:1]
+    for conf in conferences:
+        check_advance_round(conn, league_id, round_num, conf)
+    conn.commit()
+    cur.close()
+    page_cache.bump(conn, league_id)
+    return len(results)
+
+def simulate_remaining_playoffs(conn, league_id):
+    """
+    Sims round after round until a champion is crowned. Stops with a RuntimeError if a
+    pass leaves the same round unresolved, instead of looping on a stuck bracket.
+    """
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    previous = None
+    while True:
+        cur.execute("SELECT MIN(round_num) AS round_num FROM league_playoff_series WHERE league_id = %s AND winner_team_id IS NULL", (league_id,))
+        round_num = cur.fetchone()['round_num']
+        if round_num is None: break
+        if round_num == previous:
+            cur.close()
+            raise RuntimeError(f"Playoff round {round_num} of league {league_id} is still unresolved after a full pass")
+        simulate_playoff_round(conn, league_id, round_num)
+        previous = round_num
+    cur.close()
+
+@app.route('/sim_playoff_round/<int:league_id>/<int:round_num>', methods=['POST'])
+def sim_playoff_round(league_id, round_num):
+    conn = get_db_connection()
+    simulate_playoff_round(conn, league_id, round_num)
+    conn.close()
+    return redirect(url_for('playoffs_view', league_id=league_id))
+
+@app.route('/sim_entire_playoffs/<int:league_id>', methods=['POST'])
+def sim_entire_playoffs(league_id):
+    conn = get_db_connection()
+    try:
+        simulate_remaining_playoffs(conn, league_id)
+    except RuntimeError as e:
+        conn.close()
+        return str(e), 409
+    conn.close()
+    return redirect(url_for('playoffs_view', league_id=league_id))
+
 def check_advance_round(conn, league_id, round_num, conference):
     cur = conn.cursor(cursor_factory=RealDictCursor)
     cur.execute("SELECT COUNT(*) as active FROM league_playoff_series WHERE league_id=%s AND round_num=%s AND conference=%s AND winner_team_id IS NULL", (league_id, round_num, conference))
@@ -1546,6 +1978,18 @@ def create_series(conn, league_id, round_num, conf, t1, t2):
     schedule_playoff_game(conn, league_id, sid, t1, t2)
     conn.commit()
 
+@app.route('/advance_season/<int:league_id>', methods=['POST'])
+def advance_season_route(league_id):
+    conn = get_db_connection()
+    try:
+        advance_season(conn, league_id)
+    except ValueError as e:
+        conn.close()
+        return str(e), 400
+    page_cache.bump(conn, league_id)
+    conn.close()
+    return redirect(url_for('league_dashboard', league_id=league_id))
+
 @app.route('/league_history/<int:league_id>')
 def league_history(league_id):
     year = request.args.get('year') # Optional query param
@@ -1581,6 +2025,21 @@ def league_history(league_id):
     champion = cur.fetchone()
     if champion: champion['logo_url'] = get_team_logo(champion['abbrev'])
 
+    # 4. Season Leaders (archived regular-season lines)
+    cur.execute("""
+        SELECT s.player_id, p.first_name, p.last_name, t.abbrev, s.games,
+               ROUND(s.points::numeric / s.games, 1) as ppg,
+               ROUND(s.rebounds::numeric / s.games, 1) as rpg,
+               ROUND(s.assists::numeric / s.games, 1) as apg
+        FROM league_player_season_stats s
+        JOIN league_players p ON s.player_id = p.player_id
+        LEFT JOIN league_teams t ON s.team_id = t.team_id
+        WHERE s.league_id = %s AND s.season_year = %s AND NOT s.playoffs AND s.games > 0
+        ORDER BY s.points::numeric / s.games DESC
+        LIMIT 10
+    """, (league_id, selected_year))
+    leaders = cur.fetchall()
+
     # Format Standings
     formatted_standings = {'East': [], 'West': []}
     for t in standings_raw:
@@ -1589,7 +2048,19 @@ def league_history(league_id):
         
     cur.close()
     conn.close()
-    return render_template('league_history.html', league=league, seasons=seasons, selected_year=selected_year, standings=formatted_standings, champion=champion)
+    return render_template('league_history.html', league=league, seasons=seasons, selected_year=selected_year, standings=formatted_standings, champion=champion, leaders=leaders)
+
+@app.route('/records/<int:league_id>')
+@page_cache.cached()
+def league_records(league_id):
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
+    league = cur.fetchone()
+    cur.close()
+    records = records_book(conn, league_id)
+    conn.close()
+    return render_template('records.html', league=league, records=records)
 
 @app.route('/champions_history/<int:league_id>')
 def champions_history(league_id):
@@ -1614,5 +2085,127 @@ def champions_history(league_id):
     conn.close()
     return render_template('champions_history.html', league=league, champs=champs)
 
+# ==========================================
+# 12. JSON API: DASHBOARD PANELS
+# ==========================================
+
+LEADER_CATEGORIES = {'points': 'PPG', 'rebounds': 'RPG', 'assists': 'APG'}
+
+@app.route('/api/league/<int:league_id>/standings')
+@page_cache.cached()
+def api_league_standings(league_id):
+    data = fetch_concurrently({
+        'league': ("SELECT user_team_id FROM leagues WHERE league_id = %s", (league_id,)),
+        'teams': lambda conn: get_standings_snapshot(conn, league_id),
+    })
+    if not data['league']: return jsonify({'error': 'League not found'}), 404
+    user_team_id = data['league'][0]['user_team_id']
+
+    standings = {'East': defaultdict(list), 'West': defaultdict(list)}
+    for t in data['teams']:
+        if t['conference'] not in standings: continue
+        standings[t['conference']][t['division']].append({
+            'team_id': t['team_id'], 'city': t['city'], 'name': t['name'], 'logo': get_team_logo(t['abbrev']),
+            'wins': t['wins'], 'losses': t['losses'], 'gb': t['gb'],
+            'streak': f"{t['streak_type']}{t['streak_length']}" if t['streak_length'] > 0 else "-",
+            'l5': f"{t['last5_wins']}-{t['last5_losses']}",
+            'is_user': t['team_id'] == user_team_id,
+        })
+    return jsonify(standings)
+
+@app.route('/api/league/<int:league_id>/today')
+@page_cache.cached()
+def api_league_today(league_id):
+    conn = get_read_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("""
+        SELECT s.game_id, th.abbrev as home_abv, th.name as home_name, ta.abbrev as away_abv, ta.name as away_name,
+               s.home_score, s.away_score, s.is_played
+        FROM league_schedule s
+        JOIN leagues l ON l.league_id = s.league_id
+        JOIN league_teams th ON s.home_team_id = th.team_id
+        JOIN league_teams ta ON s.away_team_id = ta.team_id
+        WHERE s.league_id = %s AND s.game_date = l.sim_date
+        ORDER BY s.game_id
+    """, (league_id,))
+    games = cur.fetchall()
+    cur.close()
+    release_read_connection(conn)
+    for g in games:
+        g['home_logo'] = get_team_logo(g['home_abv'])
+        g['away_logo'] = get_team_logo(g['away_abv'])
+    return jsonify(games)
+
+@app.route('/api/league/<int:league_id>/leaders')
+@page_cache.cached()
+def api_league_leaders(league_id):
+    tasks = {}
+    for stat in LEADER_CATEGORIES:
+        tasks[stat] = ("""
+            SELECT p.player_id, p.first_name, p.last_name, t.abbrev, t.team_id,
+                   ROUND(AVG(b.""" + stat + """)::numeric, 1) AS value
+            FROM league_box_scores b
+            JOIN league_players p ON b.player_id = p.player_id
+            JOIN league_teams t ON p.team_id = t.team_id
+            WHERE b.league_id = %s
+            GROUP BY p.player_id, t.team_id
+            ORDER BY value DESC LIMIT 5
+        """, (league_id,))
+    data = fetch_concurrently(tasks)
+    leaders = []
+    for stat, label in LEADER_CATEGORIES.items():
+        rows = [{'player_id': r['player_id'], 'name': f"{r['first_name'][0]}. {r['last_name']}",
+                 'team_id': r['team_id'], 'logo': get_team_logo(r['abbrev']), 'value': float(r['value'])}
+                for r in data[stat]]
+        leaders.append({'category': stat, 'label': label, 'players': rows})
+    return jsonify(leaders)
+
+@app.route('/api/league/<int:league_id>/transactions')
+@page_cache.cached()
+def api_league_transactions(league_id):
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    conn = get_read_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("""
+        SELECT tr.description, tr.transaction_type, tr.created_at, t.team_id, t.abbrev
+        FROM league_transactions tr
+        JOIN league_teams t ON tr.team_id = t.team_id
+        WHERE tr.league_id = %s
+        ORDER BY tr.created_at DESC LIMIT %s
+    """, (league_id, limit))
+    transactions = cur.fetchall()
+    cur.close()
+    release_read_connection(conn)
+    return jsonify([{'team_id': t['team_id'], 'logo': get_team_logo(t['abbrev']), 'type': t['transaction_type'],
+                     'description': t['description'], 'date': t['created_at'].strftime('%b %d')}
+                    for t in transactions])
+
+# ==========================================
+# 13. ADMIN: SIMULATION METRICS
+# ==========================================
+
+def admin_authorized():
+    """Admin pages need ADMIN_TOKEN (as ?token= or an X-Admin-Token header); without it set they are off."""
+    expected = os.environ.get('ADMIN_TOKEN')
+    given = request.args.get('token') or request.headers.get('X-Admin-Token') or ''
+    return bool(expected) and hmac.compare_digest(given.encode('utf-8'), expected.encode('utf-8'))
+
+@app.route('/admin/sim_metrics')
+def admin_sim_metrics():
+    """Sim throughput per league and engine mode (percentiles) plus each league's recent days."""
+    if not admin_authorized(): abort(404)
+    days = min(max(request.args.get('days', 14, type=int), 1), 365)
+    conn = get_db_connection()
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    summary = metrics_summary(cur, days)
+    charts = league_charts(cur, days)
+    cur.execute("SELECT league_id, name FROM leagues WHERE deleted_at IS NULL ORDER BY created_at DESC")
+    all_leagues = cur.fetchall()
+    cur.close()
+    conn.close()
+    names = {row['league_id']: row['name'] for row in summary}
+    return render_template('admin_sim_metrics.html', summary=summary, charts=charts, names=names, days=days,
+                           token=request.args.get('token', ''), all_leagues=all_leagues, league=None)
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -47,10 +47,7 @@ def archive_current_season():
         champ_team = cur.fetchone()
         print(f"Champion Detected: {champ_team['city']} {champ_team['name']}")
     else:
-        print("Warning: Could not automatically detect a Finals winner.")
-        user_input = input("Enter the Team ID of the Champion (or press Enter to skip): ")
-        if user_input.isdigit():
-            champion_id = int(user_input)
+        print("Warning: Could not automatically detect a Finals winner. Skipping champion record.")
 
     # 3. Insert Champion History
     if champion_id:
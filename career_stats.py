@@ -0,0 +1,138 @@
+"""
+Historical stats: season lines, careers and the records book.
+
+Everything here is built once per season at rollover, while that season's box
+scores are still in the hot table:
+  - league_player_season_stats  one row per player per season
+  - league_player_careers       running career totals (upserted from the season lines)
+  - league_single_game_records  the best single-game lines per category, trimmed to RECORD_DEPTH
+Multi-season questions then read these small tables and never scan league_box_scores.
+
+Season lines are split into the regular season and the playoffs (games with a
+playoff_series_id). Careers, season records and single-game records count the
+regular season only.
+"""
+from psycopg2.extras import RealDictCursor
+
+CATEGORIES = {'points': 'Points', 'rebounds': 'Rebounds', 'assists': 'Assists', 'threes_made': '3-Pointers',
+              'steals': 'Steals', 'blocks': 'Blocks'}
+STAT_COLUMNS = ['minutes', 'points', 'rebounds', 'offensive_rebounds', 'assists', 'steals', 'blocks', 'turnovers',
+                'fg_made', 'fg_attempts', 'threes_made', 'threes_attempts', 'ft_made', 'ft_attempts', 'fouls']
+RECORD_DEPTH = 10
+SEASON_RECORD_MIN_GAMES = 20
+
+def record_season(cur, league_id, season_year):
+    """Folds a finished season into the season lines, careers and single-game records. Does not commit."""
+    stat_cols = ", ".join(STAT_COLUMNS)
+    params = {'league_id': league_id, 'season_year': season_year}
+
+    cur.execute(f"""
+        INSERT INTO league_player_season_stats (league_id, season_year, player_id, playoffs, team_id, games, {stat_cols})
+        SELECT b.league_id, %(season_year)s, b.player_id, s.playoff_series_id IS NOT NULL,
+               (ARRAY_AGG(b.team_id ORDER BY b.game_id DESC))[1], COUNT(*), {", ".join(f"SUM(b.{c})" for c in STAT_COLUMNS)}
+        FROM league_box_scores b
+        JOIN league_schedule s ON s.game_id = b.game_id
+        WHERE b.league_id = %(league_id)s
+        GROUP BY b.league_id, b.player_id, s.playoff_series_id IS NOT NULL
+        ON CONFLICT (player_id, season_year, playoffs) DO NOTHING
+    """, params)
+
+    # Careers only move forward: a season already folded in (last_season) is never added twice
+    cur.execute(f"""
+        INSERT INTO league_player_careers (player_id, league_id, seasons, games, {stat_cols}, last_season)
+        SELECT player_id, league_id, 1, games, {stat_cols}, season_year
+        FROM league_player_season_stats
+        WHERE league_id = %(league_id)s AND season_year = %(season_year)s AND NOT playoffs
+        ON CONFLICT (player_id) DO UPDATE SET
+            seasons = league_player_careers.seasons + 1,
+            games = league_player_careers.games + EXCLUDED.games,
+            {", ".join(f"{c} = league_player_careers.{c} + EXCLUDED.{c}" for c in STAT_COLUMNS)},
+            last_season = EXCLUDED.last_season
+        WHERE league_player_careers.last_season < EXCLUDED.last_season
+    """, params)
+
+    for category in CATEGORIES:
+        cur.execute(f"""
+            INSERT INTO league_single_game_records (league_id, category, value, player_id, team_id, game_id, season_year)
+            SELECT b.league_id, %(category)s, b.{category}, b.player_id, b.team_id, b.game_id, %(season_year)s
+            FROM league_box_scores b
+            JOIN league_schedule s ON s.game_id = b.game_id
+            WHERE b.league_id = %(league_id)s AND s.playoff_series_id IS NULL
+              AND NOT EXISTS (SELECT 1 FROM league_single_game_records r
+                              WHERE r.league_id = %(league_id)s AND r.season_year = %(season_year)s AND r.category = %(category)s)
+            ORDER BY b.{category} DESC, b.game_id
+            LIMIT %(depth)s
+        """, {**params, 'category': category, 'depth': RECORD_DEPTH})
+
+    # Keep only the top RECORD_DEPTH lines per category across all seasons
+    cur.execute("""
+        DELETE FROM league_single_game_records
+        WHERE record_id IN (
+            SELECT record_id FROM (
+                SELECT record_id, ROW_NUMBER() OVER (PARTITION BY category ORDER BY value DESC, season_year, game_id) AS rn
+                FROM league_single_game_records
+                WHERE league_id = %s
+            ) ranked
+            WHERE rn > %s
+        )
+    """, (league_id, RECORD_DEPTH))
+
+def career_leaders(conn, league_id, category, limit=10):
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(f"""
+        SELECT c.player_id, p.first_name, p.last_name, t.abbrev, c.seasons, c.games, c.{category} AS total,
+               ROUND(c.{category}::numeric / NULLIF(c.games, 0), 1) AS per_game
+        FROM league_player_careers c
+        JOIN league_players p ON c.player_id = p.player_id
+        LEFT JOIN league_teams t ON p.team_id = t.team_id
+        WHERE c.league_id = %s
+        ORDER BY c.{category} DESC
+        LIMIT %s
+    """, (league_id, limit))
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+def season_records(conn, league_id, category, limit=10):
+    """Best per-game averages in a single regular season (min SEASON_RECORD_MIN_GAMES games)."""
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute(f"""
+        SELECT s.player_id, s.season_year, p.first_name, p.last_name, t.abbrev, s.games, s.{category} AS total,
+               ROUND(s.{category}::numeric / s.games, 1) AS per_game
+        FROM league_player_season_stats s
+        JOIN league_players p ON s.player_id = p.player_id
+        LEFT JOIN league_teams t ON s.team_id = t.team_id
+        WHERE s.league_id = %s AND NOT s.playoffs AND s.games >= %s
+        ORDER BY s.{category}::numeric / s.games DESC
+        LIMIT %s
+    """, (league_id, SEASON_RECORD_MIN_GAMES, limit))
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+def single_game_records(conn, league_id, category, limit=10):
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("""
+        SELECT r.value, r.game_id, r.season_year, p.first_name, p.last_name, t.abbrev
+        FROM league_single_game_records r
+        JOIN league_players p ON r.player_id = p.player_id
+        LEFT JOIN league_teams t ON r.team_id = t.team_id
+        WHERE r.league_id = %s AND r.category = %s
+        ORDER BY r.value DESC, r.season_year, r.game_id
+        LIMIT %s
+    """, (league_id, category, limit))
+    rows = cur.fetchall()
+    cur.close()
+    return rows
+
+def records_book(conn, league_id, limit=10):
+    """Career, season and single-game leaderboards for every category."""
+    return {
+        category: {
+            'label': label,
+            'career': career_leaders(conn, league_id, category, limit),
+            'season': season_records(conn, league_id, category, limit),
+            'game': single_game_records(conn, league_id, category, limit),
+        }
+        for category, label in CATEGORIES.items()
+    }
@@ -1,209 +1,364 @@
-import random
+"""
+Fast statistical game engine.
+
+Instead of playing possessions it samples games from distributions fitted to
+the detailed engine (simulation.simulate_game):
+  1. Possessions: total ~ Normal around 2880 / average seconds per possession,
+     where the seconds depend on each team's offense_focus. Split between the
+     teams like the detailed engine's coin flip.
+  2. Efficiency: points per possession ~ Normal around a linear fit on the same
+     quantities the detailed engine plays with: expected shot value (shooting vs
+     guarding, with the strategy bonuses), turnover odds and offensive rebound
+     share.
+  3. Box score: team points are split into threes, twos and free throws, the
+     other team totals are drawn from the fitted rates, and every total is handed
+     out to players with one multinomial draw over minutes x usage x the relevant
+     rating. Player points always add up to the team score, and quarter scores
+     to the final.
+
+Games are simulated in batches (a whole day at once): every step works on
+(team side x roster slot) NumPy arrays. A game costs about 0.1 ms, 12-15x less
+than the detailed engine; close to half of that is building the per-player stat
+dicts that save_game_results shares with the detailed engine.
+
+The fitted constants live in fast_simulation_calibration.json. Refit after
+changing the detailed engine:
+    python fast_simulation.py calibrate [games] [seed]
+"""
 import json
+import os
+import sys
+from functools import lru_cache
+from itertools import chain, repeat
+from operator import itemgetter
+import numpy as np
 from psycopg2.extras import RealDictCursor
+from simulation import load_game_context, save_game_results, matchup_table
+
+CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fast_simulation_calibration.json')
+DEFAULT_CALIBRATION_GAMES = 20000
+PACE_CLASSES = ['pace', 'slow', 'other']
+RATINGS = ['usage_rating', 'inside_shooting', 'outside_shooting', 'ft_shooting', 'passing',
+           'speed', 'guarding', 'stealing', 'blocking', 'rebounding']
+# Team totals handed out to players (one multinomial row each)
+SHARES = ['three_made', 'two_made', 'ft_made', 'three_missed', 'two_missed', 'ft_missed',
+          'to', 'ast', 'oreb', 'dreb', 'stl', 'blk', 'pf']
+COUNT_KEYS = ['pts','reb','oreb','ast','stl','blk','to','fgm','fga','3pm','3pa','ftm','fta','pf','pm']
+STAT_KEYS = COUNT_KEYS + ['min']
+DEFAULT_STRATEGY = {'offense_focus': 'balanced', 'defense_focus': 'balanced', 'bench_minutes': 'normal'}
+ROTATION_SLOTS = 10  # 5 starters + 5 bench; deeper players never get minutes
+BENCH_LIMIT_MINUTE = {'heavy': 9.0, 'deep': 4.0, 'load_manage': 4.0}  # as in the detailed engine's rotation
+
+_calibration = None
+_rng = None
+_rng_pid = None
+
+def load_calibration():
+    global _calibration
+    if _calibration is None:
+        with open(CALIBRATION_PATH) as f:
+            _calibration = json.load(f)
+    return _calibration
+
+def get_rng():
+    """One generator per process (forked workers must not share a stream)."""
+    global _rng, _rng_pid
+    if _rng is None or _rng_pid != os.getpid():
+        _rng, _rng_pid = np.random.default_rng(), os.getpid()
+    return _rng
+
+def pace_class(strat):
+    return strat['offense_focus'] if strat['offense_focus'] in ('pace', 'slow') else 'other'
+
+# ---------------------------------------------------------
+# 1. SIDES (rating arrays)
+# ---------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def rotation_minutes(count, bench_setting):
+    """Expected minutes per roster slot from the detailed engine's rotation rules."""
+    bench_minutes = 2 * (12 - BENCH_LIMIT_MINUTE.get(bench_setting, 6.0))
+    minutes = [0.0] * count
+    starters = list(range(min(5, count)))
+    bench = list(range(5, min(ROTATION_SLOTS, count)))
+    bench += starters[:5 - len(bench)]  # short bench: starters cover (as in the detailed engine)
+    for i in starters: minutes[i] += 48 - bench_minutes
+    for i in bench: minutes[i] += bench_minutes
+    return tuple(minutes)
+
+def build_sides(matchups, all_players, strategies_db):
+    """
+    Stacks both teams of every game as 'sides' (home = 2g, away = 2g + 1), with each
+    rotation (the players who get minutes) padded to the same length, so each step
+    is one array operation.
+    """
+    by_team = {}
+    for row in all_players:
+        by_team.setdefault(row['team_id'], []).append(row)
+    strategies = {s['team_id']: s for s in strategies_db}
+
+    team_ids = [tid for game in matchups for tid in game]
+    strats = [strategies.get(tid, DEFAULT_STRATEGY) for tid in team_ids]
+    rosters = [by_team.get(tid, [])[:ROTATION_SLOTS] for tid in team_ids]
+    width = max([len(r) for r in rosters] + [1])
+
+    minutes = np.zeros((len(rosters), width))
+    for s, roster in enumerate(rosters):
+        if roster: minutes[s, :len(roster)] = rotation_minutes(len(roster), strats[s].get('bench_minutes', 'normal'))
+    # Ratings of every rotation player in one flat read, then scattered into the padded slots
+    values = np.fromiter(chain.from_iterable(map(itemgetter(*RATINGS), chain.from_iterable(rosters))), float)
+    ratings = np.zeros((len(rosters), width, len(RATINGS)))
+    ratings[minutes > 0] = values.reshape(-1, len(RATINGS))
+
+    sides = {k: ratings[:, :, i] for i, k in enumerate(RATINGS)}
+    sides.update(team_ids=team_ids, rosters=rosters, strategies=strats, minutes=minutes,
+                 floor=minutes / 48.0, opp=np.arange(len(rosters)) ^ 1)
+    sides['shots'] = sides['floor'] * sides['usage_rating']
+    return sides
+
+def floor_average(sides, key):
+    return (sides[key] * sides['floor']).sum(axis=1) / 5.0
+
+def shooting_model(sides):
+    """Three-point rate and make probabilities per slot against the opposing defense (detailed engine formulas)."""
+    offense = np.array([s['offense_focus'] for s in sides['strategies']])
+    defense = np.array([s['defense_focus'] for s in sides['strategies']])[sides['opp']]
+    guarding = floor_average(sides, 'guarding')[sides['opp']]
+
+    three_rate = sides['outside_shooting'] / 200.0 + np.select([offense == '3pt', offense == 'paint'], [0.20, -0.15], 0.0)[:, None]
+    guard_two = guarding + np.where(defense == 'paint', 15, 0)
+    guard_three = guarding + np.where(defense == 'perimeter', 15, 0)
+    two_pct = 45 + (sides['inside_shooting'] - guard_two[:, None] * 0.5) * 0.2 + np.where(offense == 'paint', 5, 0)[:, None]
+    three_pct = 45 + (sides['outside_shooting'] - guard_three[:, None] * 0.5) * 0.2
+    return np.clip(three_rate, 0.0, 1.0), np.clip(two_pct / 100.0, 0.01, 0.99), np.clip(three_pct / 100.0, 0.01, 0.99)
+
+def side_features(sides):
+    """
+    Inputs to the efficiency fit per side: [1, expected shot value, turnover odds,
+    offensive rebound share], plus the matchup odds (same formulas as the detailed engine).
+    """
+    three_rate, two_pct, three_pct = shooting_model(sides)
+    shots = sides['shots']
+    shot_value = (shots * (three_rate * three_pct * 3 + (1 - three_rate) * two_pct * 2)).sum(axis=1) / np.maximum(shots.sum(axis=1), 1e-9)
 
-def run_fast_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
+    units = [{'avg_passing': pas, 'avg_stealing': stl, 'avg_speed': spd, 'rebound_total': 5 * reb}
+             for pas, stl, spd, reb in zip(*(floor_average(sides, k).tolist() for k in ['passing', 'stealing', 'speed', 'rebounding']))]
+    odds = [matchup_table(units[s], units[o], sides['strategies'][o]) for s, o in enumerate(sides['opp'].tolist())]
+    odds = {k: np.array([o[k] for o in odds]) for k in ['turnover', 'steal', 'offensive_rebound']}
+    X = np.column_stack([np.ones(len(shot_value)), shot_value, odds['turnover'], odds['offensive_rebound']])
+    return X, odds, (three_rate, two_pct, three_pct)
+
+# ---------------------------------------------------------
+# 2. GAME SAMPLING
+# ---------------------------------------------------------
+
+def attempts_for(rng, makes, pct):
+    """Attempts needed for `makes` successes at pct (negative binomial misses)."""
+    return makes + np.where(makes > 0, rng.negative_binomial(np.maximum(makes, 1), pct), 0)
+
+def success_rate(made_weights, attempt_weights):
+    return np.clip(made_weights.sum(axis=1) / np.maximum(attempt_weights.sum(axis=1), 1e-9), 0.01, 0.99)
+
+def simulate_fast_games(matchups, all_players, strategies_db, rng=None):
+    """
+    Samples a batch of games [(home_team_id, away_team_id)] and returns one result
+    per game in the same shape as simulate_game, so save_game_results writes both
+    engines' games the same way. Rosters list the players who got minutes, each as
+    {'player_id', 'stats'}; there is no play-by-play or win probability curve.
+    """
+    if not matchups: return []
+    rng = rng or get_rng()
+    calibration = load_calibration()
+    sides = build_sides(matchups, all_players, strategies_db)
+    opp, floor, shots = sides['opp'], sides['floor'], sides['shots']
+    X, odds, (three_rate, two_pct, three_pct) = side_features(sides)
+
+    # 1. Possessions (per game, split by coin flip like the detailed engine)
+    seconds = np.array([calibration['seconds_per_possession'][pace_class(s)] for s in sides['strategies']])
+    mean_total = 2880 / seconds.reshape(-1, 2).mean(axis=1)
+    total = np.maximum(2, np.rint(rng.normal(mean_total, calibration['possession_sd_share'] * mean_total))).astype(int)
+    home = rng.binomial(total, 0.5)
+    possessions = np.column_stack([home, total - home]).ravel()
+
+    # 2. Efficiency -> points
+    ppp = X @ np.array(calibration['ppp_coefficients']) + rng.normal(0, calibration['ppp_sd'], len(possessions))
+    points = np.maximum(0, np.rint(ppp * possessions)).astype(int)
+
+    # 3. Team totals: free throws, then field goals as threes + twos (points stay exact)
+    two_weights = shots * (1 - three_rate) * two_pct
+    three_weights = shots * three_rate * three_pct
+    ft_pct = np.clip(sides['ft_shooting'] / 100.0, 0.01, 0.99)
+    ft_points = rng.binomial(points, calibration['ft_point_share'])
+    fg_points = points - ft_points
+    three_share = three_weights.sum(axis=1) * 3 / np.maximum(three_weights.sum(axis=1) * 3 + two_weights.sum(axis=1) * 2, 1e-9)
+    threes = np.minimum(fg_points // 3, np.rint(fg_points * three_share / 3).astype(int))
+    odd = (fg_points - 3 * threes) % 2 == 1
+    moved = odd & (threes == 0)  # 1 point and no room for a three: make it a free throw
+    threes -= odd & (threes > 0)
+    fg_points -= moved
+    ft_points += moved
+    twos = (fg_points - 3 * threes) // 2
+
+    three_missed = attempts_for(rng, threes, success_rate(three_weights, shots * three_rate)) - threes
+    two_missed = attempts_for(rng, twos, success_rate(two_weights, shots * (1 - three_rate))) - twos
+    ft_missed = attempts_for(rng, ft_points, success_rate(shots * ft_pct, shots)) - ft_points
+
+    chances = rng.binomial(three_missed + two_missed + ft_missed, calibration['rebound_share'])
+    oreb = rng.binomial(chances, odds['offensive_rebound'])
+    turnovers = rng.binomial(possessions, odds['turnover'])
+    block_pct = (np.clip((sides['blocking'] - 20) * 0.004, 0.02, 0.3) * floor).sum(axis=1) / 5.0
+    totals = {
+        'three_made': threes, 'two_made': twos, 'ft_made': ft_points,
+        'three_missed': three_missed, 'two_missed': two_missed, 'ft_missed': ft_missed,
+        'to': turnovers,
+        'ast': rng.binomial(threes + twos, calibration['assist_share']),
+        'oreb': oreb,
+        'dreb': (chances - oreb)[opp],  # the other side's misses this side rebounded
+        'stl': rng.binomial(turnovers[opp], odds['steal'][opp]),
+        'blk': rng.binomial(two_missed[opp], block_pct),
+        'pf': rng.poisson(calibration['fouls_per_game'], len(points)),
+    }
+
+    # 4. One multinomial for every (side, total): who gets each made shot, miss, rebound...
+    weights = {
+        'three_made': three_weights, 'two_made': two_weights, 'ft_made': shots * ft_pct,
+        'three_missed': shots * three_rate * (1 - three_pct), 'two_missed': shots * (1 - three_rate) * (1 - two_pct),
+        'ft_missed': shots * (1 - ft_pct), 'to': shots,
+        'ast': floor * sides['passing'], 'oreb': floor * sides['rebounding'], 'dreb': floor * sides['rebounding'],
+        'stl': floor * sides['stealing'], 'blk': floor * sides['blocking'], 'pf': floor * (100 - sides['guarding']),
+    }
+    W = np.stack([weights[k] for k in SHARES], axis=1)
+    sums = W.sum(axis=2, keepdims=True)
+    P = np.where(sums > 0, W / np.where(sums > 0, sums, 1), 1.0 / W.shape[2])
+    N = np.stack([totals[k] for k in SHARES], axis=1) * (sums[:, :, 0] > 0)
+    shares = dict(zip(SHARES, np.moveaxis(rng.multinomial(N, P), 1, 0)))
+
+    margin = points - points[opp]
+    box = {
+        'pts': 3 * shares['three_made'] + 2 * shares['two_made'] + shares['ft_made'],
+        'fgm': shares['three_made'] + shares['two_made'],
+        'fga': shares['three_made'] + shares['two_made'] + shares['three_missed'] + shares['two_missed'],
+        '3pm': shares['three_made'], '3pa': shares['three_made'] + shares['three_missed'],
+        'ftm': shares['ft_made'], 'fta': shares['ft_made'] + shares['ft_missed'],
+        'reb': shares['oreb'] + shares['dreb'], 'oreb': shares['oreb'], 'ast': shares['ast'],
+        'stl': shares['stl'], 'blk': shares['blk'], 'to': shares['to'], 'pf': shares['pf'],
+        'pm': np.rint(floor * margin[:, None]).astype(int),
+    }
+    # Stat lines of the whole batch at once: one column per stat over every rotation slot
+    # (padding dropped), zipped into dicts; each side then takes its next len(roster) lines
+    played = sides['minutes'] > 0
+    columns = [box[k][played].tolist() for k in COUNT_KEYS] + [sides['minutes'][played].tolist()]
+    lines = map(dict, map(zip, repeat(STAT_KEYS), zip(*columns)))
+    quarters = rng.multinomial(points, [0.25] * 4).tolist()
+    rosters = [[{'player_id': row['player_id'], 'stats': stats} for row, stats in zip(roster, lines)]
+               for roster in sides['rosters']]
+
+    scores = points.tolist()
+    results = []
+    for g, (home_team_id, away_team_id) in enumerate(matchups):
+        h, a = 2 * g, 2 * g + 1
+        results.append({
+            'score': {home_team_id: scores[h], away_team_id: scores[a]},
+            'quarter_scores': {home_team_id: quarters[h], away_team_id: quarters[a]},
+            'margins': [],
+            'win_prob': b'',
+            'event_log': b'',
+            'rosters': {home_team_id: rosters[h], away_team_id: rosters[a]},
+        })
+    return results
+
+def simulate_fast_game(home_team_id, away_team_id, all_players, strategies_db, rng=None):
+    return simulate_fast_games([(home_team_id, away_team_id)], all_players, strategies_db, rng)[0]
+
+def run_fast_simulations(conn, league_id, games):
     """
     Fast simulation that generates realistic stats without possession-by-possession detail.
-    10-20x faster than full simulation.
+    Plays a batch of scheduled games (dicts with game_id, home_team_id, away_team_id) in one
+    pass and writes them in one transaction.
     """
+    if not games: return
     cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    # ---------------------------------------------------------
-    # 1. FETCH PLAYERS
-    # ---------------------------------------------------------
-    cur.execute("""
-        SELECT * FROM league_players
-        WHERE team_id IN (%s, %s) AND league_id = %s
-        ORDER BY overall_rating DESC
-    """, (home_team_id, away_team_id, league_id))
-    all_players = cur.fetchall()
-
-    rosters = {home_team_id: [], away_team_id: []}
-    for p in all_players:
-        rosters[p['team_id']].append(p)
-
-    # ---------------------------------------------------------
-    # 2. CALCULATE TEAM RATINGS
-    # ---------------------------------------------------------
-    def get_team_rating(roster):
-        """Calculate overall team strength"""
-        if not roster:
-            return 70
-        # Weight by top 8 players (rotation)
-        top_players = roster[:8]
-        return sum(p['overall_rating'] for p in top_players) / len(top_players)
-
-    home_rating = get_team_rating(rosters[home_team_id])
-    away_rating = get_team_rating(rosters[away_team_id])
-
-    # Home court advantage
-    home_rating += 3
-
-    # ---------------------------------------------------------
-    # 3. GENERATE FINAL SCORE
-    # ---------------------------------------------------------
-    # Base score around 105-115 range
-    base_score = 110
-    rating_factor = 0.4  # How much rating affects score
-
-    home_score = int(base_score + (home_rating - 75) * rating_factor + random.randint(-8, 8))
-    away_score = int(base_score + (away_rating - 75) * rating_factor + random.randint(-8, 8))
-
-    # Ensure home score is slightly higher on average
-    if random.random() < 0.52:  # 52% home win rate
-        home_score = max(home_score, away_score + random.randint(1, 5))
-
-    # Clamp scores to reasonable range
-    home_score = max(85, min(135, home_score))
-    away_score = max(85, min(135, away_score))
-
-    # Quarter scores (roughly distributed)
-    def distribute_quarters(total_score):
-        q1 = int(total_score * random.uniform(0.22, 0.28))
-        q2 = int(total_score * random.uniform(0.22, 0.28))
-        q3 = int(total_score * random.uniform(0.22, 0.28))
-        q4 = total_score - q1 - q2 - q3
-        return [q1, q2, q3, q4]
-
-    home_quarters = distribute_quarters(home_score)
-    away_quarters = distribute_quarters(away_score)
-
-    # ---------------------------------------------------------
-    # 4. GENERATE PLAYER STATS
-    # ---------------------------------------------------------
-    def generate_player_stats(roster, team_score, team_id):
-        """Distribute team stats to players based on ratings"""
-        if not roster:
-            return []
-
-        stats_list = []
-        remaining_points = team_score
-
-        # Sort by overall rating
-        players = sorted(roster, key=lambda x: x['overall_rating'], reverse=True)
-
-        for i, p in enumerate(players[:10]):  # Top 10 players get minutes
-            # Minutes distribution (starters get more)
-            if i < 5:  # Starters
-                minutes = random.randint(32, 38)
-            elif i < 8:  # Bench
-                minutes = random.randint(15, 25)
-            else:  # Deep bench
-                minutes = random.randint(5, 15)
-
-            # Points based on rating and usage
-            usage_factor = p['usage_rating'] / 100.0
-            rating_factor = p['overall_rating'] / 80.0
-
-            if i == 0:  # Star player
-                points = int(team_score * random.uniform(0.20, 0.30))
-            elif i < 3:  # Key players
-                points = int(team_score * random.uniform(0.12, 0.20))
-            elif i < 5:  # Starters
-                points = int(team_score * random.uniform(0.05, 0.12))
-            else:  # Bench
-                points = int(team_score * random.uniform(0.02, 0.08))
-
-            remaining_points -= points
-
-            # Generate other stats based on position and ratings
-            # Rebounds
-            if p['position'] in ['C', 'PF']:
-                rebounds = int(minutes * random.uniform(0.25, 0.40))
-            elif p['position'] == 'SF':
-                rebounds = int(minutes * random.uniform(0.15, 0.25))
-            else:
-                rebounds = int(minutes * random.uniform(0.08, 0.15))
-
-            # Assists
-            if p['position'] == 'PG':
-                assists = int(minutes * random.uniform(0.15, 0.30))
-            elif p['position'] in ['SG', 'SF']:
-                assists = int(minutes * random.uniform(0.08, 0.15))
-            else:
-                assists = int(minutes * random.uniform(0.03, 0.10))
-
-            # Shooting stats
-            fg_attempts = int(points * random.uniform(0.8, 1.2))
-            fg_made = int(fg_attempts * (p['inside_shooting'] + p['outside_shooting']) / 200.0)
-
-            threes_attempts = int(fg_attempts * (p['outside_shooting'] / 150.0))
-            threes_made = int(threes_attempts * random.uniform(0.30, 0.45))
-
-            ft_attempts = int(points * random.uniform(0.15, 0.30))
-            ft_made = int(ft_attempts * (p['ft_shooting'] / 100.0))
-
-            stats_list.append({
-                'player_id': p['player_id'],
-                'team_id': team_id,
-                'minutes': minutes,
-                'points': max(0, points),
-                'rebounds': max(0, rebounds),
-                'assists': max(0, assists),
-                'fg_made': max(0, fg_made),
-                'fg_attempts': max(0, fg_attempts),
-                'threes_made': max(0, threes_made),
-                'threes_attempts': max(0, threes_attempts),
-                'ft_made': max(0, ft_made),
-                'ft_attempts': max(0, ft_attempts),
-                'fouls': random.randint(0, 5)
-            })
-
-        return stats_list
-
-    home_stats = generate_player_stats(rosters[home_team_id], home_score, home_team_id)
-    away_stats = generate_player_stats(rosters[away_team_id], away_score, away_team_id)
-
-    # ---------------------------------------------------------
-    # 5. SAVE TO DATABASE
-    # ---------------------------------------------------------
-
-    # Update game result
-    cur.execute("""
-        UPDATE league_schedule
-        SET home_score=%s, away_score=%s, is_played=TRUE,
-            home_q1=%s, home_q2=%s, home_q3=%s, home_q4=%s,
-            away_q1=%s, away_q2=%s, away_q3=%s, away_q4=%s
-        WHERE game_id=%s
-    """, (home_score, away_score,
-          home_quarters[0], home_quarters[1], home_quarters[2], home_quarters[3],
-          away_quarters[0], away_quarters[1], away_quarters[2], away_quarters[3],
-          game_id))
-
-    # Insert box scores (bulk)
-    all_stats = home_stats + away_stats
-    if all_stats:
-        box_score_data = []
-        for s in all_stats:
-            box_score_data.append((
-                league_id, game_id, s['team_id'], s['player_id'], s['minutes'],
-                s['points'], s['rebounds'], s['assists'], s['fg_made'], s['fg_attempts'],
-                s['threes_made'], s['threes_attempts'], s['ft_made'], s['ft_attempts'], s['fouls']
-            ))
-
-        args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in box_score_data)
-        cur.execute("INSERT INTO league_box_scores (league_id, game_id, team_id, player_id, minutes, points, rebounds, assists, fg_made, fg_attempts, threes_made, threes_attempts, ft_made, ft_attempts, fouls) VALUES " + args_str)
-
-    # Update standings
-    winner = home_team_id if home_score > away_score else away_team_id
-    loser = away_team_id if winner == home_team_id else home_team_id
-
-    cur.execute("""
-        UPDATE league_teams
-        SET wins = wins + 1,
-            streak_length = CASE WHEN streak_type='W' THEN streak_length + 1 ELSE 1 END,
-            streak_type = 'W'
-        WHERE team_id = %s
-    """, (winner,))
-
-    cur.execute("""
-        UPDATE league_teams
-        SET losses = losses + 1,
-            streak_length = CASE WHEN streak_type='L' THEN streak_length + 1 ELSE 1 END,
-            streak_type = 'L'
-        WHERE team_id = %s
-    """, (loser,))
-
+    team_ids = {tid for g in games for tid in (g['home_team_id'], g['away_team_id'])}
+    all_players, strategies_db = load_game_context(cur, league_id, team_ids)
+    results = simulate_fast_games([(g['home_team_id'], g['away_team_id']) for g in games], all_players, strategies_db)
+    save_game_results(cur, league_id, [(g['game_id'], g['home_team_id'], g['away_team_id'], r) for g, r in zip(games, results)])
     conn.commit()
     cur.close()
+
+def run_fast_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
+    run_fast_simulations(conn, league_id, [{'game_id': game_id, 'home_team_id': home_team_id, 'away_team_id': away_team_id}])
+
+# ---------------------------------------------------------
+# OFFLINE CALIBRATION
+# ---------------------------------------------------------
+
+def calibrate(games=DEFAULT_CALIBRATION_GAMES, seed=0):
+    """Plays `games` detailed games with random rosters and strategies and fits the constants above."""
+    import random
+    from simulation import simulate_game
+    from win_probability import synthetic_roster
+
+    rng = random.Random(seed)
+    random.seed(seed)
+    offense_options = ['balanced', '3pt', 'paint', 'pace', 'slow']
+    defense_options = ['balanced', 'pressure', 'paint', 'perimeter']
+    bench_options = ['normal', 'heavy', 'deep']
+    matchups, players, strategies = [], [], []
+    ppp, possessions = [], []
+    totals = {k: 0 for k in ['pts', 'ftm', 'fgm', 'ast', 'reb', 'misses', 'pf']}
+    for g in range(games):
+        home_id, away_id = 2 * g + 1, 2 * g + 2
+        home_strength = rng.uniform(0.8, 1.2)
+        teams = {home_id: synthetic_roster(home_id, home_strength, rng),
+                 away_id: synthetic_roster(away_id, home_strength + rng.uniform(-0.3, 0.3), rng)}
+        strats = [{'team_id': tid, 'offense_focus': rng.choice(offense_options), 'defense_focus': rng.choice(defense_options),
+                   'bench_minutes': rng.choice(bench_options)} for tid in teams]
+        result = simulate_game(home_id, away_id, teams[home_id] + teams[away_id], strats)
+        matchups.append((home_id, away_id))
+        players += teams[home_id] + teams[away_id]
+        strategies += strats
+
+        game_possessions = 0
+        for tid in teams:
+            t = {k: sum(p['stats'][k] for p in result['rosters'][tid]) for k in ['fga', 'fgm', 'fta', 'ftm', 'oreb', 'to', 'ast', 'reb', 'pf']}
+            team_possessions = t['fga'] + 0.44 * t['fta'] - t['oreb'] + t['to']
+            game_possessions += team_possessions
+            ppp.append(result['score'][tid] / team_possessions)
+            totals['pts'] += result['score'][tid]
+            totals['misses'] += t['fga'] - t['fgm'] + t['fta'] - t['ftm']
+            for k in ['ftm', 'fgm', 'ast', 'reb', 'pf']: totals[k] += t[k]
+        possessions.append(game_possessions)
+        if (g + 1) % 5000 == 0: print(f"  {g + 1}/{games} games")
+
+    sides = build_sides(matchups, players, strategies)
+    X, _, _ = side_features(sides)
+    y = np.array(ppp)
+    coefficients, *_ = np.linalg.lstsq(X, y, rcond=None)
+
+    pace_rows = np.zeros((games, len(PACE_CLASSES)))
+    for s, strat in enumerate(sides['strategies']):
+        pace_rows[s // 2, PACE_CLASSES.index(pace_class(strat))] += 0.5
+    possessions = np.array(possessions)
+    seconds, *_ = np.linalg.lstsq(pace_rows, 2880 / possessions, rcond=None)
+    predicted = 2880 / (pace_rows @ seconds)
+    return {
+        'games': games,
+        'ppp_coefficients': [round(float(c), 6) for c in coefficients],
+        'ppp_sd': round(float(np.std(y - X @ coefficients)), 6),
+        'seconds_per_possession': {c: round(float(s), 4) for c, s in zip(PACE_CLASSES, seconds)},
+        'possession_sd_share': round(float(np.std(possessions / predicted - 1)), 6),
+        'ft_point_share': round(totals['ftm'] / totals['pts'], 6),
+        'assist_share': round(totals['ast'] / totals['fgm'], 6),
+        'rebound_share': round(totals['reb'] / totals['misses'], 6),
+        'fouls_per_game': round(totals['pf'] / (2 * games), 3),
+    }
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'calibrate':
+        games = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CALIBRATION_GAMES
+        seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+        print(f"=== CALIBRATING FAST ENGINE ({games} detailed games) ===")
+        calibration = calibrate(games, seed)
+        with open(CALIBRATION_PATH, 'w') as f:
+            json.dump(calibration, f, indent=2)
+        print(json.dumps(calibration, indent=2))
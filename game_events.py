@@ -0,0 +1,86 @@
+"""
+Compact play-by-play.
+
+The engine records each logged play as EVENT_WIDTH integers (event code,
+quarter, seconds left in the quarter, player ids, FT makes, score) into a
+preallocated ring buffer. No strings are built during the game. A game's log
+is stored as one little-endian int32 blob (league_schedule.event_log), and the
+descriptions are only rendered when a box score page asks for them.
+"""
+import array
+import sys
+
+EVENT_FIELDS = ['code', 'quarter', 'clock', 'player', 'other', 'detail', 'score_home', 'score_away']
+EVENT_WIDTH = len(EVENT_FIELDS)
+MAX_EVENTS = 1024  # a game has well under 500 possessions; past this the oldest plays are dropped
+
+# code: (event_type, description template). player = shooter / ball handler / fouled-out
+# player, other = assister (0 if none), blocker, fouler or stealer, detail = free throws made.
+MADE_TWO, MADE_THREE, MISSED, BLOCKED, AND_ONE, FOULED_TWO, FOULED_THREE, TURNOVER, STOLEN, FOUL_OUT = range(1, 11)
+EVENTS = {
+    MADE_TWO: ('SHOT', "{player} made 2pt shot"),
+    MADE_THREE: ('SHOT', "{player} made 3pt shot"),
+    MISSED: ('SHOT', "{player} missed shot"),
+    BLOCKED: ('SHOT', "{player} blocked by {other}"),
+    AND_ONE: ('SHOT', "{player} made shot AND fouled by {other}! (FT: {detail}/1)"),
+    FOULED_TWO: ('SHOT', "{player} fouled by {other} on shot. (FT: {detail}/2)"),
+    FOULED_THREE: ('SHOT', "{player} fouled by {other} on shot. (FT: {detail}/3)"),
+    TURNOVER: ('TO', "{player} turnover"),
+    STOLEN: ('TO', "{other} stole the ball from {player}"),
+    FOUL_OUT: ('FOUL', "{player} fouled out (6 PF)"),
+}
+
+class EventLog:
+    """Fixed-capacity ring buffer of EVENT_WIDTH-int plays."""
+    __slots__ = ('buffer', 'capacity', 'count')
+
+    def __init__(self, capacity=MAX_EVENTS):
+        self.buffer = [0] * (capacity * EVENT_WIDTH)
+        self.capacity = capacity
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def record(self, code, quarter, clock, player, other, detail, score_home, score_away):
+        offset = (self.count % self.capacity) * EVENT_WIDTH
+        self.buffer[offset:offset + EVENT_WIDTH] = (code, quarter, clock, player, other, detail, score_home, score_away)
+        self.count += 1
+
+    def encode(self):
+        """The logged plays, oldest first, as a little-endian int32 blob."""
+        end = len(self) * EVENT_WIDTH
+        start = (self.count % self.capacity) * EVENT_WIDTH if self.count > self.capacity else 0
+        values = array.array('i', self.buffer[start:end] + self.buffer[:start])
+        if sys.byteorder == 'big': values.byteswap()
+        return values.tobytes()
+
+def decode(blob):
+    """Stored blob -> list of EVENT_WIDTH-int tuples."""
+    if not blob: return []
+    values = array.array('i')
+    values.frombytes(bytes(blob))
+    if sys.byteorder == 'big': values.byteswap()
+    return [tuple(values[i:i + EVENT_WIDTH]) for i in range(0, len(values), EVENT_WIDTH)]
+
+def render(blob, names):
+    """
+    Stored blob -> play-by-play rows in the shape of league_game_events
+    (quarter, time_remaining, description, score_home, score_away, event_type).
+    names maps player_id -> display name.
+    """
+    rows = []
+    for code, quarter, clock, player, other, detail, score_home, score_away in decode(blob):
+        event_type, template = EVENTS[code]
+        description = template.format(player=names.get(player, 'Unknown'), other=names.get(other, 'Unknown'), detail=detail)
+        if code in (MADE_TWO, MADE_THREE) and other:
+            description += f" (Ast: {names.get(other, 'Unknown')})"
+        rows.append({
+            'quarter': quarter,
+            'time_remaining': f"{clock // 60}:{clock % 60:02d}",
+            'description': description,
+            'score_home': score_home,
+            'score_away': score_away,
+            'event_type': event_type,
+        })
+    return rows
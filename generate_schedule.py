@@ -1,118 +1,167 @@
-import random
+"""
+Season schedule generator.
+
+Builds a balanced schedule in one pass:
+  1. Rounds: the circle method gives n-1 perfect matchings (every team plays once per
+     round). Every other full cycle is the return leg of the one before, so those pairs
+     meet home and away; otherwise the team with fewer home games hosts.
+  2. Days: each round is split across two consecutive game days, about half each.
+     Rested teams fill the first day; a game whose team played the day before (a
+     back-to-back) only goes there while that team is under MAX_BACK_TO_BACKS. No team
+     ever plays twice in a day, and the All-Star break is skipped.
+
+Usable from the app (generate_schedule / insert_schedule) or from the command line,
+which rebuilds the quick start schedule for a scenario directly in the database:
+    python generate_schedule.py [scenario_id] [seed]
+"""
 import datetime
+import random
+from collections import Counter
+
+GAMES_PER_TEAM = 82
+MAX_BACK_TO_BACKS = 14
+ALL_STAR_BREAK = ((2, 14), 6)  # (month, day) the break starts, and its length in days
 
-# 1. Define Teams (IDs 1-30)
-teams = list(range(1, 31))
+def build_rounds(team_ids, games_per_team, rng):
+    """Returns a list of rounds, each a list of (home, away) with no team twice."""
+    teams = list(team_ids)
+    rng.shuffle(teams)
+    if len(teams) % 2: teams.append(None)  # bye
+    n = len(teams)
+    if n < 2: return []
 
-# ---------------------------------------------------------
-# 2. GENERATE MATCHUPS (1230 Total Games / 82 per team)
-# ---------------------------------------------------------
-matchups = []
+    base_rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            a, b = teams[i], teams[n - 1 - i]
+            if a is not None and b is not None:
+                pairs.append((a, b) if (r + i) % 2 == 0 else (b, a))
+        base_rounds.append(pairs)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
 
-# A. Round Robin: Everyone plays everyone twice (Home & Away)
-# 30 teams * 29 opponents = 870 games
-for t1 in teams:
-    for t2 in teams:
-        if t1 != t2:
-            matchups.append((t1, t2))
+    played = Counter()
+    home_games = Counter()
+    previous_home = {}  # pair -> who hosted it last cycle
+    rounds = []
+    cycle = 0
+    while min(played[t] for t in team_ids) < games_per_team:
+        scheduled = sum(played.values())
+        order = list(range(n - 1))
+        rng.shuffle(order)
+        full_cycle = all(played[t] + (n - 1) <= games_per_team for t in team_ids)
+        for r in order:
+            games = []
+            for home, away in base_rounds[r]:
+                if played[home] >= games_per_team or played[away] >= games_per_team: continue
+                pair = frozenset((home, away))
+                if cycle % 2 and full_cycle:
+                    # Return leg of the previous cycle
+                    if previous_home.get(pair) == home: home, away = away, home
+                elif home_games[away] < home_games[home]:
+                    home, away = away, home
+                previous_home[pair] = home
+                games.append((home, away))
+                played[home] += 1; played[away] += 1
+                home_games[home] += 1
+            if games: rounds.append(games)
+        cycle += 1
+        if sum(played.values()) == scheduled: break  # remaining teams have no available opponents
+    return rounds
 
-# B. Fill remaining games to reach 82 per team
-# We need 360 more games (1230 total - 870 existing).
-# We add 12 extra games per team (6 home, 6 away against randoms).
-extra_games_per_team = 12
-for _ in range(extra_games_per_team // 2): # Divide by 2 because adding a pair adds 1 game for TWO teams
-    random.shuffle(teams)
-    # Pair them up: (Team 0 vs Team 1), (Team 2 vs Team 3), etc.
-    for k in range(0, 30, 2):
-        t1 = teams[k]
-        t2 = teams[k+1]
-        # Randomize home/away for these extras
-        if random.random() > 0.5:
-            matchups.append((t1, t2))
-        else:
-            matchups.append((t2, t1))
+def game_days(start_date):
+    """Yields playable dates from start_date on, skipping the All-Star break."""
+    (month, day), length = ALL_STAR_BREAK
+    break_start = datetime.date(start_date.year + 1, month, day)
+    break_end = break_start + datetime.timedelta(days=length)
+    d = start_date
+    while True:
+        if break_start <= d < break_end: d = break_end
+        yield d
+        d += datetime.timedelta(days=1)
 
-# Shuffle the entire pool so the season isn't ordered by ID
-random.shuffle(matchups)
+def generate_schedule(team_ids, start_date=datetime.date(2024, 10, 22), games_per_team=GAMES_PER_TEAM, seed=None):
+    """Returns [(game_date, home_team_id, away_team_id)] in date order."""
+    rng = random.Random(seed)
+    team_ids = list(team_ids)
+    days = game_days(start_date)
+    last_played = {}
+    back_to_backs = Counter()
+    schedule = []
 
-# ---------------------------------------------------------
-# 3. ASSIGN DATES (The "Bucket" Logic)
-# ---------------------------------------------------------
-start_date = datetime.date(2024, 10, 22)
-end_date_limit = datetime.date(2025, 6, 1) # Just a safety backstop
-current_date = start_date
+    for pairs in build_rounds(team_ids, games_per_team, rng):
+        first_day = next(days)
+        second_day = next(days)
+        yesterday = first_day - datetime.timedelta(days=1)
+        capacity = (len(pairs) + 1) // 2
+        rested = [g for g in pairs if last_played.get(g[0]) != yesterday and last_played.get(g[1]) != yesterday]
+        first, second = rested[:capacity], rested[capacity:]
+        for home, away in pairs:
+            tired = [t for t in (home, away) if last_played.get(t) == yesterday]
+            if not tired: continue
+            if len(first) < capacity and all(back_to_backs[t] < MAX_BACK_TO_BACKS for t in tired):
+                first.append((home, away))
+                for t in tired: back_to_backs[t] += 1
+            else:
+                second.append((home, away))
+        for day, games in ((first_day, first), (second_day, second)):
+            for home, away in games:
+                last_played[home] = last_played[away] = day
+                schedule.append((day, home, away))
+    return schedule
 
-sql_lines = []
-sql_lines.append("-- SCHEDULE TEMPLATE (2024-25 Balanced)")
-sql_lines.append("DELETE FROM quick_start_schedule;") 
+def schedule_rows(league_id, schedule):
+    """Expands (date, home, away) into league_schedule column tuples."""
+    if not schedule: return []
+    start = schedule[0][0]
+    day_numbers = {}
+    rows = []
+    for d, home, away in schedule:
+        day_numbers.setdefault(d, len(day_numbers) + 1)
+        rows.append((league_id, (d - start).days // 7 + 1, day_numbers[d], d.strftime("%A"), d.strftime("%B"),
+                     d.day, d.year, d, home, away))
+    return rows
 
-# We will process the 'matchups' list until it is empty.
-# On each "Game Day", we try to schedule as many games as possible (max 15)
-# without repeating a team.
-game_queue = matchups[:] # Copy of list
+def insert_schedule(cur, league_id, schedule):
+    """Bulk-loads a generated schedule into league_schedule (one statement). Does not commit."""
+    rows = schedule_rows(league_id, schedule)
+    if not rows: return 0
+    args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in rows)
+    cur.execute("INSERT INTO league_schedule (league_id, week_number, day_number, day_of_week, month_name, day_of_month, year, game_date, home_team_id, away_team_id) VALUES " + args_str)
+    return len(rows)
 
-while len(game_queue) > 0 and current_date < end_date_limit:
-    
-    # --- Check All-Star Break ---
-    # If we hit Feb 14, jump to Feb 20
-    if current_date == datetime.date(2025, 2, 14):
-        current_date = datetime.date(2025, 2, 20)
+def populate_quick_start_schedule(conn, scenario_id=1, seed=None):
+    """Rebuilds quick_start_schedule for a scenario from its teams."""
+    cur = conn.cursor()
+    cur.execute("SELECT qs_team_id FROM quick_start_teams WHERE scenario_id = %s ORDER BY qs_team_id", (scenario_id,))
+    team_ids = [row[0] for row in cur.fetchall()]
+    schedule = generate_schedule(team_ids, seed=seed)
+    rows = [(scenario_id,) + row[1:7] + row[8:] for row in schedule_rows(scenario_id, schedule)]
 
-    # --- Daily Scheduling ---
-    todays_games = []
-    teams_playing_today = set()
-    
-    # Temporary list for games we can't schedule today (because teams are busy)
-    next_queue = []
-    
-    # Iterate through the queue and grab valid games for today
-    for home, away in game_queue:
-        # If we have 15 games, the day is full (all 30 teams playing)
-        if len(todays_games) >= 15:
-            next_queue.append((home, away))
-            continue
-            
-        # Check if teams are already booked today
-        if home not in teams_playing_today and away not in teams_playing_today:
-            todays_games.append((home, away))
-            teams_playing_today.add(home)
-            teams_playing_today.add(away)
-        else:
-            # Conflict: One of these teams plays today already. 
-            # Push to next queue.
-            next_queue.append((home, away))
-    
-    # Update the main queue to be the remaining games
-    game_queue = next_queue
-    
-    # --- Generate SQL for Today's Games ---
-    if todays_games:
-        day_of_week = current_date.strftime("%A")
-        month = current_date.strftime("%B")
-        day_num = (current_date - start_date).days + 1
-        week_num = int((current_date - start_date).days / 7) + 1
-        
-        for home, away in todays_games:
-            val_str = f"(1, {week_num}, {day_num}, '{day_of_week}', '{month}', {current_date.day}, {current_date.year}, {home}, {away})"
-            sql_lines.append(f"INSERT INTO quick_start_schedule (scenario_id, week_number, day_number, day_of_week, month_name, day_of_month, year, home_qs_team_id, away_qs_team_id) VALUES {val_str};")
-            
-    # --- Advance Date ---
-    # "Day On, Day Off" cadence.
-    # We increment by 2 days. 
-    # (Exception: If we are near the end and have very few games left, we might just fill days)
-    if len(game_queue) < 50:
-        current_date += datetime.timedelta(days=1) # Speed up end of season
-    else:
-        current_date += datetime.timedelta(days=2) # Standard cadence
+    cur.execute("DELETE FROM quick_start_schedule WHERE scenario_id = %s", (scenario_id,))
+    if rows:
+        args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in rows)
+        cur.execute("INSERT INTO quick_start_schedule (scenario_id, week_number, day_number, day_of_week, month_name, day_of_month, year, home_qs_team_id, away_qs_team_id) VALUES " + args_str)
+    conn.commit()
+    cur.close()
+    return len(rows)
 
-# ---------------------------------------------------------
-# 4. WRITE TO FILE
-# ---------------------------------------------------------
-output_file = 'populate_schedule.sql'
-with open(output_file, 'w') as f:
-    f.write("\n".join(sql_lines))
+if __name__ == '__main__':
+    import os
+    import sys
+    import psycopg2
+    from dotenv import load_dotenv
 
-print(f"Success! Balanced schedule created at: {output_file}")
-print(f"Total Games Scheduled: {1230 - len(game_queue)}")
-if len(game_queue) > 0:
-    print(f"Warning: {len(game_queue)} games could not be scheduled within date limit.")
\ No newline at end of file
+    load_dotenv()
+    scenario_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    conn = psycopg2.connect(
+        dbname=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host=os.getenv('DB_HOST'),
+        sslmode='require'
+    )
+    count = populate_quick_start_schedule(conn, scenario_id, seed)
+    conn.close()
+    print(f"Success! Scheduled {count} games for scenario {scenario_id}.")
@@ -0,0 +1,182 @@
+"""
+Quick start roster importer.
+
+Reads the player sheet (Excel or CSV) once, maps team abbreviations, derives every
+rating with vectorized pandas, and syncs quick_start_players for a scenario in one
+transaction: rows are COPYed into a temp table, existing players (same team + name)
+are updated in place, new ones inserted and missing ones removed.
+
+The parsed sheet is cached as Parquet next to the source, so re-imports skip
+the slow Excel parse until the source file changes.
+
+Usage:  python import_quickstart.py ["2024 Players.xlsx"] [scenario_id]
+"""
+from dotenv import load_dotenv
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+import psycopg2
+
+load_dotenv()
+
+DEFAULT_SOURCE = '2024 Players.xlsx'
+REQUIRED_COLUMNS = ['NAME', 'TEAM', 'POS', 'AGE']
+STAT_DEFAULTS = {'PpG': 10, 'RpG': 3, 'ApG': 2, 'SpG': 0.7, 'BpG': 0.5,
+                 'FT%': 0.75, '2P%': 0.45, '3P%': 0.35, 'USG%': 20}
+MIN_SALARY = 1000000  # the bottom salary tier goes negative below 50 overall
+
+# Spreadsheet / legacy abbreviations -> canonical code (same aliases get_team_logo accepts)
+TEAM_ALIASES = {
+    'UT': 'UTA', 'UTAH': 'UTA', 'BK': 'BKN', 'NJ': 'BKN', 'OKL': 'OKC',
+    'NO': 'NOP', 'NOH': 'NOP', 'GS': 'GSW', 'NY': 'NYK', 'SA': 'SAS',
+    'PHO': 'PHX', 'WSH': 'WAS',
+}
+
+PLAYER_COLUMNS = ['qs_team_id', 'first_name', 'last_name', 'position', 'age', 'usage_rating',
+                  'inside_shooting', 'outside_shooting', 'ft_shooting', 'passing', 'speed',
+                  'guarding', 'stealing', 'blocking', 'rebounding', 'overall_rating',
+                  'contract_years', 'salary_amount']
+
+def canonical_abbrev(series):
+    abbrevs = series.astype(str).str.strip().str.upper()
+    return abbrevs.replace(TEAM_ALIASES)
+
+def read_source(path):
+    """Reads the sheet, using (and refreshing) the Parquet cache when possible."""
+    cache = os.path.splitext(path)[0] + '.parquet'
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        return pd.read_parquet(cache)
+
+    df = pd.read_csv(path) if path.lower().endswith('.csv') else pd.read_excel(path)
+    df.to_parquet(cache, index=False)
+    return df
+
+def build_players(df, team_map):
+    """
+    Validates and maps the sheet into quick_start_players rows.
+    Returns (players DataFrame, list of warnings for skipped rows).
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing: raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    warnings = []
+    df = df[df['NAME'].notna() & df['TEAM'].notna()].copy()
+    df['qs_team_id'] = canonical_abbrev(df['TEAM']).map(team_map)
+    unknown = df[df['qs_team_id'].isna()]
+    for team, count in unknown['TEAM'].value_counts().items():
+        warnings.append(f"Unknown team '{team}' ({count} players skipped)")
+    df = df[df['qs_team_id'].notna()]
+
+    for col, default in STAT_DEFAULTS.items():
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(default) if col in df.columns else default
+
+    names = df['NAME'].astype(str).str.strip().str.split(n=1, expand=True)
+    first = names[0]
+    last = names[1].fillna(first) if 1 in names.columns else first
+    position = df['POS'].astype(str).str.strip().str[:2]
+
+    def rating(values):
+        return np.minimum(99, values).astype(int)
+
+    overall = rating(40 + df['PpG'] * 2.5 + df['ApG'] * 1.5 + df['RpG'] * 1.2)
+    tiers = [overall >= 90, overall >= 85, overall >= 80, overall >= 75, overall >= 70]
+    salary = np.select(tiers, [
+        40000000 + (overall - 90) * 2000000,
+        25000000 + (overall - 85) * 3000000,
+        15000000 + (overall - 80) * 2000000,
+        8000000 + (overall - 75) * 1400000,
+        3000000 + (overall - 70) * 1000000,
+    ], default=1500000 + (overall - 60) * 150000)
+
+    players = pd.DataFrame({
+        'qs_team_id': df['qs_team_id'].astype(int),
+        'first_name': first,
+        'last_name': last,
+        'position': position,
+        'age': pd.to_numeric(df['AGE'], errors='coerce').fillna(25).astype(int),
+        'usage_rating': rating(30 + df['USG%'] * 2),
+        'inside_shooting': rating(30 + df['2P%'] * 130),
+        'outside_shooting': rating(30 + df['3P%'] * 150),
+        'ft_shooting': rating(df['FT%'] * 95),
+        'passing': rating(40 + df['ApG'] * 10),
+        'speed': np.where(position == 'G', 65, 50),
+        'guarding': rating(40 + df['SpG'] * 25),
+        'stealing': rating(40 + df['SpG'] * 30),
+        'blocking': rating(30 + df['BpG'] * 35),
+        'rebounding': rating(30 + df['RpG'] * 8),
+        'overall_rating': overall,
+        'contract_years': np.select(tiers, [4, 3, 3, 2, 2], default=1),
+        'salary_amount': np.maximum(salary, MIN_SALARY).astype(int),
+    })
+    return players[PLAYER_COLUMNS], warnings
+
+def sync_players(conn, scenario_id, players):
+    """Loads players with one COPY and syncs quick_start_players for the scenario. Commits."""
+    cur = conn.cursor()
+    try:
+        cur.execute("CREATE TEMP TABLE qs_import (LIKE quick_start_players INCLUDING DEFAULTS) ON COMMIT DROP")
+        buf = io.StringIO()
+        players.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+        cur.copy_expert(f"COPY qs_import ({', '.join(PLAYER_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+        scenario_players = "SELECT qs_team_id FROM quick_start_teams WHERE scenario_id = %(scenario_id)s"
+        cur.execute(f"""
+            UPDATE quick_start_players p SET {', '.join(f"{c} = i.{c}" for c in PLAYER_COLUMNS[3:])}
+            FROM qs_import i
+            WHERE p.qs_team_id = i.qs_team_id AND p.first_name = i.first_name AND p.last_name = i.last_name
+        """)
+        updated = cur.rowcount
+        cur.execute(f"""
+            INSERT INTO quick_start_players ({', '.join(PLAYER_COLUMNS)})
+            SELECT {', '.join('i.' + c for c in PLAYER_COLUMNS)}
+            FROM qs_import i
+            WHERE NOT EXISTS (SELECT 1 FROM quick_start_players p
+                              WHERE p.qs_team_id = i.qs_team_id AND p.first_name = i.first_name AND p.last_name = i.last_name)
+        """)
+        inserted = cur.rowcount
+        cur.execute(f"""
+            DELETE FROM quick_start_players p
+            WHERE p.qs_team_id IN ({scenario_players})
+              AND NOT EXISTS (SELECT 1 FROM qs_import i
+                              WHERE p.qs_team_id = i.qs_team_id AND p.first_name = i.first_name AND p.last_name = i.last_name)
+        """, {'scenario_id': scenario_id})
+        removed = cur.rowcount
+        conn.commit()
+        return updated, inserted, removed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def import_players(conn, path=DEFAULT_SOURCE, scenario_id=1):
+    """Full import: read (cached), map, validate and sync. Returns the number of players loaded."""
+    cur = conn.cursor()
+    cur.execute("SELECT qs_team_id, abbrev FROM quick_start_teams WHERE scenario_id = %s", (scenario_id,))
+    rows = cur.fetchall()
+    cur.close()
+    team_map = dict(zip(canonical_abbrev(pd.Series([r[1] for r in rows])), [r[0] for r in rows]))
+
+    df = read_source(path)
+    players, warnings = build_players(df, team_map)
+    for w in warnings: print(f"  Warning: {w}")
+    updated, inserted, removed = sync_players(conn, scenario_id, players)
+    print(f"  ✓ {len(players)} players loaded ({updated} updated, {inserted} new, {removed} removed)")
+    return len(players)
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE
+    scenario_id = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    conn = psycopg2.connect(
+        dbname=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host=os.getenv('DB_HOST'),
+        sslmode='require'
+    )
+    print(f"=== IMPORTING {source} INTO SCENARIO {scenario_id} ===")
+    import_players(conn, source, scenario_id)
+    conn.close()
@@ -0,0 +1,166 @@
+"""
+League deletion and garbage collection.
+
+Deleting a league is two steps:
+  1. mark_league_deleted() sets leagues.deleted_at, which hides it everywhere at once.
+  2. purge_league() removes its rows table by table in small committed batches, so a
+     big league never holds long locks or one huge transaction. Per-game tables are
+     partitioned by league_id, so each batch only touches that league's partition.
+deleted_at is the persisted purge queue: the league row goes last, so a purge cut
+short (worker restart, deploy) leaves the league marked, and the next
+purge_deleted_leagues() sweep (app start, next delete, this script) finishes it.
+A session advisory lock per league keeps two sweeps off the same league.
+
+Leagues idle for longer than LEAGUE_EXPIRE_DAYS (last_active_at, set whenever the
+league changes) can be expired the same way. Run from cron / a Render job with:
+    python league_gc.py [--expire-days N]
+"""
+from dotenv import load_dotenv
+import os
+import sys
+import psycopg2
+from response_cache import ResponseCache
+
+load_dotenv()
+
+BATCH_SIZE = 5000
+PURGE_LOCK = 4039  # advisory lock namespace: (PURGE_LOCK, league_id) is held while a league is purged
+
+# (table, league filter) in dependency order: children before parents
+LEAGUE_TABLES = [
+    ('league_game_events', "league_id = %(league_id)s"),
+    ('league_box_scores', "league_id = %(league_id)s"),
+    ('league_game_archive', "league_id = %(league_id)s"),
+    ('league_single_game_records', "league_id = %(league_id)s"),
+    ('league_player_careers', "league_id = %(league_id)s"),
+    ('league_player_season_stats', "league_id = %(league_id)s"),
+    ('league_transactions', "league_id = %(league_id)s"),
+    ('sim_runs', "league_id = %(league_id)s"),
+    ('sim_metrics', "league_id = %(league_id)s"),
+    ('league_schedule', "league_id = %(league_id)s"),
+    ('league_playoff_series', "league_id = %(league_id)s"),
+    ('league_draft_picks', "league_id = %(league_id)s"),
+    ('league_standings_history', "league_id = %(league_id)s"),
+    ('league_season_history', "league_id = %(league_id)s"),
+    ('league_players', "league_id = %(league_id)s"),
+    ('coaching_strategy', "team_id IN (SELECT team_id FROM league_teams WHERE league_id = %(league_id)s)"),
+    ('team_standings_snapshot', "league_id = %(league_id)s"),
+    ('team_payroll', "league_id = %(league_id)s"),
+    ('league_teams', "league_id = %(league_id)s"),
+]
+
+def mark_league_deleted(conn, league_id):
+    cur = conn.cursor()
+    cur.execute("UPDATE leagues SET deleted_at = NOW() WHERE league_id = %s AND deleted_at IS NULL", (league_id,))
+    marked = cur.rowcount
+    conn.commit()
+    cur.close()
+    return marked > 0
+
+def average_row_bytes(cur, table):
+    """Estimated on-disk bytes per row (from the planner's statistics)."""
+    cur.execute("""
+        SELECT COALESCE(SUM(pg_total_relation_size(c.oid)), 0), COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)
+        FROM pg_class c
+        WHERE c.oid = %s::regclass
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)
+    """, (table, table))
+    size, rows = cur.fetchone()
+    return float(size) / float(rows) if rows else 0.0
+
+def purge_league(conn, league_id, batch_size=BATCH_SIZE):
+    """
+    Deletes every row belonging to a league, committing after each batch.
+    Returns {'rows': {table: deleted}, 'reclaimed_bytes': estimate}, or None if
+    another session is already purging the league.
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT pg_try_advisory_lock(%s, %s)", (PURGE_LOCK, league_id))
+    if not cur.fetchone()[0]:
+        conn.rollback()
+        cur.close()
+        return None
+    try:
+        return delete_league_rows(conn, cur, league_id, batch_size)
+    finally:
+        if not conn.closed:
+            conn.rollback()
+            cur.execute("SELECT pg_advisory_unlock(%s, %s)", (PURGE_LOCK, league_id))
+            conn.commit()
+        cur.close()
+
+def delete_league_rows(conn, cur, league_id, batch_size):
+    """purge_league's deletes, in LEAGUE_TABLES order, with the league's purge lock held."""
+    params = {'league_id': league_id, 'batch': batch_size}
+    report = {'rows': {}, 'reclaimed_bytes': 0}
+    for table, condition in LEAGUE_TABLES:
+        cur.execute("SELECT to_regclass(%s)", (table,))
+        if cur.fetchone()[0] is None: continue
+        row_bytes = average_row_bytes(cur, table)
+        deleted = 0
+        while True:
+            cur.execute(f"""
+                DELETE FROM {table}
+                WHERE {condition}
+                  AND ctid = ANY(ARRAY(SELECT ctid FROM {table} WHERE {condition} LIMIT %(batch)s))
+            """, params)
+            conn.commit()
+            deleted += cur.rowcount
+            if cur.rowcount < batch_size: break
+        if deleted:
+            report['rows'][table] = deleted
+            report['reclaimed_bytes'] += int(deleted * row_bytes)
+
+    cur.execute("DELETE FROM leagues WHERE league_id = %s", (league_id,))
+    conn.commit()
+    return report
+
+def expire_idle_leagues(conn, days):
+    """Marks leagues with no activity for `days` days as deleted. Returns their ids."""
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE leagues SET deleted_at = NOW()
+        WHERE deleted_at IS NULL AND COALESCE(last_active_at, created_at) < NOW() - %s * INTERVAL '1 day'
+        RETURNING league_id
+    """, (days,))
+    expired = [row[0] for row in cur.fetchall()]
+    conn.commit()
+    cur.close()
+    return expired
+
+def collect_garbage(conn, expire_days=None):
+    """Expires idle leagues (if expire_days is set) and purges every league marked deleted."""
+    if expire_days and expire_idle_leagues(conn, expire_days):
+        ResponseCache(None).bump_league_list(conn)  # the shared page cache (if any) must see the shorter league list
+    return purge_deleted_leagues(conn)
+
+def purge_deleted_leagues(conn):
+    """Purges (or finishes purging) every league marked deleted, oldest first. Returns {league_id: report}."""
+    cur = conn.cursor()
+    cur.execute("SELECT league_id FROM leagues WHERE deleted_at IS NOT NULL ORDER BY deleted_at")
+    pending = [row[0] for row in cur.fetchall()]
+    cur.close()
+
+    reports = {}
+    for league_id in pending:
+        report = purge_league(conn, league_id)
+        if report is None: continue  # another sweep holds it
+        reports[league_id] = report
+        print(f"Purged league {league_id}: {sum(reports[league_id]['rows'].values())} rows, "
+              f"~{reports[league_id]['reclaimed_bytes'] / 1048576:.1f} MB reclaimed")
+    return reports
+
+if __name__ == '__main__':
+    expire_days = os.getenv('LEAGUE_EXPIRE_DAYS')
+    if '--expire-days' in sys.argv:
+        expire_days = sys.argv[sys.argv.index('--expire-days') + 1]
+    conn = psycopg2.connect(
+        dbname=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host=os.getenv('DB_HOST'),
+        sslmode='require'
+    )
+    reports = collect_garbage(conn, int(expire_days) if expire_days else None)
+    conn.close()
+    print(f"Done: {len(reports)} league(s) purged")
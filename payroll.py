@@ -0,0 +1,72 @@
+"""
+Team payroll ledger.
+
+team_payroll keeps, per team, the salary committed for the current season and
+the next three (a contract with N years left counts toward the first N). It is
+kept in step by delta updates wherever a contract is signed, moved or extended,
+and rebuilt set-based after bulk contract changes, so cap checks are a single
+primary-key read instead of a SUM over the roster.
+"""
+from psycopg2.extras import RealDictCursor
+
+LEDGER_YEARS = 4
+YEAR_COLUMNS = ['committed_y1', 'committed_y2', 'committed_y3', 'committed_y4']
+
+def contract_commitments(salary, years):
+    """Salary a contract commits in each ledger year."""
+    salary = float(salary or 0)
+    years = int(years or 0)
+    return [salary if years > i else 0 for i in range(LEDGER_YEARS)]
+
+def apply_contract(cur, team_id, salary, years, sign=1):
+    """Adds (sign=1) or removes (sign=-1) a contract from a team's ledger. Does not commit."""
+    if team_id is None: return
+    deltas = [sign * amount for amount in contract_commitments(salary, years)]
+    if not any(deltas): return
+    cur.execute("""
+        UPDATE team_payroll
+        SET committed_y1 = committed_y1 + %s, committed_y2 = committed_y2 + %s,
+            committed_y3 = committed_y3 + %s, committed_y4 = committed_y4 + %s
+        WHERE team_id = %s
+    """, (*deltas, team_id))
+
+def move_contract(cur, salary, years, from_team_id, to_team_id):
+    """Keeps both ledgers in step when a contract changes teams."""
+    apply_contract(cur, from_team_id, salary, years, sign=-1)
+    apply_contract(cur, to_team_id, salary, years)
+
+def recalculate_payrolls(cur, league_id):
+    """Rebuilds every team's ledger in a league from player contracts. Does not commit."""
+    cur.execute("""
+        INSERT INTO team_payroll (team_id, league_id, committed_y1, committed_y2, committed_y3, committed_y4)
+        SELECT t.team_id, t.league_id,
+               COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 1), 0),
+               COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 2), 0),
+               COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 3), 0),
+               COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 4), 0)
+        FROM league_teams t
+        LEFT JOIN league_players p ON p.team_id = t.team_id
+        WHERE t.league_id = %s
+        GROUP BY t.team_id, t.league_id
+        ON CONFLICT (team_id) DO UPDATE SET
+            committed_y1 = EXCLUDED.committed_y1, committed_y2 = EXCLUDED.committed_y2,
+            committed_y3 = EXCLUDED.committed_y3, committed_y4 = EXCLUDED.committed_y4
+    """, (league_id,))
+
+def get_team_payroll(conn, team_id):
+    """Returns a team's commitments as a list (current season first). Builds the league ledger if missing."""
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("SELECT * FROM team_payroll WHERE team_id = %s", (team_id,))
+    row = cur.fetchone()
+    if row is None:
+        cur.execute("SELECT league_id FROM league_teams WHERE team_id = %s", (team_id,))
+        team = cur.fetchone()
+        if team is None:
+            cur.close()
+            return [0.0] * LEDGER_YEARS
+        recalculate_payrolls(cur, team['league_id'])
+        conn.commit()
+        cur.execute("SELECT * FROM team_payroll WHERE team_id = %s", (team_id,))
+        row = cur.fetchone()
+    cur.close()
+    return [float(row[col]) for col in YEAR_COLUMNS]
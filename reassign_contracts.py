@@ -2,11 +2,52 @@ from dotenv import load_dotenv
 import os
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from payroll import recalculate_payrolls
+
+# Prices every contract in one statement. Per player:
+#   base share = (rating / team's total rating points) * cap
+#   salary     = max(tier minimum, base share * tier multiplier)  (stars earn more)
+#   years      = 4 for young stars, then 3 / 2 / 1 by rating
+PROPOSED_CONTRACTS_SQL = """
+    WITH rated AS (
+        SELECT player_id, team_id, overall_rating, age, salary_amount, contract_years,
+               SUM(overall_rating) OVER (PARTITION BY team_id) AS team_rating_points
+        FROM league_players
+        WHERE league_id = %(league_id)s AND team_id IS NOT NULL
+    ), tiers AS (
+        SELECT player_id, team_id, overall_rating, age, salary_amount, contract_years,
+               overall_rating::numeric / NULLIF(team_rating_points, 0) * %(salary_cap)s AS base_share,
+               CASE WHEN overall_rating >= 90 THEN 1.8   -- Superstar
+                    WHEN overall_rating >= 85 THEN 1.5   -- All-Star
+                    WHEN overall_rating >= 80 THEN 1.2   -- Starter
+                    WHEN overall_rating >= 75 THEN 1.0   -- Good role player
+                    WHEN overall_rating >= 70 THEN 0.8   -- Role player
+                    ELSE 0.6 END AS salary_multiplier,  -- Bench
+               CASE WHEN overall_rating >= 90 THEN 35000000
+                    WHEN overall_rating >= 85 THEN 25000000
+                    WHEN overall_rating >= 80 THEN 15000000
+                    WHEN overall_rating >= 75 THEN 8000000
+                    WHEN overall_rating >= 70 THEN 4000000
+                    ELSE 1500000 END AS min_salary
+        FROM rated
+    ), proposed AS (
+        SELECT player_id, team_id, overall_rating,
+               salary_amount AS current_salary, contract_years AS current_years,
+               FLOOR(GREATEST(min_salary, COALESCE(base_share, 0) * salary_multiplier)) AS salary,
+               CASE WHEN overall_rating >= 85 AND age < 30 THEN 4
+                    WHEN overall_rating >= 80 THEN 3
+                    WHEN overall_rating >= 70 THEN 2
+                    ELSE 1 END AS years
+        FROM tiers
+    )
+"""
 
-def reassign_league_contracts(conn, league_id):
+def reassign_league_contracts(conn, league_id, dry_run=False):
     """
     Redistribute player salaries to fit under the salary cap.
     Salaries are assigned based on overall rating.
+    With dry_run, nothing is written: the proposed payroll table is returned instead
+    (per team: proposed and current payroll, and each player's proposed salary and years).
     """
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
@@ -17,86 +58,40 @@ def reassign_league_contracts(conn, league_id):
         return {'success': False, 'error': 'League not found'}
 
     salary_cap = result['salary_cap']
-
-    # Get all teams in the league
-    cur.execute("SELECT team_id FROM league_teams WHERE league_id = %s", (league_id,))
-    teams = cur.fetchall()
-
-    teams_updated = 0
-    total_players_updated = 0
-
-    for team in teams:
-        team_id = team['team_id']
-
-        # Get all players on this team, sorted by overall rating
-        cur.execute("""
-            SELECT player_id, overall_rating
-            FROM league_players
-            WHERE team_id = %s AND league_id = %s
-            ORDER BY overall_rating DESC
-        """, (team_id, league_id))
-
-        players = cur.fetchall()
-        if not players:
-            continue
-
-        # Calculate salary distribution
-        # Total "points" = sum of all overall ratings
-        total_rating_points = sum(p['overall_rating'] for p in players)
-
-        # Distribute cap space proportionally with scaling
-        for player in players:
-            rating = player['overall_rating']
-
-            # Base salary from proportional distribution
-            base_share = (rating / total_rating_points) * salary_cap
-
-            # Apply scaling curve to make stars earn more
-            # This creates a more realistic NBA salary structure
-            if rating >= 90:  # Superstar
-                salary_multiplier = 1.8
-                min_salary = 35000000
-            elif rating >= 85:  # All-Star
-                salary_multiplier = 1.5
-                min_salary = 25000000
-            elif rating >= 80:  # Starter
-                salary_multiplier = 1.2
-                min_salary = 15000000
-            elif rating >= 75:  # Good role player
-                salary_multiplier = 1.0
-                min_salary = 8000000
-            elif rating >= 70:  # Role player
-                salary_multiplier = 0.8
-                min_salary = 4000000
-            else:  # Bench
-                salary_multiplier = 0.6
-                min_salary = 1500000
-
-            new_salary = int(max(min_salary, base_share * salary_multiplier))
-
-            # Contract length based on age and rating
-            cur.execute("SELECT age FROM league_players WHERE player_id = %s", (player['player_id'],))
-            age = cur.fetchone()['age']
-
-            if rating >= 85 and age < 30:
-                contract_years = 4
-            elif rating >= 80:
-                contract_years = 3
-            elif rating >= 70:
-                contract_years = 2
-            else:
-                contract_years = 1
-
-            # Update player contract
-            cur.execute("""
-                UPDATE league_players
-                SET salary_amount = %s, contract_years = %s
-                WHERE player_id = %s
-            """, (new_salary, contract_years, player['player_id']))
-
-            total_players_updated += 1
-
-        teams_updated += 1
+    params = {'league_id': league_id, 'salary_cap': salary_cap}
+
+    if dry_run:
+        cur.execute(PROPOSED_CONTRACTS_SQL + """
+            SELECT * FROM proposed ORDER BY team_id, salary DESC
+        """, params)
+        teams = {}
+        for p in cur.fetchall():
+            team = teams.setdefault(p['team_id'], {'team_id': p['team_id'], 'payroll': 0, 'current_payroll': 0, 'players': []})
+            team['payroll'] += int(p['salary'])
+            team['current_payroll'] += int(p['current_salary'] or 0)
+            team['players'].append({'player_id': p['player_id'], 'overall_rating': p['overall_rating'],
+                                    'salary': int(p['salary']), 'years': p['years'],
+                                    'current_salary': int(p['current_salary'] or 0), 'current_years': p['current_years']})
+        cur.close()
+        return {
+            'success': True,
+            'dry_run': True,
+            'salary_cap': salary_cap,
+            'teams': list(teams.values()),
+        }
+
+    cur.execute(PROPOSED_CONTRACTS_SQL + """
+        UPDATE league_players p
+        SET salary_amount = t.salary, contract_years = t.years
+        FROM proposed t
+        WHERE p.player_id = t.player_id
+        RETURNING p.team_id
+    """, params)
+    updated = cur.fetchall()
+
+    total_players_updated = len(updated)
+    teams_updated = len({row['team_id'] for row in updated})
+    recalculate_payrolls(cur, league_id)
 
     conn.commit()
     cur.close()
@@ -108,7 +103,6 @@ def reassign_league_contracts(conn, league_id):
         'salary_cap': salary_cap
     }
 
-
 if __name__ == '__main__':
     # Test script
     load_dotenv()
@@ -0,0 +1,227 @@
+"""
+Page cache for read-only views.
+
+Pages are keyed on (path + query, league_id, league data_version, league list
+version, viewing team). data_version lives on the leagues row and is bumped after
+every write that can change what a page shows (sims, trades, signings,
+strategy...), so cached pages never need explicit invalidation - old versions
+simply stop being requested. Every page also renders the league switcher, so the
+key includes the league list version (live league count + newest league id),
+which changes whenever a league is created or deleted.
+
+Entries live in an in-process LRU. If CACHE_REDIS_URL is set (and the redis
+package is installed) pages and league versions are also shared through Redis,
+so gunicorn workers share one cache and a warm hit needs no database work.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, session, make_response
+from psycopg2.extras import RealDictCursor
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+SHARED_TTL_SECONDS = 6 * 60 * 60
+OWNER_MEMO_ENTRIES = 4096
+
+# (live leagues, newest live league): a new league raises the max id, a deletion
+# lowers the count, and neither can come back to an earlier pair with a different list
+LEAGUE_LIST_VERSION_SQL = "SELECT COUNT(*) || '.' || COALESCE(MAX(league_id), 0) FROM leagues WHERE deleted_at IS NULL"
+
+class LRUCache:
+    """Small thread-safe LRU (gunicorn threads / dev server share it)."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None: self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+def connect_shared_backend():
+    url = os.environ.get('CACHE_REDIS_URL')
+    if not url or redis is None: return None
+    try:
+        client = redis.Redis.from_url(url)
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"Shared page cache unavailable ({e}), using in-process cache only")
+        return None
+
+class ResponseCache:
+    def __init__(self, connect, release=None, max_entries=512):
+        """connect/release borrow and return the connection for version reads (default release: close it)."""
+        self.connect = connect
+        self.release = release or (lambda conn: conn.close())
+        self.local = LRUCache(max_entries)
+        self.shared = connect_shared_backend()
+        self.owners = LRUCache(OWNER_MEMO_ENTRIES)  # (lookup query, id) -> league_id; ownership never changes
+
+    # --- League versions ---
+
+    def league_for(self, conn, league_query, key):
+        """Resolves the league that owns a team/game (memoized, since it never changes)."""
+        memo_key = (league_query, key)
+        league_id = self.owners.get(memo_key)
+        if league_id is None:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute(league_query, (key,))
+            row = cur.fetchone()
+            cur.close()
+            if not row: return None
+            league_id = row['league_id']
+            self.owners.set(memo_key, league_id)
+        return league_id
+
+    def league_version(self, conn, league_id):
+        """The page version of a league: its data_version plus the league list version."""
+        cur = conn.cursor()
+        cur.execute(f"SELECT (SELECT data_version FROM leagues WHERE league_id = %s), ({LEAGUE_LIST_VERSION_SQL})", (league_id,))
+        data_version, list_version = cur.fetchone()
+        cur.close()
+        data_version = data_version or 0
+        self._publish_version(league_id, data_version)
+        self._publish_list_version(list_version)
+        return f"{data_version}.{list_version}"
+
+    def bump(self, conn, league_id):
+        """Invalidates every cached page for a league. Commits, so call it after the write is committed."""
+        if league_id is None: return
+        cur = conn.cursor()
+        cur.execute("UPDATE leagues SET data_version = data_version + 1, last_active_at = NOW() WHERE league_id = %s RETURNING data_version", (league_id,))
+        row = cur.fetchone()
+        conn.commit()
+        cur.close()
+        if row: self._publish_version(league_id, row[0], overwrite=True)
+
+    def bump_for_team(self, conn, team_id):
+        self.bump(conn, self.league_for(conn, "SELECT league_id FROM league_teams WHERE team_id = %s", team_id))
+
+    def bump_league_list(self, conn):
+        """Invalidates every league's pages after a league is created or deleted (call after the commit)."""
+        cur = conn.cursor()
+        cur.execute(LEAGUE_LIST_VERSION_SQL)
+        list_version = cur.fetchone()[0]
+        cur.close()
+        self._publish_list_version(list_version, overwrite=True)
+
+    def _publish_version(self, league_id, version, overwrite=False):
+        if self.shared is None: return
+        try:
+            # Readers only fill a missing key, so a slow reader can never undo a bump
+            self.shared.set(f"league_version:{league_id}", version, nx=not overwrite)
+        except Exception as e:
+            print(f"Shared page cache write failed: {e}")
+
+    def _publish_list_version(self, list_version, overwrite=False):
+        if self.shared is None: return
+        try:
+            self.shared.set("league_list_version", list_version, nx=not overwrite)
+        except Exception as e:
+            print(f"Shared page cache write failed: {e}")
+
+    # --- Page entries ---
+
+    def _get_entry(self, key):
+        entry = self.local.get(key)
+        if entry is None and self.shared is not None:
+            try:
+                stored = self.shared.hgetall(f"page:{key}")
+                if stored:
+                    entry = (stored[b'body'], float(stored[b'modified']))
+                    self.local.set(key, entry)
+            except Exception as e:
+                print(f"Shared page cache read failed: {e}")
+        return entry
+
+    def _set_entry(self, key, body, modified):
+        self.local.set(key, (body, modified))
+        if self.shared is not None:
+            try:
+                self.shared.hset(f"page:{key}", mapping={'body': body, 'modified': modified})
+                self.shared.expire(f"page:{key}", SHARED_TTL_SECONDS)
+            except Exception as e:
+                print(f"Shared page cache write failed: {e}")
+
+    def cached(self, arg='league_id', league_query=None):
+        """
+        Caches a GET view. The owning league is the view argument `arg`, or is looked
+        up with `league_query` (e.g. team_id -> league_id) when the URL has no league.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(**kwargs):
+                conn = None
+                try:
+                    league_id = kwargs[arg]
+                    version = None
+                    if league_query is not None:
+                        if self.owners.get((league_query, kwargs[arg])) is None: conn = self.connect()
+                        league_id = self.league_for(conn, league_query, kwargs[arg])
+                    if league_id is not None:
+                        version = self._cached_version(league_id)
+                        if version is None:
+                            if conn is None: conn = self.connect()
+                            version = self.league_version(conn, league_id)
+                finally:
+                    if conn is not None: self.release(conn)
+                if league_id is None:
+                    return view(**kwargs)
+
+                key = f"{request.full_path}|{league_id}|{version}|{session.get('user_team_id')}"
+                etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+                if etag in request.if_none_match:
+                    return self._not_modified(etag)
+
+                entry = self._get_entry(key)
+                if entry is None:
+                    resp = make_response(view(**kwargs))
+                    if resp.status_code != 200: return resp
+                    entry = (resp.get_data(), time.time())
+                    self._set_entry(key, *entry)
+                else:
+                    if request.if_modified_since and request.if_modified_since.timestamp() >= int(entry[1]):
+                        return self._not_modified(etag)
+                    resp = make_response(entry[0])
+
+                resp.set_etag(etag)
+                resp.last_modified = entry[1]
+                resp.cache_control.private = True
+                resp.cache_control.no_cache = True
+                return resp
+            return wrapper
+        return decorator
+
+    def _cached_version(self, league_id):
+        """Returns the shared page version (see league_version) without touching the database, if available."""
+        if self.shared is None: return None
+        try:
+            data_version, list_version = self.shared.mget(f"league_version:{league_id}", "league_list_version")
+            if data_version is None or list_version is None: return None
+            return f"{int(data_version)}.{list_version.decode('utf-8')}"
+        except Exception:
+            return None
+
+    def _not_modified(self, etag):
+        resp = make_response('', 304)
+        resp.set_etag(etag)
+        resp.cache_control.private = True
+        resp.cache_control.no_cache = True
+        return resp
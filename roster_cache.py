@@ -0,0 +1,90 @@
+"""
+League roster snapshots for the simulation path.
+
+A sim batch (a day, a week of days, a playoff round) needs the rosters and
+coaching strategies of the teams that play. Instead of reading them again for
+every batch, RosterCache keeps one snapshot per league in memory: every player
+of the league (free agents included) with the columns the engines read, best
+players first, and every team's strategy.
+
+leagues.roster_version says which state of the rosters a snapshot reflects.
+  - Moves made through move_player (AI signings and trades, user trades and
+    signings) patch the snapshot in place and give the league a new version,
+    so the snapshot stays current.
+  - Any other write that changes rosters, ratings or strategies calls
+    bump_roster_version, and the next batch reloads the snapshot.
+Versions are drawn from a sequence and never reused, so if a transaction that
+patched a snapshot rolls back, the league keeps its old version, the snapshot
+no longer matches it, and it is reloaded.
+"""
+from psycopg2.extras import RealDictCursor
+from response_cache import LRUCache
+from simulation import execute_prepared
+
+NEXT_VERSION_SQL = "nextval('roster_version_seq')"
+
+def bump_roster_version(cur, league_id):
+    """Marks the league's rosters as changed, so cached snapshots are reloaded. Returns the new version."""
+    cur.execute(f"UPDATE leagues SET roster_version = {NEXT_VERSION_SQL} WHERE league_id = %s RETURNING roster_version", (league_id,))
+    row = cur.fetchone()
+    return row['roster_version'] if isinstance(row, dict) else row[0]
+
+class RosterCache:
+    def __init__(self, max_leagues=16):
+        self.snapshots = LRUCache(max_leagues)
+
+    def game_context(self, cur, league_id, team_ids):
+        """Same result as simulation.load_game_context, served from the league's snapshot."""
+        snapshot = self.snapshot(cur, league_id)
+        teams = set(team_ids)
+        all_players = [p for p in snapshot['players'] if p['team_id'] in teams]
+        strategies_db = [s for team_id, s in snapshot['strategies'].items() if team_id in teams]
+        return all_players, strategies_db
+
+    def snapshot(self, cur, league_id):
+        """The league's snapshot, (re)loaded when roster_version has moved on."""
+        version = self.current_version(cur, league_id)
+        snapshot = self.snapshots.get(league_id)
+        if snapshot is not None and snapshot['version'] == version:
+            return snapshot
+
+        # Version first: a write committed in between only makes the snapshot look stale
+        execute_prepared(cur, 'sim_league_rosters', (league_id,))
+        players = [dict(p) for p in cur.fetchall()]
+        execute_prepared(cur, 'sim_league_strategies', (league_id,))
+        strategies = {s['team_id']: dict(s) for s in cur.fetchall()}
+        snapshot = {'version': version, 'players': players,
+                    'by_id': {p['player_id']: p for p in players}, 'strategies': strategies}
+        self.snapshots.set(league_id, snapshot)
+        return snapshot
+
+    def player_count(self, league_id):
+        """Players in the league's cached snapshot (None if it isn't loaded); no database read."""
+        snapshot = self.snapshots.get(league_id)
+        return len(snapshot['players']) if snapshot is not None else None
+
+    def current_version(self, cur, league_id):
+        version_cur = cur.connection.cursor()
+        version_cur.execute("SELECT roster_version FROM leagues WHERE league_id = %s", (league_id,))
+        row = version_cur.fetchone()
+        version_cur.close()
+        return row[0] if row else None
+
+    def move_player(self, cur, league_id, player_id, team_id):
+        """
+        Records that a player joined team_id (None = free agent): bumps the league's
+        roster_version and patches the snapshot to match, if it was current.
+        Call it in the same transaction as the UPDATE of league_players.
+        """
+        lock_cur = cur.connection.cursor(cursor_factory=RealDictCursor)
+        lock_cur.execute("SELECT roster_version FROM leagues WHERE league_id = %s FOR UPDATE", (league_id,))
+        previous = lock_cur.fetchone()['roster_version']
+        version = bump_roster_version(lock_cur, league_id)
+        lock_cur.close()
+
+        snapshot = self.snapshots.get(league_id)
+        if snapshot is None or snapshot['version'] != previous: return
+        player = snapshot['by_id'].get(player_id)
+        if player is None: return  # not in the snapshot (new player): left stale, reloaded next batch
+        player['team_id'] = team_id
+        snapshot['version'] = version
@@ -5,10 +5,55 @@ This ensures the database schema is up to date.
 """
 from dotenv import load_dotenv
 import os
+import sys
 import psycopg2
 
 load_dotenv()
 
+LEAGUE_PARTITIONS = 16
+
+def partition_by_league(cur, table, indexes):
+    """
+    Rebuilds `table` as a hash-partitioned table on league_id and moves its rows over.
+    No-op if it is already partitioned. The primary key gains league_id (required for
+    partitioned tables) and the id sequence is handed to the new table.
+    """
+    cur.execute("SELECT relkind FROM pg_class WHERE relname = %s AND relnamespace = 'public'::regnamespace", (table,))
+    row = cur.fetchone()
+    if row is None or row[0] == 'p': return False
+
+    cur.execute("""
+        SELECT a.attname FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = %s::regclass AND i.indisprimary
+    """, (table,))
+    pk_columns = [r[0] for r in cur.fetchall()]
+    sequences = []
+    for col in pk_columns:
+        cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (table, col))
+        seq = cur.fetchone()[0]
+        if seq: sequences.append((seq, col))
+
+    # Partitions are keyed on league_id: a row without one has nowhere to go
+    cur.execute(f"SELECT COUNT(*) FROM {table} WHERE league_id IS NULL")
+    orphans = cur.fetchone()[0]
+    if orphans:
+        raise RuntimeError(f"{table} has {orphans} rows without a league_id; assign or delete them before partitioning")
+
+    old = f"{table}_unpartitioned"
+    cur.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    cur.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY HASH (league_id)")
+    cur.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({', '.join(pk_columns + ['league_id'])})")
+    for i in range(LEAGUE_PARTITIONS):
+        cur.execute(f"CREATE TABLE {table}_p{i} PARTITION OF {table} FOR VALUES WITH (MODULUS {LEAGUE_PARTITIONS}, REMAINDER {i})")
+    cur.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    for seq, col in sequences:
+        cur.execute(f"ALTER SEQUENCE {seq} OWNED BY {table}.{col}")
+    cur.execute(f"DROP TABLE {old}")
+    for name, columns in indexes.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+    return True
+
 def run_migrations():
     """Run all pending migrations"""
     try:
@@ -20,6 +65,7 @@ def run_migrations():
             sslmode='require'
         )
         cur = conn.cursor()
+        failed = []  # each migration commits on its own; a failed one is rolled back and reported
 
         print("Running migrations...")
 
@@ -30,7 +76,10 @@ def run_migrations():
                 ADD COLUMN IF NOT EXISTS simulation_mode VARCHAR(20) DEFAULT 'detailed'
             """)
             print("  ✓ Added simulation_mode column")
+            conn.commit()
         except Exception as e:
+            conn.rollback()
+            failed.append('simulation_mode')
             print(f"  - simulation_mode: {e}")
 
         # Migration 2: Add salary_cap column
@@ -40,13 +89,452 @@ def run_migrations():
                 ADD COLUMN IF NOT EXISTS salary_cap BIGINT DEFAULT 140000000
             """)
             print("  ✓ Added salary_cap column")
+            conn.commit()
         except Exception as e:
+            conn.rollback()
+            failed.append('salary_cap')
             print(f"  - salary_cap: {e}")
 
-        conn.commit()
+        # Migration 3: Standings read model (rebuilt once per simulated day)
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS team_standings_snapshot (
+                    team_id INTEGER PRIMARY KEY REFERENCES league_teams(team_id) ON DELETE CASCADE,
+                    league_id INTEGER NOT NULL,
+                    conference VARCHAR(20),
+                    division VARCHAR(50),
+                    wins INTEGER DEFAULT 0,
+                    losses INTEGER DEFAULT 0,
+                    win_pct NUMERIC(5,3) DEFAULT 0,
+                    games_behind NUMERIC(5,1) DEFAULT 0,
+                    conf_rank INTEGER,
+                    streak_type VARCHAR(1),
+                    streak_length INTEGER DEFAULT 0,
+                    last5_wins INTEGER DEFAULT 0,
+                    last5_losses INTEGER DEFAULT 0,
+                    last10_wins INTEGER DEFAULT 0,
+                    last10_losses INTEGER DEFAULT 0,
+                    points_for INTEGER DEFAULT 0,
+                    points_against INTEGER DEFAULT 0,
+                    point_diff INTEGER DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT NOW()
+                )
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_standings_snapshot_league
+                ON team_standings_snapshot (league_id, conference, conf_rank)
+            """)
+            print("  ✓ Added team_standings_snapshot table")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('team_standings_snapshot')
+            print(f"  - team_standings_snapshot: {e}")
+
+        # Migration 4: Per-league data version (keys the page cache)
+        try:
+            cur.execute("""
+                ALTER TABLE leagues
+                ADD COLUMN IF NOT EXISTS data_version INTEGER DEFAULT 0
+            """)
+            print("  ✓ Added data_version column")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('data_version')
+            print(f"  - data_version: {e}")
+
+        # Migration 5: Real game dates on the schedule (month-paginated schedule API)
+        try:
+            cur.execute("""
+                ALTER TABLE league_schedule
+                ADD COLUMN IF NOT EXISTS game_date DATE
+            """)
+            cur.execute("""
+                UPDATE league_schedule
+                SET game_date = TO_DATE(year || ' ' || TRIM(month_name) || ' ' || day_of_month, 'YYYY Month DD')
+                WHERE game_date IS NULL
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_schedule_league_date
+                ON league_schedule (league_id, game_date, game_id)
+            """)
+            print("  ✓ Added game_date column and index")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('game_date')
+            print(f"  - game_date: {e}")
+
+        # Migration 6: Team payroll ledger (current + next three seasons)
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS team_payroll (
+                    team_id INTEGER PRIMARY KEY REFERENCES league_teams(team_id) ON DELETE CASCADE,
+                    league_id INTEGER NOT NULL,
+                    committed_y1 BIGINT DEFAULT 0,
+                    committed_y2 BIGINT DEFAULT 0,
+                    committed_y3 BIGINT DEFAULT 0,
+                    committed_y4 BIGINT DEFAULT 0
+                )
+            """)
+            cur.execute("""
+                INSERT INTO team_payroll (team_id, league_id, committed_y1, committed_y2, committed_y3, committed_y4)
+                SELECT t.team_id, t.league_id,
+                       COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 1), 0),
+                       COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 2), 0),
+                       COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 3), 0),
+                       COALESCE(SUM(p.salary_amount) FILTER (WHERE p.contract_years >= 4), 0)
+                FROM league_teams t
+                LEFT JOIN league_players p ON p.team_id = t.team_id
+                GROUP BY t.team_id, t.league_id
+                ON CONFLICT (team_id) DO NOTHING
+            """)
+            print("  ✓ Added team_payroll ledger")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('team_payroll')
+            print(f"  - team_payroll: {e}")
+
+        # Migration 7: Per-player season lines (written at season rollover)
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS league_player_season_stats (
+                    player_id INTEGER NOT NULL,
+                    season_year INTEGER NOT NULL,
+                    league_id INTEGER NOT NULL,
+                    team_id INTEGER,
+                    games INTEGER DEFAULT 0,
+                    minutes INTEGER DEFAULT 0,
+                    points INTEGER DEFAULT 0,
+                    rebounds INTEGER DEFAULT 0,
+                    assists INTEGER DEFAULT 0,
+                    fg_made INTEGER DEFAULT 0,
+                    fg_attempts INTEGER DEFAULT 0,
+                    threes_made INTEGER DEFAULT 0,
+                    threes_attempts INTEGER DEFAULT 0,
+                    ft_made INTEGER DEFAULT 0,
+                    ft_attempts INTEGER DEFAULT 0,
+                    fouls INTEGER DEFAULT 0,
+                    PRIMARY KEY (player_id, season_year)
+                )
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_player_season_stats_league
+                ON league_player_season_stats (league_id, season_year)
+            """)
+            print("  ✓ Added league_player_season_stats table")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('league_player_season_stats')
+            print(f"  - league_player_season_stats: {e}")
+
+        # Migration 8: Columnar game archive (one row per finished game, stats stored as arrays)
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS league_game_archive (
+                    game_id INTEGER PRIMARY KEY,
+                    league_id INTEGER NOT NULL,
+                    season_year INTEGER NOT NULL,
+                    game_date DATE,
+                    home_team_id INTEGER,
+                    away_team_id INTEGER,
+                    home_score INTEGER,
+                    away_score INTEGER,
+                    home_q1 INTEGER, home_q2 INTEGER, home_q3 INTEGER, home_q4 INTEGER,
+                    away_q1 INTEGER, away_q2 INTEGER, away_q3 INTEGER, away_q4 INTEGER,
+                    playoff_series_id INTEGER,
+                    box_team_id INTEGER[],
+                    box_player_id INTEGER[],
+                    box_minutes SMALLINT[],
+                    box_points SMALLINT[],
+                    box_rebounds SMALLINT[],
+                    box_assists SMALLINT[],
+                    box_fg_made SMALLINT[],
+                    box_fg_attempts SMALLINT[],
+                    box_threes_made SMALLINT[],
+                    box_threes_attempts SMALLINT[],
+                    box_ft_made SMALLINT[],
+                    box_ft_attempts SMALLINT[],
+                    box_fouls SMALLINT[],
+                    ev_quarter SMALLINT[],
+                    ev_time_remaining TEXT[],
+                    ev_description TEXT[],
+                    ev_score_home SMALLINT[],
+                    ev_score_away SMALLINT[],
+                    ev_event_type TEXT[]
+                )
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_game_archive_league_season
+                ON league_game_archive (league_id, season_year)
+            """)
+            print("  ✓ Added league_game_archive table")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('league_game_archive')
+            print(f"  - league_game_archive: {e}")
+
+        # Migration 9: Career totals and single-game records (built at season rollover)
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS league_player_careers (
+                    player_id INTEGER PRIMARY KEY,
+                    league_id INTEGER NOT NULL,
+                    seasons INTEGER DEFAULT 0,
+                    games INTEGER DEFAULT 0,
+                    minutes INTEGER DEFAULT 0,
+                    points INTEGER DEFAULT 0,
+                    rebounds INTEGER DEFAULT 0,
+                    assists INTEGER DEFAULT 0,
+                    fg_made INTEGER DEFAULT 0,
+                    fg_attempts INTEGER DEFAULT 0,
+                    threes_made INTEGER DEFAULT 0,
+                    threes_attempts INTEGER DEFAULT 0,
+                    ft_made INTEGER DEFAULT 0,
+                    ft_attempts INTEGER DEFAULT 0,
+                    fouls INTEGER DEFAULT 0,
+                    last_season INTEGER
+                )
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_player_careers_league
+                ON league_player_careers (league_id)
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS league_single_game_records (
+                    record_id SERIAL PRIMARY KEY,
+                    league_id INTEGER NOT NULL,
+                    category VARCHAR(20) NOT NULL,
+                    value INTEGER NOT NULL,
+                    player_id INTEGER,
+                    team_id INTEGER,
+                    game_id INTEGER,
+                    season_year INTEGER
+                )
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_single_game_records_league
+                ON league_single_game_records (league_id, category, value DESC)
+            """)
+            print("  ✓ Added career and records tables")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('career/records')
+            print(f"  - career/records: {e}")
+
+        # Migration 10: Partition the per-game stat tables by league
+        try:
+            cur.execute("""
+                ALTER TABLE league_game_events
+                ADD COLUMN IF NOT EXISTS league_id INTEGER
+            """)
+            cur.execute("""
+                UPDATE league_game_events e SET league_id = s.league_id
+                FROM league_schedule s
+                WHERE e.game_id = s.game_id AND e.league_id IS NULL
+            """)
+            if partition_by_league(cur, 'league_box_scores', {'idx_box_scores_game': 'league_id, game_id',
+                                                              'idx_box_scores_player': 'league_id, player_id'}):
+                print("  ✓ Partitioned league_box_scores by league")
+            if partition_by_league(cur, 'league_game_events', {'idx_game_events_game': 'league_id, game_id, event_id'}):
+                print("  ✓ Partitioned league_game_events by league")
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_players_league_team
+                ON league_players (league_id, team_id)
+            """)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('league partitioning')
+            print(f"  - league partitioning: {e}")
+
+        # Migration 11: Soft delete + activity tracking for league garbage collection
+        try:
+            cur.execute("""
+                ALTER TABLE leagues
+                ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP,
+                ADD COLUMN IF NOT EXISTS last_active_at TIMESTAMP DEFAULT NOW()
+            """)
+            print("  ✓ Added deleted_at / last_active_at to leagues")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('league gc columns')
+            print(f"  - league gc columns: {e}")
+
+        # Migration 12: Fixed-interval win probability samples (one byte per sample)
+        try:
+            cur.execute("""
+                ALTER TABLE league_schedule
+                ADD COLUMN IF NOT EXISTS win_prob_samples BYTEA
+            """)
+            cur.execute("""
+                ALTER TABLE league_game_archive
+                ADD COLUMN IF NOT EXISTS win_prob_samples BYTEA
+            """)
+            print("  ✓ Added win_prob_samples to schedule and archive")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('win_prob_samples')
+            print(f"  - win_prob_samples: {e}")
+
+        # Migration 13: Offensive rebounds + defensive stats in the box score archive
+        try:
+            cur.execute("""
+                ALTER TABLE league_box_scores
+                ADD COLUMN IF NOT EXISTS offensive_rebounds INTEGER DEFAULT 0
+            """)
+            cur.execute("""
+                ALTER TABLE league_game_archive
+                ADD COLUMN IF NOT EXISTS box_offensive_rebounds SMALLINT[],
+                ADD COLUMN IF NOT EXISTS box_steals SMALLINT[],
+                ADD COLUMN IF NOT EXISTS box_blocks SMALLINT[],
+                ADD COLUMN IF NOT EXISTS box_turnovers SMALLINT[],
+                ADD COLUMN IF NOT EXISTS box_plus_minus SMALLINT[]
+            """)
+            print("  ✓ Added offensive_rebounds and archived steals/blocks/turnovers/plus-minus")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('full box score stats')
+            print(f"  - full box score stats: {e}")
+
+        # Migration 14: Hybrid simulation routing policy (NULL = defaults)
+        try:
+            cur.execute("""
+                ALTER TABLE leagues
+                ADD COLUMN IF NOT EXISTS simulation_policy JSONB
+            """)
+            print("  ✓ Added simulation_policy column")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('simulation_policy')
+            print(f"  - simulation_policy: {e}")
+
+        # Migration 15: Compact play-by-play (game_events.py) stored with the game
+        try:
+            cur.execute("""
+                ALTER TABLE league_schedule
+                ADD COLUMN IF NOT EXISTS event_log BYTEA
+            """)
+            cur.execute("""
+                ALTER TABLE league_game_archive
+                ADD COLUMN IF NOT EXISTS event_log BYTEA
+            """)
+            print("  ✓ Added event_log to schedule and archive")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('event_log')
+            print(f"  - event_log: {e}")
+
+        # Migration 16: Journal of simulated days (one row per league per sim date)
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS sim_runs (
+                    run_id SERIAL PRIMARY KEY,
+                    league_id INTEGER NOT NULL,
+                    sim_date DATE NOT NULL,
+                    mode VARCHAR(20),
+                    status VARCHAR(20) NOT NULL,
+                    games_played INTEGER DEFAULT 0,
+                    detailed_games INTEGER DEFAULT 0,
+                    attempts INTEGER DEFAULT 1,
+                    error TEXT,
+                    started_at TIMESTAMP DEFAULT NOW(),
+                    finished_at TIMESTAMP,
+                    UNIQUE (league_id, sim_date)
+                )
+            """)
+            print("  ✓ Created sim_runs table")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('sim_runs')
+            print(f"  - sim_runs: {e}")
+
+        # Migration 17: Roster version for the sim roster snapshots (roster_cache.py)
+        try:
+            cur.execute("CREATE SEQUENCE IF NOT EXISTS roster_version_seq")
+            cur.execute("""
+                ALTER TABLE leagues
+                ADD COLUMN IF NOT EXISTS roster_version BIGINT NOT NULL DEFAULT 0
+            """)
+            print("  ✓ Added roster_version column and sequence")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('roster_version')
+            print(f"  - roster_version: {e}")
+
+        # Migration 18: Per-day simulation timings (sim_metrics.py, /admin/sim_metrics)
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS sim_metrics (
+                    metric_id SERIAL PRIMARY KEY,
+                    league_id INTEGER NOT NULL,
+                    sim_date DATE NOT NULL,
+                    mode VARCHAR(20),
+                    games INTEGER,
+                    detailed_games INTEGER,
+                    players INTEGER,
+                    rows_written INTEGER,
+                    wall_ms REAL,
+                    cpu_ms REAL,
+                    db_ms REAL,
+                    games_ms REAL,
+                    ai_ms REAL,
+                    recorded_at TIMESTAMP DEFAULT NOW()
+                )
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_sim_metrics_recorded ON sim_metrics (recorded_at)")
+            print("  ✓ Created sim_metrics table")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('sim_metrics')
+            print(f"  - sim_metrics: {e}")
+
+        # Migration 19: Steals, blocks, turnovers and offensive rebounds in season lines and careers;
+        # season lines split into regular season and playoffs (one row each per player per season)
+        try:
+            for table in ('league_player_season_stats', 'league_player_careers'):
+                cur.execute(f"""
+                    ALTER TABLE {table}
+                    ADD COLUMN IF NOT EXISTS offensive_rebounds INTEGER DEFAULT 0,
+                    ADD COLUMN IF NOT EXISTS steals INTEGER DEFAULT 0,
+                    ADD COLUMN IF NOT EXISTS blocks INTEGER DEFAULT 0,
+                    ADD COLUMN IF NOT EXISTS turnovers INTEGER DEFAULT 0
+                """)
+            cur.execute("""
+                ALTER TABLE league_player_season_stats
+                ADD COLUMN IF NOT EXISTS playoffs BOOLEAN NOT NULL DEFAULT FALSE
+            """)
+            cur.execute("""
+                ALTER TABLE league_player_season_stats
+                DROP CONSTRAINT IF EXISTS league_player_season_stats_pkey,
+                ADD PRIMARY KEY (player_id, season_year, playoffs)
+            """)
+            print("  ✓ Added defensive stats and the playoffs split to season lines and careers")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failed.append('season line stats')
+            print(f"  - season line stats: {e}")
+
         cur.close()
         conn.close()
 
+        if failed:
+            print(f"Migrations FAILED: {', '.join(failed)}")
+            return False
         print("Migrations complete!")
         return True
 
@@ -55,4 +543,4 @@ def run_migrations():
         return False
 
 if __name__ == '__main__':
-    run_migrations()
+    sys.exit(0 if run_migrations() else 1)
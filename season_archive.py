@@ -0,0 +1,87 @@
+"""
+Columnar archive for finished seasons.
+
+At rollover each played game is compacted into one league_game_archive row:
+the game's scalars (including its compact event_log) plus its box score, and
+any legacy league_game_events play-by-play, stored column-wise as arrays
+(TOAST compresses them). The hot tables (league_box_scores,
+league_game_events) then only ever hold the current season, while old games
+stay readable with a single primary-key lookup. Season aggregates live in
+league_player_season_stats.
+"""
+from psycopg2.extras import RealDictCursor
+
+BOX_COLUMNS = ['team_id', 'player_id', 'minutes', 'points', 'rebounds', 'offensive_rebounds', 'assists',
+               'steals', 'blocks', 'turnovers', 'fg_made', 'fg_attempts', 'threes_made', 'threes_attempts',
+               'ft_made', 'ft_attempts', 'fouls', 'plus_minus']
+EVENT_COLUMNS = ['quarter', 'time_remaining', 'description', 'score_home', 'score_away', 'event_type']
+GAME_COLUMNS = ['league_id', 'game_date', 'home_team_id', 'away_team_id', 'home_score', 'away_score',
+                'home_q1', 'home_q2', 'home_q3', 'home_q4', 'away_q1', 'away_q2', 'away_q3', 'away_q4',
+                'playoff_series_id', 'win_prob_samples', 'event_log']
+
+def archive_season_games(cur, league_id, season_year):
+    """Copies every played game of the season into the archive (one pass per hot table). Does not commit."""
+    box_aggs = ", ".join(f"ARRAY_AGG({c} ORDER BY points DESC, player_id) AS box_{c}" for c in BOX_COLUMNS)
+    event_aggs = ", ".join(f"ARRAY_AGG({c} ORDER BY event_id) AS ev_{c}" for c in EVENT_COLUMNS)
+    box_cols = ", ".join(f"box_{c}" for c in BOX_COLUMNS)
+    event_cols = ", ".join(f"ev_{c}" for c in EVENT_COLUMNS)
+    game_cols = ", ".join(GAME_COLUMNS)
+    cur.execute(f"""
+        INSERT INTO league_game_archive (game_id, season_year, {game_cols}, {box_cols}, {event_cols})
+        SELECT s.game_id, %(season_year)s, {", ".join("s." + c for c in GAME_COLUMNS)}, {box_cols}, {event_cols}
+        FROM league_schedule s
+        LEFT JOIN (
+            SELECT game_id, {box_aggs}
+            FROM league_box_scores WHERE league_id = %(league_id)s
+            GROUP BY game_id
+        ) b ON b.game_id = s.game_id
+        LEFT JOIN (
+            SELECT game_id, {event_aggs}
+            FROM league_game_events WHERE league_id = %(league_id)s
+            GROUP BY game_id
+        ) e ON e.game_id = s.game_id
+        WHERE s.league_id = %(league_id)s AND s.is_played = TRUE
+        ON CONFLICT (game_id) DO NOTHING
+    """, {'league_id': league_id, 'season_year': season_year})
+    return cur.rowcount
+
+def load_archived_game(conn, game_id):
+    """
+    Reads an archived game back in the shape of the hot tables: (game, box score rows, events),
+    or None if the game isn't archived. Box rows carry player names like the live box score query.
+    """
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    cur.execute("""
+        SELECT a.*, th.name as home_name, th.city as home_city, th.abbrev as home_abv,
+               ta.name as away_name, ta.city as away_city, ta.abbrev as away_abv
+        FROM league_game_archive a
+        JOIN league_teams th ON a.home_team_id = th.team_id
+        JOIN league_teams ta ON a.away_team_id = ta.team_id
+        WHERE a.game_id = %s
+    """, (game_id,))
+    row = cur.fetchone()
+    if not row:
+        cur.close()
+        return None
+
+    player_ids = row['box_player_id'] or []
+    names = {}
+    if player_ids:
+        cur.execute("SELECT player_id, first_name, last_name, position, age FROM league_players WHERE player_id = ANY(%s)", (player_ids,))
+        names = {p['player_id']: p for p in cur.fetchall()}
+    cur.close()
+
+    stats = []
+    for i in range(len(player_ids)):
+        # Columns added after a game was archived are NULL arrays
+        line = {c: row[f'box_{c}'][i] if row[f'box_{c}'] else 0 for c in BOX_COLUMNS}
+        line['game_id'] = game_id
+        line.update({k: v for k, v in names.get(line['player_id'], {'first_name': '', 'last_name': 'Unknown'}).items() if k != 'player_id'})
+        stats.append(line)
+
+    events = [{c: row[f'ev_{c}'][i] for c in EVENT_COLUMNS} for i in range(len(row['ev_quarter'] or []))]
+
+    game = {c: row[c] for c in GAME_COLUMNS}
+    game.update({k: row[k] for k in ('game_id', 'season_year', 'home_name', 'home_city', 'home_abv', 'away_name', 'away_city', 'away_abv')})
+    game['is_played'] = True
+    return game, stats, events
@@ -0,0 +1,167 @@
+"""
+Offseason pipeline: closes out a finished season and sets up the next one.
+
+advance_season() runs every step as set-based SQL inside one transaction, so a
+league either rolls over completely or not at all, and long multi-season runs
+cost a handful of statements per season rather than one per player or game.
+
+Run from the command line with:  python season_rollover.py <league_id>
+"""
+from dotenv import load_dotenv
+import datetime
+import os
+import sys
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from payroll import recalculate_payrolls
+from standings import refresh_standings_snapshot
+from season_archive import archive_season_games
+from career_stats import record_season
+from generate_schedule import generate_schedule, insert_schedule, GAMES_PER_TEAM
+
+load_dotenv()
+
+SKILL_COLUMNS = ['inside_shooting', 'outside_shooting', 'ft_shooting', 'passing', 'speed',
+                 'guarding', 'stealing', 'blocking', 'rebounding']
+
+def archive_history(cur, league_id, season_year, champion_id):
+    """Champion and final standings (skips anything already recorded)."""
+    cur.execute("""
+        INSERT INTO league_season_history (league_id, season_year, champion_team_id)
+        SELECT %(league_id)s, %(season_year)s, %(champion_id)s
+        WHERE NOT EXISTS (SELECT 1 FROM league_season_history WHERE league_id = %(league_id)s AND season_year = %(season_year)s)
+    """, {'league_id': league_id, 'season_year': season_year, 'champion_id': champion_id})
+    cur.execute("""
+        INSERT INTO league_standings_history (league_id, season_year, team_id, wins, losses, conference, division)
+        SELECT league_id, %(season_year)s, team_id, wins, losses, conference, division
+        FROM league_teams
+        WHERE league_id = %(league_id)s
+          AND NOT EXISTS (SELECT 1 FROM league_standings_history WHERE league_id = %(league_id)s AND season_year = %(season_year)s)
+    """, {'league_id': league_id, 'season_year': season_year})
+
+def reset_season_tables(cur, league_id):
+    """Clears last season's (archived) games, stats and bracket, and generates next season's schedule."""
+    cur.execute("""
+        SELECT MIN(game_date) AS start_date,
+               COUNT(*) * 2 / NULLIF(COUNT(DISTINCT home_team_id), 0) AS games_per_team
+        FROM league_schedule
+        WHERE league_id = %s AND playoff_series_id IS NULL
+    """, (league_id,))
+    previous = cur.fetchone()
+
+    cur.execute("DELETE FROM league_game_events WHERE league_id = %s", (league_id,))
+    cur.execute("DELETE FROM league_box_scores WHERE league_id = %s", (league_id,))
+    cur.execute("DELETE FROM league_schedule WHERE league_id = %s", (league_id,))
+    cur.execute("DELETE FROM league_playoff_series WHERE league_id = %s", (league_id,))
+
+    cur.execute("SELECT team_id FROM league_teams WHERE league_id = %s ORDER BY team_id", (league_id,))
+    team_ids = [row['team_id'] for row in cur.fetchall()]
+    start_date = previous['start_date'] + datetime.timedelta(days=365) if previous['start_date'] else datetime.date.today()
+    insert_schedule(cur, league_id, generate_schedule(team_ids, start_date, previous['games_per_team'] or GAMES_PER_TEAM))
+
+    cur.execute("""
+        UPDATE league_teams SET wins = 0, losses = 0, streak_type = NULL, streak_length = 0
+        WHERE league_id = %s
+    """, (league_id,))
+
+def progress_players(cur, league_id):
+    """Ages every player a year and moves ratings by an age-based random delta (young improve, old decline)."""
+    skills = ",\n            ".join(f"{c} = LEAST(99, GREATEST(1, p.{c} + d.delta))" for c in SKILL_COLUMNS)
+    cur.execute(f"""
+        WITH deltas AS (
+            SELECT player_id,
+                   CASE WHEN age <= 23 THEN FLOOR(RANDOM() * 5)::int
+                        WHEN age <= 27 THEN FLOOR(RANDOM() * 4)::int - 1
+                        WHEN age <= 30 THEN FLOOR(RANDOM() * 3)::int - 1
+                        WHEN age <= 33 THEN FLOOR(RANDOM() * 3)::int - 3
+                        ELSE FLOOR(RANDOM() * 4)::int - 5 END AS delta
+            FROM league_players
+            WHERE league_id = %s
+        )
+        UPDATE league_players p SET
+            age = p.age + 1,
+            overall_rating = LEAST(99, GREATEST(40, p.overall_rating + d.delta)),
+            {skills}
+        FROM deltas d
+        WHERE p.player_id = d.player_id
+    """, (league_id,))
+
+def expire_contracts(cur, league_id):
+    """Counts down contracts; expired players become free agents asking for an age-based term."""
+    cur.execute("""
+        UPDATE league_players SET contract_years = contract_years - 1
+        WHERE league_id = %s AND team_id IS NOT NULL
+    """, (league_id,))
+    cur.execute("""
+        WITH released AS (
+            UPDATE league_players p SET
+                team_id = NULL,
+                contract_years = CASE WHEN p.age <= 26 THEN 5 WHEN p.age <= 31 THEN 4 WHEN p.age <= 34 THEN 2 ELSE 1 END
+            FROM league_players old
+            WHERE p.player_id = old.player_id
+              AND p.league_id = %s AND p.team_id IS NOT NULL AND p.contract_years <= 0
+            RETURNING p.player_id, old.team_id, p.first_name, p.last_name
+        )
+        INSERT INTO league_transactions (league_id, team_id, description, transaction_type)
+        SELECT %s, team_id, 'Contract expired: ' || LEFT(first_name, 1) || '. ' || last_name || ' enters free agency', 'release'
+        FROM released
+    """, (league_id, league_id))
+    return cur.rowcount
+
+def advance_season(conn, league_id):
+    """
+    Rolls a league over to its next season once the Finals are decided.
+    Returns the new season year. Raises ValueError if the season isn't finished.
+    """
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cur.execute("SELECT * FROM leagues WHERE league_id = %s FOR UPDATE", (league_id,))
+        league = cur.fetchone()
+        if not league: raise ValueError("League not found")
+
+        cur.execute("SELECT winner_team_id FROM league_playoff_series WHERE league_id = %s AND round_num = 4", (league_id,))
+        finals = cur.fetchone()
+        if not finals or not finals['winner_team_id']:
+            raise ValueError("The Finals have not been decided yet")
+
+        season_year = league['season_year']
+        archive_history(cur, league_id, season_year, finals['winner_team_id'])
+        record_season(cur, league_id, season_year)
+        archive_season_games(cur, league_id, season_year)
+        reset_season_tables(cur, league_id)
+        progress_players(cur, league_id)
+        released = expire_contracts(cur, league_id)
+        recalculate_payrolls(cur, league_id)
+
+        cur.execute("""
+            UPDATE leagues SET season_year = season_year + 1,
+                roster_version = nextval('roster_version_seq'),  -- ratings and contracts changed: reload roster snapshots
+                sim_date = COALESCE((SELECT MIN(game_date) FROM league_schedule WHERE league_id = %(league_id)s), sim_date + INTERVAL '1 year')
+            WHERE league_id = %(league_id)s
+            RETURNING season_year
+        """, {'league_id': league_id})
+        new_season = cur.fetchone()['season_year']
+        refresh_standings_snapshot(conn, league_id)
+
+        conn.commit()
+        print(f"League {league_id}: {season_year} archived, {released} contracts expired, now in {new_season}")
+        return new_season
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or not sys.argv[1].isdigit():
+        print("Usage: python season_rollover.py <league_id>")
+        sys.exit(1)
+    conn = psycopg2.connect(
+        dbname=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host=os.getenv('DB_HOST'),
+        sslmode='require'
+    )
+    advance_season(conn, int(sys.argv[1]))
+    conn.close()
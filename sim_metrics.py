@@ -0,0 +1,108 @@
+"""
+Simulation throughput metrics.
+
+run_daily_simulation_logic times each sim day with a SimTimer and writes one
+sim_metrics row per simulated day, in the day's own transaction:
+  - wall time, split into the games phase (roster load, engines, game writes),
+    the AI phase (trade logic, signings, trades) and the rest (date advance,
+    standings read model);
+  - CPU time of the simulating thread. Whatever is left of the wall time is
+    time spent waiting, which on this path means waiting on Postgres (round
+    trips to Neon plus query execution), recorded as db_ms;
+  - games played, how many went to the detailed engine, the engine mode,
+    rows written by the game writes, and the league's player count.
+
+/admin/sim_metrics reads them back: percentile summaries per league and
+engine mode, and a rolling chart of each league's recent days.
+"""
+import time
+from contextlib import contextmanager
+from statistics import median
+
+CHART_RUNS = 60      # days per league on the rolling chart
+ROLLING_WINDOW = 7   # days in the chart's rolling median
+
+class SimTimer:
+    """Wall and thread-CPU time of one sim day, with named phases."""
+    def __init__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def totals(self):
+        """(wall_ms, cpu_ms, db_ms) since the timer started."""
+        wall_ms = (time.perf_counter() - self.wall_start) * 1000
+        cpu_ms = (time.thread_time() - self.cpu_start) * 1000
+        return wall_ms, cpu_ms, max(wall_ms - cpu_ms, 0.0)
+
+def record_sim_metrics(cur, league_id, sim_date, mode, games, detailed_games, players, rows_written, timer):
+    wall_ms, cpu_ms, db_ms = timer.totals()
+    cur.execute("""
+        INSERT INTO sim_metrics (league_id, sim_date, mode, games, detailed_games, players, rows_written,
+                                 wall_ms, cpu_ms, db_ms, games_ms, ai_ms)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (league_id, sim_date, mode, games, detailed_games, players, rows_written,
+          wall_ms, cpu_ms, db_ms, timer.phases.get('games', 0.0), timer.phases.get('ai', 0.0)))
+
+def metrics_summary(cur, days):
+    """Per league and mode over the last `days` days: p50/p95 of day time, time per game, DB time and AI time."""
+    cur.execute("""
+        SELECT m.league_id, l.name, m.mode, COUNT(*) AS days, SUM(m.games) AS games, MAX(m.players) AS players,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY m.wall_ms) AS wall_p50,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY m.wall_ms) AS wall_p95,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY m.games_ms / NULLIF(m.games, 0)) AS game_p50,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY m.games_ms / NULLIF(m.games, 0)) AS game_p95,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY m.db_ms) AS db_p50,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY m.db_ms) AS db_p95,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY m.ai_ms) AS ai_p50,
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY m.ai_ms) AS ai_p95,
+               SUM(m.db_ms) / NULLIF(SUM(m.wall_ms), 0) AS db_share,
+               AVG(m.rows_written) AS rows_written
+        FROM sim_metrics m
+        LEFT JOIN leagues l ON l.league_id = m.league_id
+        WHERE m.recorded_at >= NOW() - make_interval(days => %s)
+        GROUP BY m.league_id, l.name, m.mode
+        ORDER BY m.league_id, m.mode
+    """, (days,))
+    return cur.fetchall()
+
+def league_charts(cur, days, width=600, height=100):
+    """
+    Each league's last CHART_RUNS days as SVG polyline points (oldest left):
+    wall time, DB time and a rolling median of wall time, on a shared 0..max scale.
+    """
+    cur.execute("""
+        SELECT league_id, sim_date, mode, games, wall_ms, db_ms
+        FROM (
+            SELECT m.*, ROW_NUMBER() OVER (PARTITION BY league_id ORDER BY recorded_at DESC) AS recent
+            FROM sim_metrics m
+            WHERE recorded_at >= NOW() - make_interval(days => %s)
+        ) m
+        WHERE recent <= %s
+        ORDER BY league_id, recorded_at
+    """, (days, CHART_RUNS))
+    runs = {}
+    for row in cur.fetchall():
+        runs.setdefault(row['league_id'], []).append(row)
+
+    charts = {}
+    for league_id, rows in runs.items():
+        wall = [r['wall_ms'] for r in rows]
+        rolling = [median(wall[max(0, i + 1 - ROLLING_WINDOW):i + 1]) for i in range(len(wall))]
+        top = max(wall) or 1.0
+        step = width / max(len(rows) - 1, 1)
+        def points(values):
+            return ' '.join(f"{i * step:.1f},{height - v / top * height:.1f}" for i, v in enumerate(values))
+        charts[league_id] = {
+            'wall': points(wall), 'db': points([r['db_ms'] for r in rows]), 'rolling': points(rolling),
+            'max_ms': top, 'first': rows[0]['sim_date'], 'last': rows[-1]['sim_date'], 'days': len(rows),
+        }
+    return charts
@@ -1,34 +1,195 @@
 import random
-import json
+import weakref
+import psycopg2
 from psycopg2.extras import RealDictCursor
+import win_probability
+import game_events
 
-def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    # ---------------------------------------------------------
-    # 1. FETCH PLAYERS & STRATEGIES
-    # ---------------------------------------------------------
-    
-    # Fetch Players
-    cur.execute("""
-        SELECT * FROM league_players 
-        WHERE team_id IN (%s, %s) AND league_id = %s
+# ---------------------------------------------------------
+# PREPARED STATEMENTS
+# ---------------------------------------------------------
+# The simulation path runs the same few statements for every game or day. Each
+# has a fixed shape (a batch travels as one array per column, unpacked with
+# unnest), so a connection PREPAREs it once and afterwards only sends EXECUTE
+# with the arguments: no re-parsing or re-planning per game. Prepared statements
+# belong to the database session, so the set prepared so far is kept per
+# connection object (a long-lived pooled connection prepares each one once).
+PREPARED_SQL = {
+    # Only the columns the engines read (ids, overall rating for win probability, the ten skill ratings), best players first
+    'sim_rosters': """
+        SELECT player_id, team_id, overall_rating, usage_rating, inside_shooting, outside_shooting, ft_shooting,
+               passing, speed, guarding, stealing, blocking, rebounding
+        FROM league_players
+        WHERE team_id = ANY($1::int[]) AND league_id = $2::int
+        ORDER BY overall_rating DESC
+    """,
+    'sim_strategies': """
+        SELECT team_id, offense_focus, defense_focus, bench_minutes, training_focus
+        FROM coaching_strategy
+        WHERE team_id = ANY($1::int[])
+    """,
+    # Whole-league versions of the two reads above, for roster_cache snapshots (free agents included)
+    'sim_league_rosters': """
+        SELECT player_id, team_id, overall_rating, usage_rating, inside_shooting, outside_shooting, ft_shooting,
+               passing, speed, guarding, stealing, blocking, rebounding
+        FROM league_players
+        WHERE league_id = $1::int
         ORDER BY overall_rating DESC
-    """, (home_team_id, away_team_id, league_id))
+    """,
+    'sim_league_strategies': """
+        SELECT s.team_id, s.offense_focus, s.defense_focus, s.bench_minutes, s.training_focus
+        FROM coaching_strategy s
+        JOIN league_teams t ON t.team_id = s.team_id
+        WHERE t.league_id = $1::int
+    """,
+    'sim_save_schedule': """
+        UPDATE league_schedule s
+        SET home_score=v.hs, away_score=v.aws, is_played=TRUE,
+            home_q1=v.hq1, home_q2=v.hq2, home_q3=v.hq3, home_q4=v.hq4,
+            away_q1=v.aq1, away_q2=v.aq2, away_q3=v.aq3, away_q4=v.aq4,
+            win_prob_samples=v.wp, event_log=v.ev
+        FROM unnest($1::int[], $2::int[], $3::int[], $4::int[], $5::int[], $6::int[], $7::int[],
+                    $8::int[], $9::int[], $10::int[], $11::int[], $12::bytea[], $13::bytea[])
+             AS v(game_id, hs, aws, hq1, hq2, hq3, hq4, aq1, aq2, aq3, aq4, wp, ev)
+        WHERE s.game_id = v.game_id
+    """,
+    'sim_save_box_scores': """
+        INSERT INTO league_box_scores (league_id, game_id, team_id, player_id, minutes, points, rebounds, offensive_rebounds,
+                                       assists, steals, blocks, turnovers, fg_made, fg_attempts, threes_made, threes_attempts,
+                                       ft_made, ft_attempts, fouls, plus_minus)
+        SELECT $1::int, * FROM unnest($2::int[], $3::int[], $4::int[], $5::int[], $6::int[], $7::int[], $8::int[],
+                                      $9::int[], $10::int[], $11::int[], $12::int[], $13::int[], $14::int[], $15::int[],
+                                      $16::int[], $17::int[], $18::int[], $19::int[], $20::int[])
+    """,
+    'sim_save_standings': """
+        UPDATE league_teams t
+        SET wins = t.wins + v.won,
+            losses = t.losses + v.lost,
+            streak_length = CASE WHEN v.unbroken AND t.streak_type = v.streak THEN t.streak_length + v.run ELSE v.run END,
+            streak_type = v.streak
+        FROM unnest($1::int[], $2::int[], $3::int[], $4::varchar[], $5::int[], $6::boolean[])
+             AS v(team_id, won, lost, streak, run, unbroken)
+        WHERE t.team_id = v.team_id
+    """,
+}
+prepared_statements = weakref.WeakKeyDictionary()  # connection -> names already PREPAREd on it
+
+def execute_prepared(cur, name, params):
+    """EXECUTEs one of PREPARED_SQL on the cursor's connection, PREPAREing it there first if needed."""
+    prepared = prepared_statements.setdefault(cur.connection, set())
+    if name not in prepared:
+        cur.execute(f"PREPARE {name} AS {PREPARED_SQL[name]}")
+        prepared.add(name)
+    cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+
+def as_columns(rows):
+    """Row tuples -> one list per column (the array arguments of the prepared batch statements)."""
+    return [list(column) for column in zip(*rows)]
+
+def load_game_context(cur, league_id, team_ids):
+    """Fetches rosters (best players first) and coaching strategies for a set of teams."""
+    execute_prepared(cur, 'sim_rosters', (list(team_ids), league_id))
     all_players = cur.fetchall()
-    
-    # Fetch Coaching Strategies
-    cur.execute("""
-        SELECT * FROM coaching_strategy 
-        WHERE team_id IN (%s, %s)
-    """, (home_team_id, away_team_id))
+
+    execute_prepared(cur, 'sim_strategies', (list(team_ids),))
     strategies_db = cur.fetchall()
-    
+    return all_players, strategies_db
+
+def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    all_players, strategies_db = load_game_context(cur, league_id, [home_team_id, away_team_id])
+    result = simulate_game(home_team_id, away_team_id, all_players, strategies_db)
+    save_game_results(cur, league_id, [(game_id, home_team_id, away_team_id, result)])
+    conn.commit()
+    cur.close()
+
+# ---------------------------------------------------------
+# LINEUP TABLES
+# ---------------------------------------------------------
+# Everything a possession needs to know about the ten players on the floor is
+# computed once per lineup (and once per matchup of two lineups, strategies
+# included), then reused for every possession that unit plays. A substitution or
+# foul-out puts a new unit on the floor and so gets new tables. The possession
+# loop itself only rolls dice against these numbers.
+
+BASE_TURNOVER_RATE = 0.15
+BASE_STEAL_SHARE = 0.45
+OREB_DEFENSE_WEIGHT = 3  # defense gets 3x its rebounding weight: ~25% offensive rebounds when even
+
+def cumulative(values):
+    total, out = 0, []
+    for v in values:
+        total += v
+        out.append(total)
+    return out
+
+def lineup_table(five):
+    """Per-unit weights and probabilities (cumulative weights feed random.choices)."""
+    count = len(five) or 1
+    return {
+        'slots': range(len(five)),
+        'usage': cumulative(p['usage_rating'] for p in five),
+        'rebounding': cumulative(p['rebounding'] for p in five),
+        'stealing': cumulative(p['stealing'] for p in five),
+        # Chance that a missed shot this defender contested was a block
+        'block_two': [min(0.3, max(0.02, (p['blocking'] - 20) * 0.004)) for p in five],
+        'block_three': [min(0.08, max(0.0, (p['blocking'] - 20) * 0.001)) for p in five],
+        'free_throw': [p['ft_shooting'] / 100.0 for p in five],
+        'avg_passing': sum(p['passing'] for p in five) / count,
+        'avg_stealing': sum(p['stealing'] for p in five) / count,
+        'avg_speed': sum(p['speed'] for p in five) / count,
+        'rebound_total': sum(p['rebounding'] for p in five),
+    }
+
+def matchup_table(offense, defense, def_strat):
+    """Possession-level odds for one offensive unit against one defensive unit."""
+    turnover = (BASE_TURNOVER_RATE
+                + (defense['avg_stealing'] - offense['avg_passing']) * 0.002
+                + (defense['avg_speed'] - offense['avg_speed']) * 0.001)
+    if def_strat['defense_focus'] == 'pressure':
+        turnover += 0.02  # Aggressive defense forces more turnovers
+    rebound_total = offense['rebound_total'] + OREB_DEFENSE_WEIGHT * defense['rebound_total']
+    return {
+        'turnover': min(0.22, max(0.06, turnover)),
+        'steal': min(0.7, max(0.25, BASE_STEAL_SHARE + (defense['avg_stealing'] - 65) * 0.01)),
+        'offensive_rebound': offense['rebound_total'] / rebound_total if rebound_total else 0.25,
+    }
+
+def shot_table(offense_five, defense_five, off_strat, def_strat):
+    """
+    Per-player shot odds for one offensive unit against one defensive unit, with both
+    strategies applied: three-point rate per shooter, make probability per
+    (shooter, defender) pair for twos and threes, foul chance per defender and
+    assist chance per passer.
+    """
+    three_bonus = {'3pt': 0.20, 'paint': -0.15}.get(off_strat['offense_focus'], 0.0)
+    paint_bonus = 5 if off_strat['offense_focus'] == 'paint' else 0
+    guard_two = 15 if def_strat['defense_focus'] == 'paint' else 0
+    guard_three = 15 if def_strat['defense_focus'] == 'perimeter' else 0
+    foul_bonus = 8 if def_strat['defense_focus'] == 'pressure' else 0  # Aggressive defense fouls more
+    pass_bonus = 5 if off_strat.get('training_focus') == 'playmaking' else 0
+    return {
+        'three': [p['outside_shooting'] / 200.0 + three_bonus for p in offense_five],
+        'make_two': [[(45 + (p['inside_shooting'] - (d['guarding'] + guard_two) * 0.5) * 0.2 + paint_bonus) / 100.0
+                      for d in defense_five] for p in offense_five],
+        'make_three': [[(45 + (p['outside_shooting'] - (d['guarding'] + guard_three) * 0.5) * 0.2) / 100.0
+                        for d in defense_five] for p in offense_five],
+        'foul': [(15 + (100 - d['guarding']) * 0.1 + foul_bonus) / 100.0 for d in defense_five],
+        'assist': [(p['passing'] + pass_bonus) / 100.0 for p in offense_five],
+    }
+
+def simulate_game(home_team_id, away_team_id, all_players, strategies_db):
+    """
+    Plays one game entirely in memory and returns the result.
+    Player rows are copied, so the same roster list can be reused across games.
+    """
     # Organize Rosters
     rosters = {home_team_id: [], away_team_id: []}
-    for p in all_players:
+    for row in all_players:
+        if row['team_id'] not in rosters: continue
+        p = dict(row)
         # Initialize stat tracking
-        p['stats'] = {k: 0 for k in ['pts','reb','ast','stl','blk','to','fgm','fga','3pm','3pa','ftm','fta','min','pf']}
+        p['stats'] = {k: 0 for k in ['pts','reb','oreb','ast','stl','blk','to','fgm','fga','3pm','3pa','ftm','fta','min','pf','pm']}
         rosters[p['team_id']].append(p)
 
     # Organize Strategies (Default if missing)
@@ -41,7 +202,8 @@ def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
     
     # Fill dictionary with DB results
     for s in strategies_db:
-        team_strategies[s['team_id']] = s
+        if s['team_id'] in rosters:
+            team_strategies[s['team_id']] = s
         
     # Ensure both teams have a strategy object
     for tid in [home_team_id, away_team_id]:
@@ -54,21 +216,8 @@ def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
     # ---------------------------------------------------------
     # 2. SMART ROTATION LOGIC (With Strategy)
     # ---------------------------------------------------------
-    def get_lineup(team_id, quarter, minute_remaining):
-        team_roster = rosters[team_id]
+    def lineup_unit(team_id, quarter, minute_remaining):
         strat = team_strategies[team_id].get('bench_minutes', 'normal')
-        
-        # Filter disqualified
-        available = [p for p in team_roster if p['player_id'] not in disqualified[team_id]]
-        
-        # Define Rotation Depth
-        starters = available[:5]
-        bench = available[5:10] if len(available) >= 10 else available[5:]
-        
-        # Emergency: If bench depleted by fouls
-        if len(bench) < 5:
-            needed = 5 - len(bench)
-            bench += starters[:needed]
 
         # --- APPLY ROTATION STRATEGY ---
         # "Normal": Starters play Q1/Q3. Bench plays first 6 mins of Q2/Q4.
@@ -83,120 +232,150 @@ def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
             bench_limit_minute = 4.0 # Bench plays 12:00 to 4:00 (8 mins)
 
         # Logic: Q1/Q3 are starters. Q2/Q4 vary based on strategy.
-        if quarter in [1, 3]:
-            return starters
-        elif quarter in [2, 4]:
-            # If time remaining > limit, Bench is in. Else, Starters close.
-            if minute_remaining > bench_limit_minute:
-                return bench
-            else:
-                return starters
+        # If time remaining > limit, Bench is in. Else, Starters close.
+        if quarter in [2, 4] and minute_remaining > bench_limit_minute:
+            return 'bench'
+        return 'starters'
+
+    def build_lineup(team_id, unit):
+        team_roster = rosters[team_id]
+        
+        # Filter disqualified
+        available = [p for p in team_roster if p['player_id'] not in disqualified[team_id]]
+        
+        # Define Rotation Depth
+        starters = available[:5]
+        bench = available[5:10] if len(available) >= 10 else available[5:]
         
-        return starters
+        # Emergency: If bench depleted by fouls
+        if len(bench) < 5:
+            needed = 5 - len(bench)
+            bench += starters[:needed]
+
+        return starters if unit == 'starters' else bench
+
+    lineups = {}
+    def get_lineup(team_id, quarter, minute_remaining):
+        """The unit on the floor and its table, built once per (unit, foul-outs so far)."""
+        key = (team_id, lineup_unit(team_id, quarter, minute_remaining), len(disqualified[team_id]))
+        if key not in lineups:
+            five = build_lineup(team_id, key[1])
+            lineups[key] = (five, lineup_table(five))
+        return lineups[key]
+
+    matchups = {}
+    def get_matchup(off_id, offense, defense):
+        """Odds for a pair of units on the floor; a new unit (substitution, foul-out) gets new tables."""
+        key = (id(offense[1]), id(defense[1]))
+        if key not in matchups:
+            def_id = away_team_id if off_id == home_team_id else home_team_id
+            matchups[key] = dict(matchup_table(offense[1], defense[1], team_strategies[def_id]),
+                                 **shot_table(offense[0], defense[0], team_strategies[off_id], team_strategies[def_id]))
+        return matchups[key]
 
     # Game State
     score = {home_team_id: 0, away_team_id: 0}
     quarter_scores = {home_team_id: [0,0,0,0], away_team_id: [0,0,0,0]}
-    game_log = []
-    win_prob_log = []
-    
+    event_log = game_events.EventLog()
+    margins = [0]  # home - away, every win_probability.SAMPLE_SECONDS
+
+    # Minutes and plus-minus are credited per stint (a stretch with the same ten on
+    # the floor) rather than per possession
+    stint = {'home': None, 'away': None, 'seconds': 0, 'margin': 0}
+    def end_stint():
+        if stint['home'] is None: return
+        margin = score[home_team_id] - score[away_team_id] - stint['margin']
+        minutes = stint['seconds'] / 60.0
+        for p in stint['home']:
+            p['stats']['min'] += minutes
+            p['stats']['pm'] += margin
+        for p in stint['away']:
+            p['stats']['min'] += minutes
+            p['stats']['pm'] -= margin
+
+    second_chance = None  # team that just grabbed an offensive rebound
+
     # ---------------------------------------------------------
     # 3. GAME LOOP
     # ---------------------------------------------------------
     for q in range(1, 5):
         time_remaining = 720 # 12 mins in seconds
+        second_chance = None
         
         while time_remaining > 0:
             # Update minute decimal for rotation check
             minute_dec = time_remaining / 60.0
             
-            home5 = get_lineup(home_team_id, q, minute_dec)
-            away5 = get_lineup(away_team_id, q, minute_dec)
+            home_unit = get_lineup(home_team_id, q, minute_dec)
+            away_unit = get_lineup(away_team_id, q, minute_dec)
+            if home_unit[0] is not stint['home'] or away_unit[0] is not stint['away']:
+                end_stint()
+                stint.update(home=home_unit[0], away=away_unit[0], seconds=0,
+                             margin=score[home_team_id] - score[away_team_id])
             
-            # Determine Offense/Defense
-            if random.random() > 0.5:
-                offense_team, defense_team = home5, away5
+            # Determine Offense/Defense (an offensive rebound keeps the ball)
+            if second_chance == home_team_id or (second_chance is None and random.random() > 0.5):
+                off_unit, def_unit = home_unit, away_unit
                 off_id, def_id = home_team_id, away_team_id
             else:
-                offense_team, defense_team = away5, home5
+                off_unit, def_unit = away_unit, home_unit
                 off_id, def_id = away_team_id, home_team_id
+            offense_team, off_table = off_unit
+            defense_team, def_table = def_unit
+            matchup = get_matchup(off_id, off_unit, def_unit)
 
-            # Get Strategies for current possession
+            # Offense strategy sets the pace (everything else is in the matchup tables)
             off_strat = team_strategies[off_id]
-            def_strat = team_strategies[def_id]
 
             # --- A. PACE MODIFIER ---
             # Default possession 12-24s.
             # Pace = Faster (10-18s). Slow = Slower (16-24s).
+            # Putbacks after an offensive rebound are quick (3-8s).
             min_pace, max_pace = 12, 24
             
-            if off_strat['offense_focus'] == 'pace':
+            if second_chance is not None:
+                min_pace, max_pace = 3, 8
+            elif off_strat['offense_focus'] == 'pace':
                 min_pace, max_pace = 8, 18
             elif off_strat['offense_focus'] == 'slow':
                 min_pace, max_pace = 16, 24
                 
             possession_time = random.randint(min_pace, max_pace)
-            
-            # Track Minutes
-            for p in home5 + away5:
-                p['stats']['min'] += possession_time / 60.0
+            stint['seconds'] += possession_time
+            second_chance = None
 
             # --- B. SELECT SHOOTER ---
-            # Standard weighted choice by usage
-            total_usage = sum(p['usage_rating'] for p in offense_team)
-            r = random.uniform(0, total_usage)
-            current = 0
-            shooter = offense_team[0]
-            for p in offense_team:
-                current += p['usage_rating']
-                if r <= current:
-                    shooter = p
-                    break
-            
-            defender = random.choice(defense_team)
-            
-            # --- C. FOUL LOGIC ---
-            # Pressure defense causes more fouls
-            foul_chance = 15 + (100 - defender['guarding']) * 0.1
-            if def_strat['defense_focus'] == 'pressure':
-                foul_chance += 8 # Aggressive defense fouls more
-            
-            is_foul = random.uniform(0, 100) < foul_chance
+            # Standard weighted choice by usage (also the ball handler on a turnover)
+            i = random.choices(off_table['slots'], cum_weights=off_table['usage'])[0]
+            shooter = offense_team[i]
+            d = random.randrange(len(defense_team))
+            defender = defense_team[d]
 
-            # --- D. SHOT TYPE (3PT vs 2PT) ---
-            # Base logic: Rating / 200. e.g. 80 rating -> 40% chance to take 3
-            base_three_prob = (shooter['outside_shooting'] / 200.0)
-            
-            # Apply Strategy Modifiers
-            if off_strat['offense_focus'] == '3pt':
-                base_three_prob += 0.20 # Huge boost to 3PA
-            elif off_strat['offense_focus'] == 'paint':
-                base_three_prob -= 0.15 # Focus on rim
-
-            is_three = random.random() < base_three_prob
-            shot_val = 3 if is_three else 2
-            
-            # --- E. SHOT SUCCESS CALCULATION ---
-            shot_rating = (shooter['outside_shooting'] if is_three else shooter['inside_shooting'])
-            defense_rating = defender['guarding']
-            
-            # Strategy: Defense Bonuses
-            if def_strat['defense_focus'] == 'paint' and not is_three:
-                defense_rating += 15 # Bonus vs 2pt
-            elif def_strat['defense_focus'] == 'perimeter' and is_three:
-                defense_rating += 15 # Bonus vs 3pt
-            
-            defense_impact = defense_rating * 0.5
-            hit_threshold = 45 + (shot_rating - defense_impact) * 0.2
-            
-            # Strategy: Offense Bonuses (Paint focus = higher % on 2s)
-            if off_strat['offense_focus'] == 'paint' and not is_three:
-                hit_threshold += 5 
-                
-            shot_roll = random.uniform(0, 100)
-            is_made = shot_roll < hit_threshold
+            is_turnover = random.random() < matchup['turnover']
+            is_foul = is_made = False
+            shot_val = 0
+            other = detail = 0  # second player / FT makes for the event log
+            missed_live = False  # missed shot / last free throw: somebody rebounds
+
+            if is_turnover:
+                # --- C. TURNOVER (steal or unforced) ---
+                shooter['stats']['to'] += 1
+                code = game_events.TURNOVER
+                if random.random() < matchup['steal']:
+                    stealer = random.choices(defense_team, cum_weights=def_table['stealing'])[0]
+                    stealer['stats']['stl'] += 1
+                    code, other = game_events.STOLEN, stealer['player_id']
+            else:
+                # --- D. FOUL LOGIC (pressure defense fouls more) ---
+                is_foul = random.random() < matchup['foul'][d]
+
+                # --- E. SHOT TYPE (3PT vs 2PT) ---
+                # Rating / 200 (80 rating -> 40% threes), shifted by the offense focus
+                is_three = random.random() < matchup['three'][i]
+                shot_val = 3 if is_three else 2
 
-            event_desc = ""
+                # --- F. SHOT SUCCESS (shooter vs defender, with both strategies' bonuses) ---
+                is_made = random.random() < matchup['make_three' if is_three else 'make_two'][i][d]
 
             if is_foul:
                 # RECORD FOUL
@@ -205,10 +384,8 @@ def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
                 # Check Foul Out
                 if defender['stats']['pf'] >= 6:
                     disqualified[def_id].append(defender['player_id'])
-                    game_log.append({
-                        'game_id': game_id, 'quarter': q, 'time': f"{int(time_remaining//60)}:{int(time_remaining%60):02d}",
-                        'desc': f"{defender['last_name']} fouled out (6 PF)", 'h_score': score[home_team_id], 'a_score': score[away_team_id], 'type': 'FOUL'
-                    })
+                    event_log.record(game_events.FOUL_OUT, q, max(time_remaining, 0), defender['player_id'], 0, 0,
+                                     score[home_team_id], score[away_team_id])
 
                 # SHOOTING FOUL LOGIC
                 ft_attempts = 0
@@ -223,29 +400,29 @@ def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
                     
                     score[off_id] += shot_val
                     quarter_scores[off_id][q-1] += shot_val
-                    event_desc = f"{shooter['last_name']} made shot AND fouled by {defender['last_name']}!"
+                    code = game_events.AND_ONE
                     ft_attempts = 1
                 else:
                     # Missed shot
                     shooter['stats']['fga'] += 1
                     if is_three: shooter['stats']['3pa'] += 1
-                    event_desc = f"{shooter['last_name']} fouled by {defender['last_name']} on shot."
+                    code = game_events.FOULED_THREE if is_three else game_events.FOULED_TWO
                     ft_attempts = 3 if is_three else 2
 
                 # PROCESS FTs
-                made_fts = 0
+                other = defender['player_id']
                 for _ in range(ft_attempts):
                     shooter['stats']['fta'] += 1
-                    if random.uniform(0, 100) < shooter['ft_shooting']:
+                    missed_live = True
+                    if random.random() < off_table['free_throw'][i]:
                         shooter['stats']['ftm'] += 1
                         shooter['stats']['pts'] += 1
                         score[off_id] += 1
                         quarter_scores[off_id][q-1] += 1
-                        made_fts += 1
-                
-                event_desc += f" (FT: {made_fts}/{ft_attempts})"
+                        detail += 1
+                        missed_live = False
 
-            else:
+            elif not is_turnover:
                 # NORMAL SHOT
                 if is_made:
                     shooter['stats']['pts'] += shot_val
@@ -256,117 +433,142 @@ def run_game_simulation(conn, league_id, game_id, home_team_id, away_team_id):
                         shooter['stats']['3pa'] += 1
                     score[off_id] += shot_val
                     quarter_scores[off_id][q-1] += shot_val
-                    event_desc = f"{shooter['last_name']} made {shot_val}pt shot"
-                    
+                    code = game_events.MADE_THREE if is_three else game_events.MADE_TWO
+
                     # Assist Logic
                     if random.random() < 0.6:
-                        passer = random.choice([p for p in offense_team if p != shooter])
-                        # Playmaking strategy bonus
-                        pass_rating = passer['passing']
-                        if off_strat.get('training_focus') == 'playmaking': pass_rating += 5
-                        
-                        if random.uniform(0, 100) < pass_rating:
+                        a = random.randrange(len(offense_team) - 1)
+                        if a >= i: a += 1  # any teammate but the shooter
+                        if random.random() < matchup['assist'][a]:
+                            passer = offense_team[a]
                             passer['stats']['ast'] += 1
-                            event_desc += f" (Ast: {passer['last_name']})"
+                            other = passer['player_id']
                 else:
                     shooter['stats']['fga'] += 1
                     if is_three: shooter['stats']['3pa'] += 1
-                    event_desc = f"{shooter['last_name']} missed shot"
-                    
-                    # Rebound Logic
-                    all_on_court = home5 + away5
-                    total_reb = sum(p['rebounding'] for p in all_on_court)
-                    r_reb = random.uniform(0, total_reb)
-                    curr_reb = 0
-                    rebounder = all_on_court[0]
-                    for p in all_on_court:
-                        curr_reb += p['rebounding']
-                        if r_reb <= curr_reb:
-                            rebounder = p
-                            break
-                    rebounder['stats']['reb'] += 1
+                    code = game_events.MISSED
+                    missed_live = True
+
+                    # Block Logic
+                    if random.random() < def_table['block_three' if is_three else 'block_two'][d]:
+                        defender['stats']['blk'] += 1
+                        code, other = game_events.BLOCKED, defender['player_id']
+
+            if missed_live:
+                # Rebound Logic: offense keeps the ball on an offensive rebound
+                if random.random() < matchup['offensive_rebound']:
+                    rebounder = random.choices(offense_team, cum_weights=off_table['rebounding'])[0]
+                    rebounder['stats']['oreb'] += 1
+                    second_chance = off_id
+                else:
+                    rebounder = random.choices(defense_team, cum_weights=def_table['rebounding'])[0]
+                rebounder['stats']['reb'] += 1
 
             # Decrease Clock
             time_remaining -= possession_time
             
             # Log Event (only important plays to speed up simulation)
             is_important = (is_made and shot_val >= 2) or is_foul or (abs(score[home_team_id] - score[away_team_id]) <= 5 and time_remaining < 120)
-            if is_important or len(game_log) < 10:  # Always log first 10 events + important plays
-                game_log.append({
-                    'game_id': game_id,
-                    'quarter': q,
-                    'time': f"{int(time_remaining//60)}:{int(time_remaining%60):02d}",
-                    'desc': event_desc,
-                    'h_score': score[home_team_id],
-                    'a_score': score[away_team_id],
-                    'type': 'SHOT'
-                })
-
-            # Win Prob Graph
-            if int(time_remaining) % 60 < 20: 
-                diff = score[home_team_id] - score[away_team_id]
-                t_factor = 2000 / (((4-q)*720 + time_remaining) + 100)
-                prob = 1 / (1 + 2.718 ** -(diff * 0.1 * (t_factor/5)))
-                win_prob_log.append(round(prob * 100, 1))
+            if is_important or len(event_log) < 10:  # Always log first 10 events + important plays
+                event_log.record(code, q, max(time_remaining, 0), shooter['player_id'], other, detail,
+                                 score[home_team_id], score[away_team_id])
+
+            # Win Prob Graph: record the margin at each fixed sample mark (looked up after the game)
+            elapsed = (q - 1) * 720 + 720 - max(time_remaining, 0)
+            while len(margins) * win_probability.SAMPLE_SECONDS <= elapsed:
+                margins.append(score[home_team_id] - score[away_team_id])
+
+    end_stint()
+    rating_diff = win_probability.team_rating(rosters[home_team_id]) - win_probability.team_rating(rosters[away_team_id])
+    return {
+        'score': score,
+        'quarter_scores': quarter_scores,
+        'margins': margins,
+        'win_prob': win_probability.curve(margins, rating_diff),
+        'event_log': event_log.encode(),
+        'rosters': rosters,
+    }
+
+def simulate_series(series, all_players, strategies_db, pending_game=None, seed=None):
+    """
+    Plays out the rest of a best-of-seven series in memory.
+    pending_game is the already-scheduled unplayed game (if any); it is used for the next game.
+    A seed is passed in when running in a worker process so forked workers don't share random state.
+    """
+    if seed is not None: random.seed(seed)
+    team1_wins, team2_wins = series['team1_wins'], series['team2_wins']
+    games = []
+
+    while team1_wins < 4 and team2_wins < 4:
+        if pending_game and not games:
+            game_id, home, away = pending_game['game_id'], pending_game['home_team_id'], pending_game['away_team_id']
+        else:
+            game_num = team1_wins + team2_wins + 1
+            if game_num in [1, 2, 5, 7]: home, away = series['team1_id'], series['team2_id']
+            else: home, away = series['team2_id'], series['team1_id']
+            game_id = None
+
+        result = simulate_game(home, away, all_players, strategies_db)
+        game_winner_id = home if result['score'][home] > result['score'][away] else away
+        if game_winner_id == series['team1_id']: team1_wins += 1
+        else: team2_wins += 1
+        games.append((game_id, home, away, result))
+
+    return {
+        'series_id': series['series_id'],
+        'team1_wins': team1_wins,
+        'team2_wins': team2_wins,
+        'winner_team_id': series['team1_id'] if team1_wins == 4 else series['team2_id'],
+        'games': games,
+    }
+
+def save_game_results(cur, league_id, games):
+    """
+    Writes a batch of simulated games: (game_id, home_team_id, away_team_id, result) tuples.
+    Does not commit, so callers can group many games into one transaction.
+    Returns the number of rows written (schedule, box scores, standings).
+    """
+    if not games: return 0
 
-    # ---------------------------------------------------------
-    # 4. SAVE RESULTS TO DB
-    # ---------------------------------------------------------
-    
     # Update Schedule
-    cur.execute("""
-        UPDATE league_schedule 
-        SET home_score=%s, away_score=%s, is_played=TRUE,
-            home_q1=%s, home_q2=%s, home_q3=%s, home_q4=%s,
-            away_q1=%s, away_q2=%s, away_q3=%s, away_q4=%s,
-            win_prob_history=%s
-        WHERE game_id=%s
-    """, (score[home_team_id], score[away_team_id], 
-          quarter_scores[home_team_id][0], quarter_scores[home_team_id][1], quarter_scores[home_team_id][2], quarter_scores[home_team_id][3],
-          quarter_scores[away_team_id][0], quarter_scores[away_team_id][1], quarter_scores[away_team_id][2], quarter_scores[away_team_id][3],
-          json.dumps(win_prob_log), game_id))
+    schedule_data = []
+    for game_id, home_team_id, away_team_id, r in games:
+        hq, aq = r['quarter_scores'][home_team_id], r['quarter_scores'][away_team_id]
+        schedule_data.append((game_id, r['score'][home_team_id], r['score'][away_team_id],
+                              hq[0], hq[1], hq[2], hq[3], aq[0], aq[1], aq[2], aq[3],
+                              psycopg2.Binary(r['win_prob']), psycopg2.Binary(r['event_log'])))
+    execute_prepared(cur, 'sim_save_schedule', as_columns(schedule_data))
+    rows_written = cur.rowcount
 
     # Insert Box Scores (Bulk Insert for Speed)
     box_score_data = []
-    for team_id in [home_team_id, away_team_id]:
-        for p in rosters[team_id]:
-            s = p['stats']
-            if s['min'] > 0:
-                box_score_data.append((league_id, game_id, team_id, p['player_id'], int(s['min']),
-                                      s['pts'], s['reb'], s['ast'], s['fgm'], s['fga'],
-                                      s['3pm'], s['3pa'], s['ftm'], s['fta'], s['pf']))
+    for game_id, home_team_id, away_team_id, r in games:
+        for team_id in [home_team_id, away_team_id]:
+            for p in r['rosters'][team_id]:
+                s = p['stats']
+                if s['min'] > 0:
+                    box_score_data.append((game_id, team_id, p['player_id'], int(s['min']),
+                                          s['pts'], s['reb'], s['oreb'], s['ast'], s['stl'], s['blk'], s['to'],
+                                          s['fgm'], s['fga'], s['3pm'], s['3pa'], s['ftm'], s['fta'], s['pf'], s['pm']))
 
     if box_score_data:
-        args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in box_score_data)
-        cur.execute("INSERT INTO league_box_scores (league_id, game_id, team_id, player_id, minutes, points, rebounds, assists, fg_made, fg_attempts, threes_made, threes_attempts, ft_made, ft_attempts, fouls) VALUES " + args_str)
-
-    # Insert Game Events (Bulk Insert)
-    if game_log:
-        args_list = [(l['game_id'], l['quarter'], l['time'], l['desc'], l['h_score'], l['a_score'], l['type']) for l in game_log]
-        args_str = ','.join(cur.mogrify("(%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in args_list)
-        cur.execute("INSERT INTO league_game_events (game_id, quarter, time_remaining, description, score_home, score_away, event_type) VALUES " + args_str)
-
-    # Update Standings / Streaks
-    winner = home_team_id if score[home_team_id] > score[away_team_id] else away_team_id
-    loser = away_team_id if winner == home_team_id else home_team_id
-    
-    # Update Winner
-    cur.execute("""
-        UPDATE league_teams 
-        SET wins = wins + 1, 
-            streak_length = CASE WHEN streak_type='W' THEN streak_length + 1 ELSE 1 END,
-            streak_type = 'W'
-        WHERE team_id = %s
-    """, (winner,))
-    
-    # Update Loser
-    cur.execute("""
-        UPDATE league_teams 
-        SET losses = losses + 1, 
-            streak_length = CASE WHEN streak_type='L' THEN streak_length + 1 ELSE 1 END,
-            streak_type = 'L'
-        WHERE team_id = %s
-    """, (loser,))
-    
-    conn.commit()
-    cur.close()
\ No newline at end of file
+        execute_prepared(cur, 'sim_save_box_scores', [league_id] + as_columns(box_score_data))
+        rows_written += cur.rowcount
+
+    # Update Standings / Streaks: fold the batch per team (in game order, so streaks
+    # stay correct when a team plays more than once), then one UPDATE for every team
+    teams = {}
+    for game_id, home_team_id, away_team_id, r in games:
+        score = r['score']
+        winner = home_team_id if score[home_team_id] > score[away_team_id] else away_team_id
+        for team_id in (home_team_id, away_team_id):
+            result = 'W' if team_id == winner else 'L'
+            t = teams.setdefault(team_id, {'W': 0, 'L': 0, 'type': result, 'run': 0, 'unbroken': True})
+            if result == t['type']:
+                t['run'] += 1
+            else:
+                t.update(type=result, run=1, unbroken=False)
+            t[result] += 1
+    standings_data = [(team_id, t['W'], t['L'], t['type'], t['run'], t['unbroken']) for team_id, t in teams.items()]
+    execute_prepared(cur, 'sim_save_standings', as_columns(standings_data))
+    return rows_written + cur.rowcount
@@ -0,0 +1,77 @@
+"""
+Per-game engine routing for hybrid simulation mode.
+
+In 'hybrid' mode each game of the day goes to the detailed engine (full
+play-by-play, win probability) only when someone is likely to look at it:
+  - games involving the user's team,
+  - playoff games,
+  - games involving a team in a close playoff race: within race_games games of
+    its conference's playoff line once race_after_games have been played.
+Everything else is played by the fast engine in one batch.
+
+The policy is stored per league in leagues.simulation_policy (JSONB); missing
+keys fall back to DEFAULT_POLICY.
+"""
+from psycopg2.extras import RealDictCursor
+
+SIMULATION_MODES = ['detailed', 'hybrid', 'fast']
+DEFAULT_POLICY = {
+    'user_team': True,
+    'playoffs': True,
+    'race_games': 3.0,       # 0 turns race routing off
+    'race_after_games': 50,  # races only count late in the season
+}
+
+def league_policy(stored):
+    """The stored policy (dict or None) merged over the defaults, with each value coerced to the default's type."""
+    policy = dict(DEFAULT_POLICY)
+    for key, value in (stored or {}).items():
+        if key in DEFAULT_POLICY and value is not None:
+            policy[key] = type(DEFAULT_POLICY[key])(value)
+    return policy
+
+def race_teams(cur, league_id, policy):
+    """Team ids within race_games of their conference's playoff line (from the standings read model)."""
+    if policy['race_games'] <= 0: return set()
+    cur.execute("""
+        WITH line AS (
+            SELECT s.conference, l.seeds,
+                   MAX(s.wins) FILTER (WHERE s.conf_rank = l.seeds) AS in_wins,
+                   MAX(s.losses) FILTER (WHERE s.conf_rank = l.seeds) AS in_losses,
+                   MAX(s.wins) FILTER (WHERE s.conf_rank = l.seeds + 1) AS out_wins,
+                   MAX(s.losses) FILTER (WHERE s.conf_rank = l.seeds + 1) AS out_losses
+            FROM team_standings_snapshot s
+            CROSS JOIN (SELECT COALESCE(playoff_teams_per_conf, 8) AS seeds FROM leagues WHERE league_id = %(league_id)s) l
+            WHERE s.league_id = %(league_id)s
+            GROUP BY s.conference, l.seeds
+        )
+        SELECT s.team_id
+        FROM team_standings_snapshot s
+        JOIN line ON line.conference = s.conference
+        WHERE s.league_id = %(league_id)s
+          AND s.wins + s.losses >= %(after)s
+          AND line.out_wins IS NOT NULL
+          AND CASE WHEN s.conf_rank <= line.seeds
+                   THEN ((s.wins - line.out_wins) + (line.out_losses - s.losses)) / 2.0
+                   ELSE ((line.in_wins - s.wins) + (s.losses - line.in_losses)) / 2.0
+              END <= %(games)s
+    """, {'league_id': league_id, 'after': policy['race_after_games'], 'games': policy['race_games']})
+    return {row['team_id'] for row in cur.fetchall()}
+
+def route_games(conn, league_id, games, user_team_id, policy):
+    """
+    Splits the day's games (dicts with home_team_id, away_team_id, playoff_series_id)
+    into (detailed, fast) lists according to the policy.
+    """
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    featured = race_teams(cur, league_id, policy)
+    cur.close()
+    if policy['user_team'] and user_team_id: featured.add(user_team_id)
+
+    detailed, fast = [], []
+    for g in games:
+        if (policy['playoffs'] and g.get('playoff_series_id')) or g['home_team_id'] in featured or g['away_team_id'] in featured:
+            detailed.append(g)
+        else:
+            fast.append(g)
+    return detailed, fast
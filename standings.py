@@ -0,0 +1,80 @@
+from psycopg2.extras import RealDictCursor
+
+def refresh_standings_snapshot(conn, league_id):
+    """
+    Rebuilds the standings read model for a league (W/L, streak, L5/L10, GB,
+    conference rank, point differential). Run once per simulated day so the
+    dashboard and standings pages never have to scan the game history.
+    Does not commit.
+    """
+    cur = conn.cursor()
+    cur.execute("DELETE FROM team_standings_snapshot WHERE league_id = %s", (league_id,))
+    cur.execute("""
+        INSERT INTO team_standings_snapshot (
+            league_id, team_id, conference, division, wins, losses, win_pct, games_behind, conf_rank,
+            streak_type, streak_length, last5_wins, last5_losses, last10_wins, last10_losses,
+            points_for, points_against, point_diff, updated_at)
+        WITH results AS (
+            SELECT home_team_id AS team_id, game_id, home_score AS pf, away_score AS pa
+            FROM league_schedule WHERE league_id = %(league_id)s AND is_played = TRUE
+            UNION ALL
+            SELECT away_team_id, game_id, away_score, home_score
+            FROM league_schedule WHERE league_id = %(league_id)s AND is_played = TRUE
+        ), recent AS (
+            SELECT team_id, pf, pa, ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY game_id DESC) AS rn
+            FROM results
+        ), agg AS (
+            SELECT team_id,
+                   SUM(pf) AS pf, SUM(pa) AS pa,
+                   COUNT(*) FILTER (WHERE rn <= 5 AND pf > pa) AS l5w,
+                   COUNT(*) FILTER (WHERE rn <= 5 AND pf < pa) AS l5l,
+                   COUNT(*) FILTER (WHERE rn <= 10 AND pf > pa) AS l10w,
+                   COUNT(*) FILTER (WHERE rn <= 10 AND pf < pa) AS l10l
+            FROM recent GROUP BY team_id
+        ), base AS (
+            SELECT t.league_id, t.team_id, t.conference, t.division, t.wins, t.losses,
+                   t.streak_type, t.streak_length,
+                   CASE WHEN t.wins + t.losses > 0 THEN t.wins::numeric / (t.wins + t.losses) ELSE 0 END AS win_pct,
+                   COALESCE(a.l5w, 0) AS l5w, COALESCE(a.l5l, 0) AS l5l,
+                   COALESCE(a.l10w, 0) AS l10w, COALESCE(a.l10l, 0) AS l10l,
+                   COALESCE(a.pf, 0) AS pf, COALESCE(a.pa, 0) AS pa
+            FROM league_teams t
+            LEFT JOIN agg a ON a.team_id = t.team_id
+            WHERE t.league_id = %(league_id)s
+        ), ranked AS (
+            SELECT b.*,
+                   ROW_NUMBER() OVER w AS conf_rank,
+                   FIRST_VALUE(wins) OVER w AS leader_wins,
+                   FIRST_VALUE(losses) OVER w AS leader_losses
+            FROM base b
+            WINDOW w AS (PARTITION BY conference ORDER BY win_pct DESC, wins DESC, losses ASC, team_id)
+        )
+        SELECT league_id, team_id, conference, division, wins, losses, win_pct,
+               GREATEST(((leader_wins - wins) + (losses - leader_losses)) / 2.0, 0), conf_rank,
+               streak_type, streak_length, l5w, l5l, l10w, l10l, pf, pa, pf - pa, NOW()
+        FROM ranked
+    """, {'league_id': league_id})
+    cur.close()
+
+def get_standings_snapshot(conn, league_id):
+    """Reads the standings read model (one indexed query), building it first if this league has none yet."""
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    query = """
+        SELECT s.*, t.city, t.name, t.abbrev
+        FROM team_standings_snapshot s
+        JOIN league_teams t ON s.team_id = t.team_id
+        WHERE s.league_id = %s
+        ORDER BY s.conference, s.conf_rank
+    """
+    cur.execute(query, (league_id,))
+    rows = cur.fetchall()
+    if not rows:
+        refresh_standings_snapshot(conn, league_id)
+        conn.commit()
+        cur.execute(query, (league_id,))
+        rows = cur.fetchall()
+    cur.close()
+    for r in rows:
+        r['gb'] = float(r['games_behind'])
+        r['pct'] = "{:.3f}".format(r['win_pct']) if r['wins'] + r['losses'] > 0 else ".000"
+    return rows
@@ -0,0 +1,77 @@
+"""
+build_players (vectorized) against the row-by-row formulas the old importer
+used, on a small sheet with missing stats, team aliases and an unknown team.
+"""
+import pandas as pd
+import pytest
+from import_quickstart import build_players, PLAYER_COLUMNS, MIN_SALARY
+
+TEAM_MAP = {'GSW': 1, 'NYK': 2, 'UTA': 3}
+
+SHEET = pd.DataFrame([
+    {'NAME': 'Star Guard', 'TEAM': 'GS', 'POS': 'G', 'AGE': 27, 'PpG': 30.1, 'RpG': 5.2, 'ApG': 6.4, 'SpG': 1.6,
+     'BpG': 0.3, 'FT%': 0.91, '2P%': 0.56, '3P%': 0.41, 'USG%': 31.5},
+    {'NAME': 'Role Big', 'TEAM': 'NY', 'POS': 'C', 'AGE': 24, 'PpG': 9.8, 'RpG': 8.1, 'ApG': 1.2, 'SpG': 0.5,
+     'BpG': 1.4, 'FT%': 0.68, '2P%': 0.61, '3P%': 0.0, 'USG%': 15.0},
+    {'NAME': 'Deep Bench', 'TEAM': 'uta ', 'POS': 'F-C', 'AGE': None, 'PpG': 1.0, 'RpG': 0.5, 'ApG': 0.1, 'SpG': None,
+     'BpG': None, 'FT%': None, '2P%': 0.3, '3P%': 0.1, 'USG%': 8.0},
+    {'NAME': 'Mononym', 'TEAM': 'UTA', 'POS': 'F', 'AGE': 22, 'PpG': 12.0, 'RpG': 4.0, 'ApG': 2.0, 'SpG': 1.0,
+     'BpG': 0.5, 'FT%': 0.8, '2P%': 0.5, '3P%': 0.35, 'USG%': 20.0},
+    {'NAME': 'Lost Player', 'TEAM': 'XYZ', 'POS': 'G', 'AGE': 30, 'PpG': 5.0, 'RpG': 1.0, 'ApG': 1.0, 'SpG': 0.5,
+     'BpG': 0.1, 'FT%': 0.7, '2P%': 0.4, '3P%': 0.3, 'USG%': 12.0},
+])
+
+def legacy_row(row):
+    """The old importer's per-player formulas."""
+    value = lambda key, default: default if pd.isna(row[key]) else float(row[key])
+    ppg, rpg, apg = value('PpG', 10), value('RpG', 3), value('ApG', 2)
+    spg, bpg = value('SpG', 0.7), value('BpG', 0.5)
+    position = str(row['POS']).strip()[:2]
+    overall = min(99, int(40 + ppg * 2.5 + apg * 1.5 + rpg * 1.2))
+    if overall >= 90: salary, years = 40000000 + (overall - 90) * 2000000, 4
+    elif overall >= 85: salary, years = 25000000 + (overall - 85) * 3000000, 3
+    elif overall >= 80: salary, years = 15000000 + (overall - 80) * 2000000, 3
+    elif overall >= 75: salary, years = 8000000 + (overall - 75) * 1400000, 2
+    elif overall >= 70: salary, years = 3000000 + (overall - 70) * 1000000, 2
+    else: salary, years = 1500000 + (overall - 60) * 150000, 1
+    return {
+        'position': position,
+        'age': 25 if pd.isna(row['AGE']) else int(row['AGE']),
+        'usage_rating': min(99, int(30 + value('USG%', 20) * 2)),
+        'inside_shooting': min(99, int(30 + value('2P%', 0.45) * 130)),
+        'outside_shooting': min(99, int(30 + value('3P%', 0.35) * 150)),
+        'ft_shooting': min(99, int(value('FT%', 0.75) * 95)),
+        'passing': min(99, int(40 + apg * 10)),
+        'speed': 65 if position == 'G' else 50,
+        'guarding': min(99, int(40 + spg * 25)),
+        'stealing': min(99, int(40 + spg * 30)),
+        'blocking': min(99, int(30 + bpg * 35)),
+        'rebounding': min(99, int(30 + rpg * 8)),
+        'overall_rating': overall,
+        'contract_years': years,
+        'salary_amount': max(int(salary), MIN_SALARY),
+    }
+
+def test_ratings_match_row_by_row_formulas():
+    players, warnings = build_players(SHEET, TEAM_MAP)
+    assert list(players.columns) == PLAYER_COLUMNS
+    assert warnings == ["Unknown team 'XYZ' (1 players skipped)"]
+    assert players['qs_team_id'].tolist() == [1, 2, 3, 3]
+    for (_, row), (_, player) in zip(SHEET.iloc[:4].iterrows(), players.iterrows()):
+        expected = legacy_row(row)
+        assert {k: player[k] for k in expected} == expected, row['NAME']
+
+def test_names_split_on_first_space():
+    players, _ = build_players(SHEET, TEAM_MAP)
+    assert players[['first_name', 'last_name']].values.tolist() == [
+        ['Star', 'Guard'], ['Role', 'Big'], ['Deep', 'Bench'], ['Mononym', 'Mononym']]
+
+def test_low_ratings_get_the_minimum_salary():
+    players, _ = build_players(SHEET, TEAM_MAP)
+    bench = players.iloc[2]
+    assert bench['overall_rating'] < 50
+    assert bench['salary_amount'] == MIN_SALARY
+
+def test_missing_required_column():
+    with pytest.raises(ValueError, match='TEAM'):
+        build_players(SHEET.drop(columns=['TEAM']), TEAM_MAP)
@@ -0,0 +1,188 @@
+"""
+Win probability from a precomputed lookup table.
+
+The table gives P(home wins) for every (pregame rating differential, game clock,
+score margin) cell. It is built offline by Monte Carlo: thousands of games are
+played through simulate_game itself, the margin is recorded every SAMPLE_SECONDS,
+and a logistic curve in margin is fitted per (rating, clock) slice so sparse
+cells stay smooth and monotone. The result ships as win_probability.bin
+(little-endian uint16, 1/10000ths) and is loaded once per process.
+
+During a game the engine only records the margin at each SAMPLE_SECONDS mark;
+curve() turns those into probabilities with table lookups, stored per game as a
+compact byte string (one 0-100 percent per sample).
+
+Rebuild after changing the engine:
+    python win_probability.py [games] [seed]
+"""
+import array
+import math
+import os
+import random
+import sys
+
+SAMPLE_SECONDS = 30
+GAME_SECONDS = 2880
+TIME_STEPS = GAME_SECONDS // SAMPLE_SECONDS + 1  # sample i is taken i * SAMPLE_SECONDS into the game
+MAX_MARGIN = 25
+MARGIN_STEPS = 2 * MAX_MARGIN + 1
+RATING_STEP = 2
+MAX_RATING_DIFF = 12
+RATING_STEPS = 2 * (MAX_RATING_DIFF // RATING_STEP) + 1
+ROTATION_SIZE = 8
+TABLE_SCALE = 10000
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'win_probability.bin')
+DEFAULT_BUILD_GAMES = 40000
+
+_table = None
+_table_missing = False
+
+def team_rating(roster):
+    """Average overall of the rotation (roster sorted best first)."""
+    top = roster[:ROTATION_SIZE]
+    return sum(p['overall_rating'] for p in top) / len(top) if top else 0
+
+def rating_index(rating_diff):
+    steps = MAX_RATING_DIFF // RATING_STEP
+    return max(-steps, min(steps, round(rating_diff / RATING_STEP))) + steps
+
+def cell(rating_idx, time_idx, margin):
+    return (rating_idx * TIME_STEPS + time_idx) * MARGIN_STEPS + max(-MAX_MARGIN, min(MAX_MARGIN, margin)) + MAX_MARGIN
+
+def load_table():
+    """The lookup table as array('H'), or None if win_probability.bin hasn't been built."""
+    global _table, _table_missing
+    if _table is None and not _table_missing:
+        try:
+            table = array.array('H')
+            with open(TABLE_PATH, 'rb') as f:
+                table.frombytes(f.read())
+            if sys.byteorder == 'big': table.byteswap()  # stored little-endian
+            if len(table) != RATING_STEPS * TIME_STEPS * MARGIN_STEPS:
+                raise ValueError(f"expected {RATING_STEPS * TIME_STEPS * MARGIN_STEPS} cells, found {len(table)}")
+            _table = table
+        except (OSError, ValueError) as e:
+            print(f"Win probability table unavailable ({e}); games will have no win probability graph")
+            _table_missing = True
+    return _table
+
+def curve(margins, rating_diff):
+    """
+    Home win probability (percent) at each sample, from the home-minus-away margins
+    recorded every SAMPLE_SECONDS. The final sample is the actual result.
+    """
+    table = load_table()
+    if table is None or not margins: return b''
+    r = rating_index(rating_diff)
+    samples = bytearray(round(table[cell(r, i, m)] * 100 / TABLE_SCALE) for i, m in enumerate(margins[:TIME_STEPS - 1]))
+    if len(margins) >= TIME_STEPS: samples.append(100 if margins[TIME_STEPS - 1] > 0 else 0)
+    return bytes(samples)
+
+def decode(samples):
+    """Stored samples -> list of (seconds elapsed, home win %)."""
+    if not samples: return []
+    return [(i * SAMPLE_SECONDS, p) for i, p in enumerate(bytes(samples))]
+
+# ---------------------------------------------------------
+# OFFLINE BUILD
+# ---------------------------------------------------------
+
+def synthetic_roster(team_id, strength, rng):
+    """
+    A 13-man roster rated with the same formulas as the roster importer,
+    from per-game numbers scaled by strength (1.0 = average team).
+    """
+    roster = []
+    for i in range(13):
+        role = max(0.25, 1 - i * 0.07)
+        ppg = max(1.0, rng.gauss(20 * role * strength, 3))
+        rpg = max(0.5, rng.gauss(6 * role * strength, 1.5))
+        apg = max(0.3, rng.gauss(4 * role * strength, 1.2))
+        spg = max(0.1, rng.gauss(0.9 * strength, 0.3))
+        bpg = max(0.0, rng.gauss(0.5 * strength, 0.3))
+        two_pct = rng.gauss(0.48 + 0.05 * (strength - 1), 0.04)
+        three_pct = rng.gauss(0.35 + 0.04 * (strength - 1), 0.04)
+        roster.append({
+            'player_id': team_id * 100 + i, 'team_id': team_id, 'last_name': f"Player {i + 1}",
+            'overall_rating': int(min(99, 40 + ppg * 2.5 + apg * 1.5 + rpg * 1.2)),
+            'usage_rating': int(min(99, 30 + rng.gauss(20 * role + 5, 3) * 2)),
+            'inside_shooting': int(min(99, 30 + two_pct * 130)),
+            'outside_shooting': int(min(99, 30 + three_pct * 150)),
+            'ft_shooting': int(min(99, rng.gauss(0.77, 0.07) * 95)),
+            'passing': int(min(99, 40 + apg * 10)),
+            'speed': 65 if i % 5 < 2 else 50,
+            'guarding': int(min(99, 40 + spg * 25)),
+            'stealing': int(min(99, 40 + spg * 30)),
+            'blocking': int(min(99, 30 + bpg * 35)),
+            'rebounding': int(min(99, 30 + rpg * 8)),
+        })
+    roster.sort(key=lambda p: p['overall_rating'], reverse=True)
+    return roster
+
+def fit_logistic(counts, wins):
+    """
+    Fits P(win | margin) = 1 / (1 + e^-(a*margin + b)) to per-margin counts (Newton's method,
+    with a small penalty on the slope so near-separable late-game slices stay finite).
+    """
+    a, b = 0.1, 0.0
+    for _ in range(50):
+        ga, gb, haa, hab, hbb = -a * 0.5, 0.0, 0.5, 0.0, 1e-6
+        for i, n in enumerate(counts):
+            if not n: continue
+            m = i - MAX_MARGIN
+            p = 1 / (1 + math.exp(-(a * m + b)))
+            ga += (wins[i] - n * p) * m
+            gb += wins[i] - n * p
+            h = n * p * (1 - p)
+            haa += h * m * m; hab += h * m; hbb += h
+        det = haa * hbb - hab * hab
+        if det <= 0: break
+        da, db = (hbb * ga - hab * gb) / det, (haa * gb - hab * ga) / det
+        a, b = a + da, b + db
+        if abs(da) < 1e-7 and abs(db) < 1e-7: break
+    return a, b
+
+def build_table(games=DEFAULT_BUILD_GAMES, seed=0):
+    """Plays `games` Monte Carlo games through the engine and returns the fitted table."""
+    from simulation import simulate_game
+
+    rng = random.Random(seed)
+    random.seed(seed)
+    size = RATING_STEPS * TIME_STEPS * MARGIN_STEPS
+    counts, wins = [0] * size, [0] * size
+    for g in range(games):
+        home_strength = rng.uniform(0.8, 1.2)
+        away_strength = home_strength + rng.uniform(-0.3, 0.3)
+        home, away = synthetic_roster(1, home_strength, rng), synthetic_roster(2, away_strength, rng)
+        result = simulate_game(1, 2, home + away, [])
+        won = result['score'][1] > result['score'][2]
+        r = rating_index(team_rating(home) - team_rating(away))
+        for t, margin in enumerate(result['margins'][:TIME_STEPS]):
+            c = cell(r, t, margin)
+            counts[c] += 1
+            wins[c] += won
+        if (g + 1) % 5000 == 0: print(f"  {g + 1}/{games} games")
+
+    table = array.array('H', [0] * size)
+    for r in range(RATING_STEPS):
+        for t in range(TIME_STEPS):
+            start = cell(r, t, -MAX_MARGIN)
+            if t == TIME_STEPS - 1:
+                # Final horn: the margin decides it (a tie goes to the away team, as in the engine)
+                probs = [1.0 if i > MAX_MARGIN else 0.0 for i in range(MARGIN_STEPS)]
+            else:
+                a, b = fit_logistic(counts[start:start + MARGIN_STEPS], wins[start:start + MARGIN_STEPS])
+                probs = [1 / (1 + math.exp(-(a * (i - MAX_MARGIN) + b))) for i in range(MARGIN_STEPS)]
+            for i, p in enumerate(probs):
+                table[start + i] = round(p * TABLE_SCALE)
+    return table
+
+if __name__ == '__main__':
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUILD_GAMES
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    print(f"=== BUILDING WIN PROBABILITY TABLE ({games} games) ===")
+    table = build_table(games, seed)
+    if sys.byteorder == 'big': table.byteswap()
+    with open(TABLE_PATH, 'wb') as f:
+        f.write(table.tobytes())
+    print(f"Wrote {TABLE_PATH} ({len(table) * table.itemsize // 1024} KB)")